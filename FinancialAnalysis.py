@@ -1,24 +1,20 @@
-import os
 import pandas as pd
 from yf_download import YFDownload
+from data_store import DataStore
 
 class PortfolioAnalysis:
     def __init__(self, ticker_symbol):
         self.ticker_symbol = ticker_symbol
         self.directory = f"Data/{ticker_symbol}"
+        self.store = DataStore("Data")
         self.ensure_data_availability()
 
     def ensure_data_availability(self):
         # Check if data for the given ticker is already downloaded
-        required_files = [
-            f"{self.ticker_symbol}_historical_data.csv",
-            f"{self.ticker_symbol}_Info.csv",
-            f"{self.ticker_symbol}_Balance_Sheet.csv",
-            f"{self.ticker_symbol}_Income_Stmt.csv",
-            f"{self.ticker_symbol}_Cash_Flows.csv"
-        ]
+        required_datasets = ['historical_data', 'Info', 'Balance_Sheet', 'Income_Stmt', 'Cash_Flows']
 
-        missing_files = [file for file in required_files if not os.path.exists(os.path.join(self.directory, file))]
+        missing_files = [f"{self.ticker_symbol}_{dataset}" for dataset in required_datasets
+                         if not self.store.exists(self.ticker_symbol, dataset)]
         
         if missing_files:
             print(f"Missing data for {self.ticker_symbol}: {missing_files}")
@@ -37,15 +33,15 @@ class PortfolioAnalysis:
         YFDownload.download_cash_flows(self.ticker_symbol)
 
     def load_data(self):
-        # Load the data from CSV files
-        self.historical_data = pd.read_csv(f"{self.directory}/{self.ticker_symbol}_historical_data.csv", index_col='Date', parse_dates=True)
-        self.balance_sheet = pd.read_csv(f"{self.directory}/{self.ticker_symbol}_Balance_Sheet.csv")
-        self.income_statement = pd.read_csv(f"{self.directory}/{self.ticker_symbol}_Income_Stmt.csv")
-        self.cash_flows = pd.read_csv(f"{self.directory}/{self.ticker_symbol}_Cash_Flows.csv")
+        # Load the data from the local store
+        self.historical_data = self.store.read_history(self.ticker_symbol)
+        self.balance_sheet = self.store.read(self.ticker_symbol, 'Balance_Sheet')
+        self.income_statement = self.store.read(self.ticker_symbol, 'Income_Stmt')
+        self.cash_flows = self.store.read(self.ticker_symbol, 'Cash_Flows')
 
     def historical_price_analysis(self):
         # Simple historical closing price analysis
-        print(f"Latest closing price for {self.ticker_symbol}: {self.historical_data['Close'].iloc[0]}")
+        print(f"Latest closing price for {self.ticker_symbol}: {self.historical_data['Close'].iloc[-1]}")
         self.historical_data['Close'].plot(title=f"{self.ticker_symbol} Historical Closing Prices")
 
 # Example Usage
@@ -3,6 +3,7 @@ import pandas as pd
 import os 
 import numpy as np
 import matplotlib.pyplot as plt 
+from risk_metrics import to_returns, benchmark_metrics, summary_metrics, RollingRiskState
 
 class MarketAnalysisTool:
     def __init__(self, data_directory="Data", ticker_symbol=None):
@@ -22,10 +23,10 @@ class MarketAnalysisTool:
         self.yf.ensure_directory_exists(ticker_data_directory)
 
         if not os.listdir(ticker_data_directory):  # Directory is empty; download data
-            self.yf.download_all_data(self.ticker_symbol)
+            self.yf.download_all_data_for_ticker(self.ticker_symbol)
         
-        market_data_exists = all(os.path.exists(f"{self.market_directory}/{index}_historical_data.csv") 
-                                 for index in ['^DJI', '^IXIC', '^GSPC'])
+        market_data_exists = all(self.yf.store.exists(index, 'historical_data', directory=self.yf.market_directory)
+                                 for index in self.yf.indexes)
         if not market_data_exists:
             self.yf.download_market_historical_data()
         else:
@@ -33,5 +34,35 @@ class MarketAnalysisTool:
             self.yf.update_market_data()
             print("Data updated")
 
+    def load_prices(self, ticker_symbols=None):
+        """Return a dates x symbols frame of closes for the tickers (default: the tool's ticker) and the market indexes."""
+        ticker_symbols = ticker_symbols or [self.ticker_symbol]
+        closes = {}
+        for symbol in ticker_symbols:
+            history = self.yf.store.read_history(symbol, columns=['Close'])
+            if history is not None:
+                closes[symbol] = history['Close']
+        for index in self.yf.indexes:
+            history = self.yf.store.read_history(index, columns=['Close'], directory=self.yf.market_directory)
+            if history is not None:
+                closes[index] = history['Close']
+        return pd.DataFrame(closes).sort_index()
+
+    def perform_market_analysis(self, ticker_symbols=None, windows=(21, 63, 252), risk_free_rate=0.0):
+        """Compute rolling volatility, beta, correlation, tracking error, Sharpe and Sortino against each index."""
+        prices = self.load_prices(ticker_symbols)
+        indexes = [index for index in self.yf.indexes if index in prices.columns]
+        symbols = [symbol for symbol in prices.columns if symbol not in indexes]
+        returns = to_returns(prices)
+        self.rolling = benchmark_metrics(returns[symbols], returns[indexes], windows, risk_free_rate)
+        self.summary = {index: summary_metrics(prices[symbols], returns[index], risk_free_rate) for index in indexes}
+        # Incremental state per index, so appending a new daily bar only updates the rolling sums
+        self.risk_states = {index: RollingRiskState.from_returns(returns[symbols], returns[index], windows, risk_free_rate)
+                            for index in indexes}
+        for index in indexes:
+            print(f"\nRisk metrics against {index}:")
+            print(self.risk_states[index].metrics().round(3))
+        return self.rolling
+
 if __name__ == "__main__":
     MarketAnalysisTool()
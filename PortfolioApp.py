@@ -1,18 +1,52 @@
+import sys
+import pandas as pd
 import tkinter as tk
 from tkinter import ttk
 from tkinter import font as tkFont
 from data_retriever import DataRetriever
+from gui_workers import BackgroundLoader, TreeviewPager
+from quote_stream import SimulatedFeed, LiveQuoteView
+
+
+def portfolio_rows(portfolio_details):
+    """Format get_portfolio_total_values output as Treeview rows."""
+    return [(ticker,
+             f"{details['Shares']:,}",  # Formats with commas for thousands
+             f"${details['Value']:,.2f}",  # Formats with commas and rounds to 2 decimal places
+             f"${details['Total Value']:,.2f}",  # Formats with commas and rounds to 2 decimal places
+             f"{details['Weight']:.2f}%")
+            for ticker, details in portfolio_details.items()]
+
+
+def load_portfolio(data_retriever, portfolio_name):
+    """Return (details, formatted rows) of a portfolio. Runs on a loader thread."""
+    portfolio_details = data_retriever.get_portfolio_total_values(portfolio_name)
+    return portfolio_details, portfolio_rows(portfolio_details)
+
+
+def news_text(data_retriever, ticker):
+    """Build the text shown in the news panel for a ticker. Runs on a loader thread."""
+    news_df = data_retriever.retrieve_news_for_ticker(ticker)
+    if news_df is None or news_df.empty:
+        return "No news found for this ticker."
+    return "".join(f"{title or 'No Title'}\n{'' if pd.isna(published) else f'{published:%Y-%m-%d %H:%M}'} {publisher}\n{summary}\n\n"
+                   for title, published, publisher, summary in
+                   zip(news_df['Title'], news_df['Published'], news_df['Publisher'], news_df['Summary']))
 
 
 class PortfolioGUI(tk.Tk):
-    def __init__(self):
+    def __init__(self, directory='AK47_Finance/Data', feed=None):
         super().__init__()
 
         self.title("Portfolio Manager")
         self.geometry("800x600")  # Set the size of the window
 
         # Assuming DataRetriever is correctly implemented to load portfolio names
-        self.data_retriever = DataRetriever(directory='AK47_Finance/Data')
+        self.data_retriever = DataRetriever(directory=directory)
+
+        # File reads and parsing run on loader threads; results are applied on the Tk thread
+        self.loader = BackgroundLoader(self)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
 
         # Initialize GUI components
         self.setup_menu_buttons()
@@ -76,6 +110,9 @@ class PortfolioGUI(tk.Tk):
         self.tree.pack(expand=False, fill="y", side="top")  # No longer fill both
 
         self.details_frame.config(width=total_width)  # Set the frame width to the total width of the columns
+        self.pager = TreeviewPager(self, self.tree)
+        # With a quote feed, the shown portfolio's prices, totals and weights update live
+        self.live_view = LiveQuoteView(self, self.pager, feed) if feed is not None else None
 
         # Right side of the Top Content Frame - Empty Section
         self.empty_frame = tk.Frame(self.top_content_frame, bg='light grey', bd=2, relief="groove")
@@ -97,7 +134,10 @@ class PortfolioGUI(tk.Tk):
         self.news_text.pack(expand=True, fill="both", padx=10, pady=10)
 
     def load_and_display_portfolio_names(self):
-        portfolio_names = self.data_retriever.load_all_portfolios().keys()
+        self.loader.submit('portfolios', lambda: list(self.data_retriever.load_all_portfolios()),
+                           self.show_portfolio_names)
+
+    def show_portfolio_names(self, portfolio_names):
         for name in portfolio_names:
             self.portfolio_listbox.insert(tk.END, name)
 
@@ -116,22 +156,21 @@ class PortfolioGUI(tk.Tk):
             self.display_news_for_ticker(ticker)
 
     def load_and_display_ticker_info(self, portfolio_name):
-        # Clear existing data in the table
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-
-        # Retrieve the portfolio details
-        portfolio_details = self.data_retriever.get_portfolio_total_values(portfolio_name)
-
-        # Populate the table with the ticker info
-        for ticker, details in portfolio_details.items():
-            self.tree.insert("", tk.END, values=(
-                ticker,
-                f"{details['Shares']:,}",  # Formats with commas for thousands
-                f"${details['Value']:,.2f}",  # Formats with commas and rounds to 2 decimal places
-                f"${details['Total Value']:,.2f}",  # Formats with commas and rounds to 2 decimal places
-                f"{details['Weight']:.2f}%"))
-
+        # Clear the table now; a still-running load for a previously selected portfolio is superseded
+        if self.live_view is not None:
+            self.live_view.clear()
+        self.pager.show([])
+        self.title(f"Portfolio Manager - {portfolio_name} (loading...)")
+        self.loader.submit('portfolio', load_portfolio,
+                           lambda loaded: self.show_ticker_info(portfolio_name, *loaded),
+                           self.data_retriever, portfolio_name)
+
+    def show_ticker_info(self, portfolio_name, portfolio_details, rows):
+        # Rows are inserted a chunk per tick so large portfolios paint the first page immediately
+        self.pager.show(rows)
+        if self.live_view is not None:
+            self.live_view.watch({ticker: details['Shares'] for ticker, details in portfolio_details.items()},
+                                 {ticker: details['Value'] for ticker, details in portfolio_details.items()})
         # Update the application's title or another widget to show the selected portfolio name
         self.title(f"Portfolio Manager - {portfolio_name}")
 
@@ -148,25 +187,24 @@ class PortfolioGUI(tk.Tk):
         pass
 
     def display_news_for_ticker(self, ticker):
-        # Clear existing news
+        self.loader.submit('news', news_text, self.show_news, self.data_retriever, ticker)
+
+    def show_news(self, text):
+        # Replace the news panel's contents in one insert
         self.news_text.config(state='normal')
         self.news_text.delete('1.0', tk.END)
+        self.news_text.insert(tk.END, text)
+        self.news_text.config(state='disabled')
 
-        # Retrieve news data
-        news_df = self.data_retriever.retrieve_news_for_ticker(ticker)
-        if news_df is not None and not news_df.empty:
-            # Format and display each news item
-            for index, row in news_df.iterrows():
-                title = row.get('Title', 'No Title')  # Assuming your CSV has a 'Title' column
-                date = row.get('Date', 'No Date')  # Assuming your CSV has a 'Date' column
-                content = row.get('Content', 'No Content')  # Assuming your CSV has a 'Content' column
-                news_entry = f"{title}\n{date}\n{content}\n\n"
-                self.news_text.insert(tk.END, news_entry)
-        else:
-            self.news_text.insert(tk.END, "No news found for this ticker.")
+    def on_close(self):
+        if self.live_view is not None:
+            self.live_view.stop()
+        self.pager.cancel()
+        self.loader.shutdown()
+        self.destroy()
 
-        self.news_text.config(state='disabled')
 
-# Create the GUI application
-app = PortfolioGUI()
-app.mainloop()
+if __name__ == "__main__":
+    # Create the GUI application ('simulate' streams random-walk quotes for the selected portfolio)
+    app = PortfolioGUI(feed=SimulatedFeed() if len(sys.argv) > 1 and sys.argv[1] == 'simulate' else None)
+    app.mainloop()
@@ -0,0 +1,211 @@
+import os
+import sys
+import time
+import itertools
+import numpy as np
+import pandas as pd
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+from data_store import DataStore
+
+try:
+    from sklearn.ensemble import RandomForestClassifier
+    HAS_SKLEARN = True
+except ImportError:
+    HAS_SKLEARN = False
+
+BASE_PREDICTORS = ['Close', 'Volume', 'Open', 'High', 'Low']
+FEATURE_WINDOWS = (2, 5, 60, 250, 1000)
+
+
+def build_features(history, horizons=(1,), windows=FEATURE_WINDOWS):
+    """Return a float64 frame of predictors plus, per horizon h, `Target_h` (1 if Close rises over the next
+    h days, NaN where unknown) and `Return_h` (the h-day forward return).
+
+    Rolling features only look backwards: `Close_Ratio_w` is Close over its w-day mean and `Trend_w`
+    the number of up days among the previous w.
+    """
+    close = history['Close'].astype(np.float64)
+    features = history[BASE_PREDICTORS].astype(np.float64).copy()
+    up = (close > close.shift(1)).astype(np.float64)
+    for window in windows:
+        features[f"Close_Ratio_{window}"] = close / close.rolling(window).mean()
+        features[f"Trend_{window}"] = up.shift(1).rolling(window).sum()
+    for horizon in horizons:
+        forward = close.shift(-horizon)
+        features[f"Return_{horizon}"] = forward / close - 1
+        features[f"Target_{horizon}"] = (forward > close).astype(np.float64).where(forward.notna())
+    return features
+
+
+def predictor_sets(windows=FEATURE_WINDOWS):
+    """The notebook's raw OHLCV predictors, the rolling ratio/trend predictors, and both."""
+    rolling = [f"{name}_{window}" for window in windows for name in ('Close_Ratio', 'Trend')]
+    return {'ohlcv': list(BASE_PREDICTORS), 'rolling': rolling, 'ohlcv+rolling': BASE_PREDICTORS + rolling}
+
+
+def default_models():
+    if not HAS_SKLEARN:
+        raise ImportError("scikit-learn is required for the default models")
+    return {'random_forest': RandomForestClassifierFactory()}
+
+
+class RandomForestClassifierFactory:
+    """Picklable factory for the notebook's RandomForestClassifier settings."""
+
+    def __init__(self, n_estimators=100, min_samples_split=100, random_state=1):
+        self.params = {'n_estimators': n_estimators, 'min_samples_split': min_samples_split,
+                       'random_state': random_state}
+
+    def __call__(self):
+        return RandomForestClassifier(**self.params)
+
+
+def walk_forward_folds(row_count, start=2500, step=250, horizon=1):
+    """(train_end, test_start, test_end) row bounds of strictly time-ordered folds.
+
+    Each fold trains on every row before `test_start` except the last `horizon` ones, whose targets
+    depend on prices inside the test window, and tests on the next `step` rows.
+    """
+    return [(test_start - horizon, test_start, min(test_start + step, row_count))
+            for test_start in range(start, row_count, step)]
+
+
+# Worker-side view of the shared feature matrix, attached once per process
+_SHARED = {}
+
+
+def _attach(name, shape, columns):
+    shm = shared_memory.SharedMemory(name=name)
+    _SHARED['shm'] = shm
+    _SHARED['matrix'] = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    _SHARED['columns'] = {column: index for index, column in enumerate(columns)}
+
+
+def run_fold(task):
+    """Fit and evaluate one (ticker, model, predictors, horizon, fold) on the shared feature matrix."""
+    ticker, offset, model_name, factory, predictors_name, predictors, horizon, fold, threshold = task
+    train_end, test_start, test_end = fold
+    # Slice the ticker's rows first (a view) so only they are copied when the predictor columns are taken
+    block, columns = _SHARED['matrix'][offset[0]:offset[1]], _SHARED['columns']
+    x = block[:, [columns[p] for p in predictors]]
+    target = block[:, columns[f"Target_{horizon}"]]
+    forward = block[:, columns[f"Return_{horizon}"]]
+    rows = np.arange(len(block))
+    usable = ~np.isnan(x).any(axis=1) & ~np.isnan(target)
+    train = rows[:train_end][usable[:train_end]]
+    test = rows[test_start:test_end][usable[test_start:test_end]]
+    record = {'Ticker': ticker, 'Model': model_name, 'Predictors': predictors_name, 'Horizon': horizon,
+              'Fold Start': test_start, 'Train Rows': len(train), 'Test Rows': len(test)}
+    if len(test) == 0 or len(np.unique(target[train])) < 2:
+        return record
+    start = time.perf_counter()
+    model = factory()
+    model.fit(x[train], target[train])
+    if hasattr(model, 'predict_proba'):
+        predicted = model.predict_proba(x[test])[:, 1] >= threshold
+    else:
+        predicted = np.asarray(model.predict(x[test])) >= threshold
+    actual = target[test] == 1
+    signal_returns = forward[test][predicted]
+    record.update({
+        'Predicted Up': int(predicted.sum()),
+        'Precision': float(actual[predicted].mean()) if predicted.any() else np.nan,
+        'Accuracy': float((predicted == actual).mean()),
+        'Base Rate': float(actual.mean()),
+        'Signal Return': float(signal_returns.mean()) if len(signal_returns) else np.nan,
+        'Market Return': float(forward[test].mean()),
+        'Seconds': time.perf_counter() - start,
+    })
+    return record
+
+
+class WalkForwardBacktester:
+    """Walk-forward backtests of classifiers over many tickers, models, predictor sets and horizons.
+
+    Feature frames are built from the local historical store, stacked into one float64 matrix in
+    shared memory and attached zero-copy by the worker processes, so each fold task only carries a
+    few row bounds. Models are given as {name: picklable zero-argument factory}.
+    """
+
+    def __init__(self, store, tickers, horizons=(1,), windows=FEATURE_WINDOWS, start=2500, step=250,
+                 max_workers=None):
+        self.store = store
+        self.tickers = list(tickers)
+        self.horizons = list(horizons)
+        self.windows = windows
+        self.start = start
+        self.step = step
+        self.max_workers = max_workers or os.cpu_count()
+        self.features = {}
+
+    def load(self):
+        """Build the feature frame of every ticker with stored history. Returns the tickers loaded."""
+        for ticker in self.tickers:
+            if ticker in self.features:
+                continue
+            history = self.store.read_history(ticker, columns=BASE_PREDICTORS)
+            if history is None or len(history) <= self.start:
+                print(f"Not enough history to backtest {ticker}.")
+                continue
+            self.features[ticker] = build_features(history, self.horizons, self.windows)
+        return list(self.features)
+
+    def tasks(self, offsets, models, predictors, threshold):
+        for ticker, offset in offsets.items():
+            row_count = offset[1] - offset[0]
+            for horizon in self.horizons:
+                folds = walk_forward_folds(row_count, self.start, self.step, horizon)
+                for (model_name, factory), (predictors_name, columns), fold in itertools.product(
+                        models.items(), predictors.items(), folds):
+                    yield (ticker, offset, model_name, factory, predictors_name, columns, horizon, fold, threshold)
+
+    def run(self, models=None, predictors=None, threshold=0.6):
+        """Run every fold of the sweep. Returns one row of metrics per (ticker, model, predictors, horizon, fold)."""
+        models = models or default_models()
+        predictors = predictors or predictor_sets(self.windows)
+        self.load()
+        if not self.features:
+            return pd.DataFrame()
+        columns = list(next(iter(self.features.values())).columns)
+        offsets, position = {}, 0
+        for ticker, frame in self.features.items():
+            offsets[ticker] = (position, position + len(frame))
+            position += len(frame)
+        shm = shared_memory.SharedMemory(create=True, size=max(position * len(columns) * 8, 1))
+        try:
+            matrix = np.ndarray((position, len(columns)), dtype=np.float64, buffer=shm.buf)
+            for ticker, frame in self.features.items():
+                matrix[offsets[ticker][0]:offsets[ticker][1]] = frame[columns].to_numpy(dtype=np.float64)
+            tasks = list(self.tasks(offsets, models, predictors, threshold))
+            with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_attach,
+                                     initargs=(shm.name, matrix.shape, columns)) as executor:
+                chunksize = max(1, len(tasks) // (self.max_workers * 8))
+                records = list(executor.map(run_fold, tasks, chunksize=chunksize))
+            del matrix
+        finally:
+            shm.close()
+            shm.unlink()
+        results = pd.DataFrame(records)
+        if 'Fold Start' in results:
+            results['Fold Date'] = [self.features[t].index[s] for t, s in zip(results['Ticker'], results['Fold Start'])]
+        return results
+
+
+def summarize(results):
+    """Average the fold metrics per (model, predictors, horizon), weighting precision by predicted-up days."""
+    if results.empty or 'Predicted Up' not in results:
+        return pd.DataFrame()
+    results = results.dropna(subset=['Accuracy'])
+    hits = results['Precision'].fillna(0) * results['Predicted Up']
+    grouped = results.assign(Hits=hits).groupby(['Model', 'Predictors', 'Horizon'])
+    summary = grouped.agg({'Hits': 'sum', 'Predicted Up': 'sum', 'Accuracy': 'mean', 'Base Rate': 'mean',
+                           'Signal Return': 'mean', 'Market Return': 'mean', 'Fold Start': 'count'})
+    summary['Precision'] = summary.pop('Hits') / summary['Predicted Up']
+    return summary.rename(columns={'Fold Start': 'Folds'})
+
+
+if __name__ == "__main__":
+    tickers = sys.argv[1:] or ['^GSPC']
+    results = WalkForwardBacktester(DataStore('Data'), tickers, horizons=(1, 5)).run()
+    print(summarize(results))
@@ -0,0 +1 @@
+"""Benchmarks on synthetic data; run one from the repository root with `python -m benchmarks.<module>`."""
@@ -0,0 +1,31 @@
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+from data_store import DataStore
+from backtester import RandomForestClassifierFactory, WalkForwardBacktester, summarize
+
+
+def benchmark_backtest(ticker_count=20, years=20, worker_counts=(1, 2, 4, 8), directory=None):
+    """Time a sweep over synthetic tickers at several worker counts (requires scikit-learn)."""
+    directory = directory or tempfile.mkdtemp(prefix='backtest_')
+    store = DataStore(directory)
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range(end='2024-03-15', periods=years * 252, name='Date')
+    tickers = [f"B{i:03d}" for i in range(ticker_count)]
+    for ticker in tickers:
+        close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, len(dates))))
+        store.write_history(pd.DataFrame({'Open': close, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close,
+                                          'Volume': rng.integers(1e5, 1e6, len(dates)).astype(float)},
+                                         index=dates), ticker)
+    models = {'random_forest': RandomForestClassifierFactory(n_estimators=50)}
+    for workers in worker_counts:
+        backtester = WalkForwardBacktester(store, tickers, horizons=(1, 5), max_workers=workers)
+        start = time.perf_counter()
+        results = backtester.run(models)
+        print(f"{workers:>2} workers: {len(results)} folds in {time.perf_counter() - start:.1f}s")
+    print(summarize(results))
+
+
+if __name__ == "__main__":
+    benchmark_backtest()
@@ -0,0 +1,36 @@
+import time
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from data_provider import SimulatedProvider
+from download_scheduler import DownloadScheduler
+from yf_download import YFDownload
+
+
+def benchmark_coalescing(caller_count=3, symbol_count=10, latency=0.3, datasets=None):
+    """Run `caller_count` concurrent callers (think GUI, updater, analysis) downloading the same symbols.
+
+    Each caller has its own YFDownload and data directory but all share one SimulatedProvider; the
+    provider's counters show how many upstream calls were eliminated by coalescing.
+    """
+    datasets = datasets or ['historical_data', 'Info', 'Dividends', 'Earnings_Dates', 'Options', 'News',
+                            'Balance_Sheet']
+    symbols = [f"S{i:03d}" for i in range(symbol_count)]
+    provider = SimulatedProvider(latency=latency, end='2024-03-15')
+
+    def caller(index):
+        downloader = YFDownload(data_directory=tempfile.mkdtemp(prefix=f"provider_{index}_"), provider=provider)
+        return DownloadScheduler(downloader, max_workers=8, rate=1000).download(symbols, datasets)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=caller_count) as executor:
+        reports = list(executor.map(caller, range(caller_count)))
+    elapsed = time.perf_counter() - start
+    for index, report in enumerate(reports):
+        print(f"Caller {index}: {report.summary()}")
+    print(f"{caller_count} callers x {symbol_count} symbols x {len(datasets)} datasets in {elapsed:.2f}s: "
+          f"{provider.summary()}")
+    return provider.stats()
+
+
+if __name__ == "__main__":
+    benchmark_coalescing()
@@ -0,0 +1,44 @@
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+from data_store import DataStore, FILE_EXTENSIONS, HAS_PYARROW
+
+
+def benchmark_formats(ticker_count=200, rows=7500, formats=None):
+    """Time writes, full reads and Close-only reads of synthetic histories for each format."""
+    formats = formats or [f for f in FILE_EXTENSIONS if f == 'csv' or HAS_PYARROW]
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range(end='2024-03-18', periods=rows, name='Date')
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, rows)))
+    history = pd.DataFrame({
+        'Open': close, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close,
+        'Volume': rng.integers(1e5, 1e7, rows).astype('float64'), 'Dividends': 0.0, 'Stock Splits': 0.0,
+    }, index=dates)
+    tickers = [f"T{i:04d}" for i in range(ticker_count)]
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for file_format in formats:
+            store = DataStore(os.path.join(directory, file_format), file_format)
+            start = time.perf_counter()
+            for ticker in tickers:
+                store.write_history(history, ticker)
+            write_time = time.perf_counter() - start
+            start = time.perf_counter()
+            for ticker in tickers:
+                store.read_history(ticker)
+            read_time = time.perf_counter() - start
+            start = time.perf_counter()
+            for ticker in tickers:
+                store.read_history(ticker, columns=['Close'])
+            close_time = time.perf_counter() - start
+            results[file_format] = {'write': write_time, 'read': read_time, 'read_close': close_time}
+            print(f"{file_format:>8}: write {write_time:.2f}s, full read {read_time:.2f}s, "
+                  f"Close-only read {close_time:.2f}s ({ticker_count} tickers x {rows} rows)")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_formats(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,51 @@
+import time
+import random
+import threading
+from download_scheduler import DATASET_METHODS, DownloadScheduler
+
+
+class ThrottledError(Exception):
+    pass
+
+
+class FakeDownloader:
+    """Offline stand-in for YFDownload that sleeps `latency` seconds per call and throttles a fraction of them."""
+
+    def __init__(self, latency=0.05, throttle_rate=0.1, seed=0):
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.raise_errors = False
+
+    def fetch(self, ticker_symbol):
+        with self.lock:
+            self.calls += 1
+            throttled = self.random.random() < self.throttle_rate
+        time.sleep(self.latency)
+        if throttled:
+            raise ThrottledError(f"429 Too Many Requests for {ticker_symbol}")
+        return ticker_symbol
+
+    def __getattr__(self, name):
+        if name in DATASET_METHODS.values():
+            return self.fetch
+        raise AttributeError(name)
+
+
+def benchmark_scaling(worker_counts=(1, 2, 4, 8, 16), ticker_count=40, latency=0.05, throttle_rate=0.1):
+    """Show throughput against worker count using FakeDownloader. Returns {workers: jobs per second}."""
+    tickers = [f"T{i:03d}" for i in range(ticker_count)]
+    results = {}
+    for workers in worker_counts:
+        scheduler = DownloadScheduler(FakeDownloader(latency, throttle_rate), max_workers=workers,
+                                      rate=1000, base_delay=0.01, seed=0)
+        report = scheduler.download(tickers, ['historical_data', 'Info'])
+        results[workers] = len(report.records) / report.elapsed
+        print(f"{workers:>3} workers: {report.summary()}")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_scaling()
@@ -0,0 +1,45 @@
+import sys
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+from data_store import DataStore
+from feature_store import FeatureStore, NOTEBOOK_FEATURES, compute_features
+
+
+def benchmark_refresh(ticker_count=200, years=30, appended=5):
+    """Time a cold build against a refresh after appending `appended` bars to every history."""
+    store = DataStore(tempfile.mkdtemp(prefix='features_'))
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range(end='2024-03-15', periods=years * 252 + appended, name='Date')
+    tickers = [f"F{i:03d}" for i in range(ticker_count)]
+    histories = {}
+    for ticker in tickers:
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates))))
+        histories[ticker] = pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close,
+                                          'Volume': 1e6, 'Dividends': 0.0}, index=dates)
+        store.write_history(histories[ticker].iloc[:-appended], ticker)
+    features = NOTEBOOK_FEATURES + [{'name': f"Trend_{w}", 'op': 'trend', 'column': 'Close', 'window': w}
+                                    for w in (2, 5, 60, 250, 1000)]
+    feature_store = FeatureStore(store)
+    start = time.perf_counter()
+    feature_store.get_many(tickers, features)
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    feature_store.get_many(tickers, features)
+    cached = time.perf_counter() - start
+    for ticker in tickers:
+        store.append_history(histories[ticker].iloc[-appended:], ticker)
+    computed = feature_store.rows_computed
+    start = time.perf_counter()
+    frames = feature_store.get_many(tickers, features)
+    refreshed = time.perf_counter() - start
+    full = compute_features(store.read_history(tickers[0]), features)
+    match = np.allclose(frames[tickers[0]].to_numpy(), full.to_numpy(), equal_nan=True)
+    print(f"{ticker_count} tickers x {len(dates)} bars: cold {cold:.2f}s, unchanged {cached:.2f}s, "
+          f"refresh after {appended} new bars {refreshed:.2f}s ({feature_store.rows_computed - computed} rows computed), "
+          f"matches full recompute: {match}")
+
+
+if __name__ == "__main__":
+    benchmark_refresh(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
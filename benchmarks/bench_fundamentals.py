@@ -0,0 +1,38 @@
+import sys
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+from data_store import DataStore
+from fundamentals import FundamentalsWarehouse, universe_ratios
+
+
+def benchmark_warehouse(symbol_count=2000, periods=4):
+    """Time loading synthetic statements for `symbol_count` symbols and computing universe ratios."""
+    rng = np.random.default_rng(0)
+    period_ends = pd.date_range(end='2023-12-31', periods=periods, freq='YE')[::-1]
+    items = {'income_stmt': ['Total Revenue', 'Gross Profit', 'Operating Income', 'Net Income'] +
+             [f"Income Item {i}" for i in range(40)],
+             'balance_sheet': ['Total Debt', 'Stockholders Equity', 'Total Assets', 'Ordinary Shares Number'] +
+             [f"Balance Item {i}" for i in range(60)],
+             'cash_flow': ['Free Cash Flow', 'Operating Cash Flow', 'Capital Expenditure'] +
+             [f"Cash Item {i}" for i in range(40)]}
+    warehouse = FundamentalsWarehouse(DataStore(tempfile.mkdtemp(prefix='fundamentals_')))
+    start = time.perf_counter()
+    for s in range(symbol_count):
+        for statement, line_items in items.items():
+            frame = pd.DataFrame(rng.uniform(1e6, 1e9, (len(line_items), periods)), index=line_items,
+                                 columns=period_ends)
+            warehouse.load(f"S{s:04d}", statement, 'annual', frame)
+    loaded = time.perf_counter()
+    table = warehouse.table()
+    consolidated = time.perf_counter()
+    ratios = universe_ratios(warehouse, prices={f"S{s:04d}": 50.0 for s in range(symbol_count)})
+    done = time.perf_counter()
+    print(f"{len(table)} values for {symbol_count} symbols: load {loaded - start:.2f}s, "
+          f"consolidate {consolidated - loaded:.2f}s, universe ratios {done - consolidated:.2f}s "
+          f"({len(ratios)} symbols)")
+
+
+if __name__ == "__main__":
+    benchmark_warehouse(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,38 @@
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+from data_store import DataStore
+from news_store import NEWS_COLUMNS, NewsStore
+
+
+def benchmark_search(article_count=100000, ticker_count=500, queries=1000):
+    """Time appends and keyword / ticker / date queries on a synthetic corpus."""
+    rng = np.random.default_rng(0)
+    vocabulary = np.array([f"word{i}" for i in range(5000)])
+    tickers = np.array([f"T{i:03d}" for i in range(ticker_count)])
+    published = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 86400 * 365, article_count), unit='s')
+    corpus = pd.DataFrame({
+        'Id': [f"id{i}" for i in range(article_count)], 'Ticker': rng.choice(tickers, article_count),
+        'Published': published,
+        'Title': [' '.join(words) for words in rng.choice(vocabulary, (article_count, 8))],
+        'Summary': [' '.join(words) for words in rng.choice(vocabulary, (article_count, 30))],
+        'Publisher': 'Synthetic', 'Url': '', 'Type': 'STORY'}, columns=NEWS_COLUMNS)
+    news = NewsStore(DataStore(tempfile.mkdtemp(prefix='news_')))
+    start = time.perf_counter()
+    for batch in np.array_split(np.arange(article_count), 100):
+        news.append(None, corpus.iloc[batch])
+    appended = time.perf_counter()
+    for _ in range(queries):
+        news.search(' '.join(rng.choice(vocabulary, 2)), limit=20)
+    keyword = time.perf_counter()
+    for _ in range(queries):
+        news.search(tickers=rng.choice(tickers), start='2024-06-01', limit=20)
+    ticker = time.perf_counter()
+    print(f"{article_count} articles: append {appended - start:.2f}s, "
+          f"keyword query {(keyword - appended) / queries * 1000:.3f}ms, "
+          f"ticker/date query {(ticker - keyword) / queries * 1000:.3f}ms")
+
+
+if __name__ == "__main__":
+    benchmark_search()
@@ -0,0 +1,29 @@
+import sys
+import time
+import numpy as np
+from options_analytics import black_scholes_price, greeks, implied_volatility
+
+
+def random_contracts(count, seed=0):
+    rng = np.random.default_rng(seed)
+    S = rng.uniform(20, 500, count)
+    return {'S': S, 'K': S * rng.uniform(0.7, 1.3, count), 'T': rng.uniform(7, 730, count) / 365,
+            'r': rng.uniform(0.0, 0.05, count), 'sigma': rng.uniform(0.1, 1.2, count),
+            'is_call': rng.random(count) < 0.5, 'q': rng.uniform(0.0, 0.03, count)}
+
+
+def benchmark_greeks(count=1_000_000, seed=1):
+    """Time IV + greeks on `count` random contracts. Returns contracts per second."""
+    c = random_contracts(count, seed)
+    prices = black_scholes_price(c['S'], c['K'], c['T'], c['r'], c['sigma'], c['is_call'], c['q'])
+    start = time.perf_counter()
+    iv = implied_volatility(prices, c['S'], c['K'], c['T'], c['r'], c['is_call'], c['q'])
+    greeks(c['S'], c['K'], c['T'], c['r'], iv, c['is_call'], c['q'])
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed
+    print(f"IV + greeks for {count:,} contracts in {elapsed:.2f}s ({rate:,.0f} contracts/s)")
+    return rate
+
+
+if __name__ == "__main__":
+    benchmark_greeks(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
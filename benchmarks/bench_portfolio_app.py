@@ -0,0 +1,214 @@
+import os
+import sys
+import time
+import heapq
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+import tkinter as tk
+from data_retriever import DataRetriever
+from data_store import DataStore
+from gui_workers import BackgroundLoader, TreeviewPager
+from quote_stream import SimulatedFeed, LiveQuoteView
+from PortfolioApp import load_portfolio, portfolio_rows
+
+
+class BlockingMonitor:
+    """Measures how long the event loop is blocked, from the lateness of a repeating `after` heartbeat."""
+
+    def __init__(self, root, interval=5):
+        self.root = root
+        self.interval = interval
+        self.blocks = []
+        self.expected = None
+        self.after_id = None
+
+    def start(self):
+        self.expected = time.perf_counter() + self.interval / 1000
+        self.after_id = self.root.after(self.interval, self.beat)
+
+    def beat(self):
+        now = time.perf_counter()
+        self.blocks.append(max(0.0, now - self.expected))
+        self.expected = now + self.interval / 1000
+        self.after_id = self.root.after(self.interval, self.beat)
+
+    def stop(self):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def summary(self):
+        blocks = np.array(self.blocks) if self.blocks else np.zeros(1)
+        return {'Max Block (ms)': blocks.max() * 1000, 'P99 Block (ms)': np.percentile(blocks, 99) * 1000,
+                'Total Blocked (ms)': blocks.sum() * 1000, 'Beats': len(self.blocks)}
+
+
+class HeadlessRoot:
+    """Minimal single-threaded stand-in for the Tk event loop (`after`, `after_cancel`, `update`)."""
+
+    def __init__(self):
+        self.timers = []
+        self.sequence = 0
+        self.cancelled = set()
+
+    def after(self, delay, callback, *args):
+        self.sequence += 1
+        heapq.heappush(self.timers, (time.perf_counter() + delay / 1000, self.sequence, callback, args))
+        return self.sequence
+
+    def after_cancel(self, after_id):
+        self.cancelled.add(after_id)
+
+    def update(self):
+        """Run every timer that is due."""
+        now = time.perf_counter()
+        while self.timers and self.timers[0][0] <= now:
+            _, after_id, callback, args = heapq.heappop(self.timers)
+            if after_id in self.cancelled:
+                self.cancelled.discard(after_id)
+                continue
+            callback(*args)
+
+    def run_until(self, condition, timeout=60.0):
+        deadline = time.perf_counter() + timeout
+        while not condition() and time.perf_counter() < deadline:
+            self.update()
+            time.sleep(0.0005)
+        return condition()
+
+
+class HeadlessTree:
+    """Treeview stand-in that keeps inserted rows in a list."""
+
+    def __init__(self):
+        self.items = []
+
+    def get_children(self):
+        return tuple(range(len(self.items)))
+
+    def delete(self, *items):
+        self.items = []
+
+    def insert(self, parent, index, values=()):
+        self.items.append(tuple(values))
+        return len(self.items) - 1
+
+    def set(self, item, column, value):
+        values = list(self.items[item])
+        values[int(column[1:]) - 1] = value
+        self.items[item] = tuple(values)
+
+
+def write_synthetic_portfolio(directory, name, ticker_count, days=2520, seed=0):
+    """Write a portfolio of `ticker_count` synthetic tickers with `days` of history each."""
+    store = DataStore(directory)
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end='2024-03-15', periods=days, name='Date')
+    tickers = [f"{name[:3].upper()}{i:05d}" for i in range(ticker_count)]
+    for ticker in tickers:
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, days)))
+        store.write_history(pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close,
+                                          'Volume': 1000.0}, index=dates), ticker)
+    os.makedirs(os.path.join(directory, 'Portfolios'), exist_ok=True)
+    pd.DataFrame({'Ticker': tickers, 'Shares': rng.integers(1, 500, ticker_count)}).to_csv(
+        os.path.join(directory, 'Portfolios', f"{name}.csv"), index=False)
+
+
+def measure_responsiveness(ticker_count=2000, chunk_size=200, directory=None):
+    """Headless harness: time to first paint and main-thread blocking when opening a large portfolio.
+
+    Runs the GUI's loader and pager against a stand-in event loop and Treeview, first synchronously
+    (the load on the main thread, as before) and then through the background loader. A smaller
+    portfolio is selected first and immediately superseded to exercise stale-request cancellation.
+    """
+    directory = directory or tempfile.mkdtemp(prefix='portfolio_gui_')
+    write_synthetic_portfolio(directory, 'Large', ticker_count)
+    write_synthetic_portfolio(directory, 'Small', 10, seed=1)
+    results = {}
+    try:
+        # Synchronous baseline: load, format and insert everything in one main-thread call
+        retriever = DataRetriever(directory=directory)
+        start = time.perf_counter()
+        tree = HeadlessTree()
+        for values in load_portfolio(retriever, 'Large')[1]:
+            tree.insert("", tk.END, values=values)
+        results['Synchronous'] = {'First Paint (s)': time.perf_counter() - start,
+                                  'Max Block (ms)': (time.perf_counter() - start) * 1000}
+        os.remove(retriever.quotes.index_file)
+
+        retriever = DataRetriever(directory=directory)
+        root, tree = HeadlessRoot(), HeadlessTree()
+        first_paint = {}
+        pager = TreeviewPager(root, tree, chunk_size,
+                              on_first_page=lambda: first_paint.setdefault('time', time.perf_counter()))
+        loader = BackgroundLoader(root)
+        monitor = BlockingMonitor(root)
+        monitor.start()
+        shown = []
+        start = time.perf_counter()
+        loader.submit('portfolio', load_portfolio, lambda loaded: shown.append('Small'), retriever, 'Small')
+        loader.submit('portfolio', load_portfolio, lambda loaded: (shown.append('Large'), pager.show(loaded[1])),
+                      retriever, 'Large')
+        root.run_until(lambda: bool(shown) and pager.done() and len(tree.items) == ticker_count)
+        filled = time.perf_counter()
+        root.run_until(lambda: not loader.pending, timeout=5.0)
+        monitor.stop()
+        loader.shutdown()
+        results['Background'] = {'First Paint (s)': first_paint.get('time', filled) - start,
+                                 'Full Table (s)': filled - start, **monitor.summary(),
+                                 'Shown': shown, 'Stale Dropped': loader.stale}
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    for mode, stats in results.items():
+        print(mode + ": " + ", ".join(f"{key} {value:.3f}" if isinstance(value, float) else f"{key} {value}"
+                                      for key, value in stats.items()))
+    return results
+
+
+def measure_streaming(ticker_count=2000, rate=5000, seconds=3.0, fps=10):
+    """Headless harness: stream simulated ticks into a table of `ticker_count` holdings for `seconds`.
+
+    Reports ticks received, frames drawn, cells rewritten, frame cost and event-loop blocking, and
+    checks the incrementally maintained cells and total against a full revaluation.
+    """
+    rng = np.random.default_rng(0)
+    tickers = [f"SIM{i:05d}" for i in range(ticker_count)]
+    holdings = dict(zip(tickers, rng.integers(1, 500, ticker_count).astype(float)))
+    prices = dict(zip(tickers, rng.uniform(10, 500, ticker_count)))
+    total = sum(holdings[t] * prices[t] for t in tickers)
+    details = {t: {'Shares': holdings[t], 'Value': prices[t], 'Total Value': holdings[t] * prices[t],
+                   'Weight': holdings[t] * prices[t] / total * 100} for t in tickers}
+    root, tree = HeadlessRoot(), HeadlessTree()
+    pager = TreeviewPager(root, tree)
+    pager.show(portfolio_rows(details))
+    view = LiveQuoteView(root, pager, SimulatedFeed(rate=rate, seed=0), fps=fps)
+    monitor = BlockingMonitor(root)
+    monitor.start()
+    view.watch(holdings, prices)
+    end = time.perf_counter() + seconds
+    root.run_until(lambda: time.perf_counter() >= end, timeout=seconds + 1)
+    view.stop()
+    monitor.stop()
+    view.draw_frame()
+    root.after_cancel(view.after_id)
+    portfolio = view.portfolio
+    expected_total = sum(holdings[t] * view.table.latest(t) if view.table.latest(t) is not None
+                         else holdings[t] * prices[t] for t in tickers)
+    shown_values = [float(row[3].strip('$').replace(',', '')) for row in tree.items]
+    stats = {**view.stats(), **monitor.summary(),
+             'Total Error': abs(portfolio.total - expected_total) / expected_total,
+             'Max Cell Error': max(abs(shown - value) for shown, value in zip(shown_values, portfolio.values))}
+    print(", ".join(f"{key} {value:.6g}" if isinstance(value, float) else f"{key} {value}"
+                    for key, value in stats.items()))
+    return stats
+
+
+if __name__ == "__main__":
+    # python -m benchmarks.bench_portfolio_app [load|stream] [ticker_count]
+    ticker_count = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    if len(sys.argv) > 1 and sys.argv[1] == 'stream':
+        measure_streaming(ticker_count)
+    else:
+        measure_responsiveness(ticker_count)
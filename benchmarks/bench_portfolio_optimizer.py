@@ -0,0 +1,44 @@
+import sys
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+from data_store import DataStore
+from portfolio_optimizer import ESTIMATORS, CovarianceState, PortfolioOptimizer
+
+
+def benchmark_frontier(symbol_count=1000, years=3, points=50, cap=0.05, appended=5):
+    """Time the estimate build, an incremental refresh and a full frontier solve on synthetic factor returns."""
+    store = DataStore(tempfile.mkdtemp(prefix='optimizer_'))
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range(end='2024-03-15', periods=years * 252 + appended, name='Date')
+    factors = rng.normal(0.0003, 0.01, (len(dates), 5))
+    tickers = [f"O{i:04d}" for i in range(symbol_count)]
+    histories = {}
+    for ticker in tickers:
+        daily = factors @ rng.normal(0.2, 0.3, 5) + rng.normal(rng.normal(0.0002, 0.0003), 0.015, len(dates))
+        histories[ticker] = pd.DataFrame({'Close': 100 * np.cumprod(1 + daily)}, index=dates)
+        store.write_history(histories[ticker].iloc[:-appended], ticker)
+    optimizer = PortfolioOptimizer(store)
+    start = time.perf_counter()
+    optimizer.estimates(tickers)
+    built = time.perf_counter() - start
+    for ticker in tickers:
+        store.append_history(histories[ticker].iloc[-appended:], ticker)
+    start = time.perf_counter()
+    state = optimizer.covariances.get(tickers, optimizer.window, optimizer.halflife)
+    refreshed = time.perf_counter() - start
+    full = CovarianceState.from_returns(tickers, np.diff(np.array([h['Close'] for h in histories.values()]).T, axis=0)
+                                        / np.array([h['Close'] for h in histories.values()]).T[:-1])
+    match = all(np.allclose(state.estimate(m)[1], full.estimate(m)[1]) for m in ESTIMATORS)
+    start = time.perf_counter()
+    result = optimizer.optimize(tickers, cap=cap, points=points)
+    solved = time.perf_counter() - start
+    best = result['frontier']['Sharpe'].max()
+    print(f"{symbol_count} symbols: estimates {built:.2f}s, refresh after {appended} bars {refreshed:.2f}s "
+          f"(matches rebuild: {match}), {points}-point frontier + min variance + max Sharpe {solved:.2f}s "
+          f"(max frontier Sharpe {best:.2f}, {int((result['max_sharpe'] > 1e-6).sum())} holdings)")
+
+
+if __name__ == "__main__":
+    benchmark_frontier(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,46 @@
+import sys
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+from data_store import DataStore
+from price_panel import PricePanel
+
+
+def benchmark_panel(symbol_count=1000, years=30, portfolio_count=50, holdings_per_portfolio=100, dtype=np.float32):
+    """Time PricePanel on stored synthetic histories with staggered listings and gaps.
+
+    Reports the cold load (reading every history from the store, aligning and forward-filling), a
+    warm load of the same universe and valuing every portfolio on the panel.
+    """
+    store = DataStore(tempfile.mkdtemp(prefix='price_panel_'))
+    rng = np.random.default_rng(0)
+    calendar = pd.bdate_range(end='2024-03-18', periods=years * 252, name='Date')
+    tickers = [f"P{i:04d}" for i in range(symbol_count)]
+    for ticker in tickers:
+        start = rng.integers(0, len(calendar) // 2)
+        dates = calendar[start:][rng.random(len(calendar) - start) > 0.01]
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates))))
+        store.write_history(pd.DataFrame({'Close': close}, index=dates), ticker)
+    portfolios = {f"Portfolio {p}": {ticker: float(rng.integers(1, 500))
+                                     for ticker in rng.choice(tickers, min(holdings_per_portfolio, symbol_count),
+                                                              replace=False)}
+                  for p in range(portfolio_count)}
+
+    panel = PricePanel(store, dtype=dtype)
+    start = time.perf_counter()
+    dates, symbols, _ = panel.load(tickers)
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    panel.load(tickers)
+    warm = time.perf_counter() - start
+    start = time.perf_counter()
+    values = panel.portfolio_values(portfolios)
+    valued = time.perf_counter() - start
+    print(f"{len(symbols)} symbols x {len(dates)} dates, {portfolio_count} portfolios: cold load {cold:.2f}s, "
+          f"warm load {warm:.2f}s, valuation {valued:.2f}s")
+    return values
+
+
+if __name__ == "__main__":
+    benchmark_panel(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,40 @@
+import time
+import pandas as pd
+from market_calendar import MarketCalendar
+from refresh_service import AfterClose, AtTimes, Every, RefreshScheduler, SimulatedClock, Weekly
+
+
+def simulate_schedule(start='2024-06-28 08:00', days=14, intraday_minutes=15, job_seconds=None):
+    """Run the service's cadences over `days` of simulated time with stand-in jobs and print the stats.
+
+    The default window spans the Independence Day holiday and its early close. Each stand-in job moves
+    the simulated clock forward by its `job_seconds`, so lateness builds up when jobs overlap.
+    """
+    job_seconds = job_seconds or {'daily_bars': 120, 'intraday': 20, 'options': 90, 'fundamentals': 600}
+    calendar = MarketCalendar()
+    clock = SimulatedClock(pd.Timestamp(start, tz=calendar.timezone))
+    scheduler = RefreshScheduler(calendar, clock, max_workers=0)
+    runs = {name: [] for name in job_seconds}
+
+    def job(name):
+        def action():
+            runs[name].append(calendar.local(clock.now()))
+            clock.advance(job_seconds[name])
+        return action
+    scheduler.add('daily_bars', AfterClose(), job('daily_bars'))
+    scheduler.add('intraday', Every(intraday_minutes), job('intraday'))
+    scheduler.add('options', AtTimes(), job('options'))
+    scheduler.add('fundamentals', Weekly(), job('fundamentals'))
+    started = time.perf_counter()
+    scheduler.run(until=clock.now() + pd.Timedelta(days=days))
+    elapsed = time.perf_counter() - started
+    stats = scheduler.stats()
+    print(f"{days} simulated days ({len(calendar.sessions(start, clock.now()))} sessions) in {elapsed:.2f}s; "
+          f"max queue depth {stats.attrs['Max Queue Depth']}")
+    print(stats.drop(columns='Next Run').to_string())
+    print("Daily bar runs:", ', '.join(f"{moment:%a %m-%d %H:%M}" for moment in runs['daily_bars']))
+    return stats
+
+
+if __name__ == "__main__":
+    simulate_schedule()
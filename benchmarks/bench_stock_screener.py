@@ -0,0 +1,33 @@
+import sys
+import time
+import numpy as np
+import pandas as pd
+from stock_screener import screen
+
+
+def benchmark_screen(symbol_count=10000, repeats=20):
+    """Time a compound screen over synthetic info for `symbol_count` symbols."""
+    rng = np.random.default_rng(0)
+    sectors = np.array(['Technology', 'Healthcare', 'Financial Services', 'Energy', 'Industrials', 'Utilities'])
+    fields = {
+        'marketCap': rng.lognormal(22, 2, symbol_count),
+        'trailingPE': rng.normal(20, 10, symbol_count),
+        'dividendYield': rng.uniform(0, 0.06, symbol_count),
+        'beta': rng.normal(1, 0.4, symbol_count),
+        'sector': pd.Categorical(rng.choice(sectors, symbol_count)),
+        'exDividendDate': pd.to_datetime(rng.integers(1.6e9, 1.72e9, symbol_count), unit='s'),
+    }
+    fields.update({f"field{i}": rng.normal(size=symbol_count) for i in range(120)})
+    table = pd.DataFrame(fields, index=pd.Index([f"S{i:05d}" for i in range(symbol_count)], name='Symbol'))
+    filters = [('marketCap', '>', 1e10), ('trailingPE', 'between', (5, 25)),
+               ('sector', 'in', ['Technology', 'Healthcare']), ('exDividendDate', '>=', '2023-01-01')]
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = screen(table, filters, sort=['-dividendYield', 'beta'], limit=50)
+    elapsed = (time.perf_counter() - start) / repeats
+    print(f"{symbol_count} symbols x {table.shape[1]} fields: screen {elapsed * 1000:.2f}ms ({len(result)} rows shown)")
+    return elapsed
+
+
+if __name__ == "__main__":
+    benchmark_screen(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,47 @@
+import sys
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+from data_store import DataStore
+from transaction_ledger import TransactionLedger
+
+
+def benchmark_ledger(entry_count=2000000, ticker_count=500, lookups=200, checkpoint_every=10000):
+    """Time point-in-time lookups (checkpointed and full replay) and a daily holdings matrix on a synthetic ledger."""
+    store = DataStore(tempfile.mkdtemp(prefix='ledger_'))
+    rng = np.random.default_rng(0)
+    days = pd.bdate_range(end='2024-03-15', periods=7500)
+    kinds = rng.choice(['buy', 'sell', 'dividend', 'deposit', 'split'], entry_count, p=[0.5, 0.4, 0.05, 0.0499, 0.0001])
+    transactions = pd.DataFrame({
+        'Date': np.sort(rng.choice(days.values, entry_count)), 'Type': kinds,
+        'Ticker': np.array([f"L{i:03d}" for i in range(ticker_count)])[rng.integers(0, ticker_count, entry_count)],
+        'Shares': np.where(kinds == 'split', 2.0, rng.integers(1, 100, entry_count).astype(float)),
+        'Price': rng.uniform(10, 500, entry_count), 'Amount': rng.uniform(10, 1000, entry_count)})
+    ledger = TransactionLedger(store, 'Benchmark', checkpoint_every)
+    start = time.perf_counter()
+    ledger.extend(transactions)
+    appended = time.perf_counter() - start
+    start = time.perf_counter()
+    ledger.holdings()
+    checkpointed = time.perf_counter() - start
+    targets = rng.choice(days.values, lookups)
+    start = time.perf_counter()
+    for target in targets:
+        holdings, cash = ledger.holdings(target)
+    lookup = (time.perf_counter() - start) / lookups
+    holdings, cash = ledger.holdings()
+    start = time.perf_counter()
+    full = ledger.replay(0, len(ledger.entries), {}, 0.0)
+    scan = time.perf_counter() - start
+    match = all(np.isclose(full[0].get(t, 0.0), s) for t, s in holdings.items()) and np.isclose(full[1], cash)
+    start = time.perf_counter()
+    matrix = ledger.holdings_over_time(days)
+    over_time = time.perf_counter() - start
+    print(f"{entry_count} entries: append {appended:.2f}s, checkpoints {checkpointed:.2f}s, as-of lookup "
+          f"{lookup * 1000:.1f}ms vs full replay {scan * 1000:.0f}ms (match: {match}), "
+          f"{matrix.shape[0]} x {matrix.shape[1]} holdings matrix {over_time:.2f}s")
+
+
+if __name__ == "__main__":
+    benchmark_ledger(int(sys.argv[1]) if len(sys.argv) > 1 else 2000000)
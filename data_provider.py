@@ -0,0 +1,273 @@
+import abc
+import time
+import zlib
+import types
+import threading
+import numpy as np
+import pandas as pd
+from concurrent.futures import Future
+
+try:
+    from curl_cffi import requests as curl_requests  # the session type yfinance prefers
+    HAS_CURL_CFFI = True
+except ImportError:
+    HAS_CURL_CFFI = False
+
+
+def make_session(pool_size=32):
+    """One HTTP session whose connections are reused by every request (curl_cffi if installed, else requests)."""
+    if HAS_CURL_CFFI:
+        return curl_requests.Session(impersonate='chrome')
+    import requests
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+class SingleFlight:
+    """Runs one call per key at a time: callers arriving while it is in flight wait for and share its outcome."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.coalesced = 0
+
+    def do(self, key, function):
+        with self.lock:
+            future = self.in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self.in_flight[key] = Future()
+            else:
+                self.coalesced += 1
+        if leader:
+            try:
+                future.set_result(function())
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self.lock:
+                    del self.in_flight[key]
+        return future.result()
+
+
+class MarketDataProvider(abc.ABC):
+    """Interface of the upstream market data source behind YFDownload.
+
+    `fetch(symbol, name, *args, **kwargs)` reads attribute `name` of the symbol's ticker, calling it
+    with the arguments when it is a method ('history', 'option_chain'); `download` fetches daily bars
+    of many symbols in one request. Identical requests made while one is in flight share its upstream
+    call, so results may be shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self):
+        self.flight = SingleFlight()
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.upstream_calls = 0
+
+    def fetch(self, symbol, name, *args, **kwargs):
+        key = (symbol, name, args, tuple(sorted(kwargs.items())))
+        return self.coalesce(key, lambda: self.upstream(symbol, name, args, kwargs))
+
+    def history(self, symbol, **kwargs):
+        return self.fetch(symbol, 'history', **kwargs)
+
+    def download(self, symbols, **kwargs):
+        symbols = list(symbols)
+        key = ('download', tuple(symbols), tuple(sorted(kwargs.items())))
+        return self.coalesce(key, lambda: self.upstream_download(symbols, kwargs))
+
+    def coalesce(self, key, function):
+        with self.lock:
+            self.requests += 1
+
+        def call():
+            with self.lock:
+                self.upstream_calls += 1
+            return function()
+        return self.flight.do(key, call)
+
+    @abc.abstractmethod
+    def upstream(self, symbol, name, args, kwargs):
+        """Read attribute `name` of the symbol's ticker from the source, calling it with `args` and `kwargs`."""
+
+    @abc.abstractmethod
+    def upstream_download(self, symbols, kwargs):
+        """Fetch the daily bars of many symbols in one request."""
+
+    def stats(self):
+        with self.lock:
+            return {'Requests': self.requests, 'Upstream Calls': self.upstream_calls,
+                    'Coalesced': self.flight.coalesced}
+
+    def summary(self):
+        stats = self.stats()
+        return (f"{stats['Requests']} requests, {stats['Upstream Calls']} upstream calls "
+                f"({stats['Coalesced']} eliminated by coalescing)")
+
+
+class YFinanceProvider(MarketDataProvider):
+    """yfinance behind one pooled HTTP session, with a Ticker handle cached per symbol.
+
+    yfinance memoises some data (info, statements, expirations) on a Ticker, so handles are rebuilt
+    after `handle_ttl` seconds and long-running callers still see fresh values.
+    """
+
+    def __init__(self, session=None, handle_ttl=300.0):
+        super().__init__()
+        self.session = session or make_session()
+        self.handle_ttl = handle_ttl
+        self.handles = {}
+        self.handles_created = 0
+        self.handles_reused = 0
+
+    def ticker(self, symbol):
+        import yfinance as yf
+        now = time.monotonic()
+        with self.lock:
+            handle = self.handles.get(symbol)
+            if handle is None or now - handle[1] > self.handle_ttl:
+                handle = self.handles[symbol] = (yf.Ticker(symbol, session=self.session), now)
+                self.handles_created += 1
+            else:
+                self.handles_reused += 1
+        return handle[0]
+
+    def upstream(self, symbol, name, args, kwargs):
+        value = getattr(self.ticker(symbol), name)
+        return value(*args, **kwargs) if callable(value) else value
+
+    def upstream_download(self, symbols, kwargs):
+        import yfinance as yf
+        return yf.download(symbols, session=self.session, **kwargs)
+
+    def stats(self):
+        stats = super().stats()
+        with self.lock:
+            stats.update({'Handles Created': self.handles_created, 'Handles Reused': self.handles_reused})
+        return stats
+
+
+class SimulatedProvider(MarketDataProvider):
+    """Offline stand-in returning deterministic synthetic data shaped like yfinance's, after `latency` seconds.
+
+    Every symbol gets its own random-walk history, so the same request always returns the same data.
+    """
+
+    def __init__(self, latency=0.05, end=None, years=5):
+        super().__init__()
+        self.latency = latency
+        self.end = pd.Timestamp(end or pd.Timestamp.today()).normalize()
+        self.years = years
+
+    def rng(self, symbol, salt=''):
+        return np.random.default_rng(zlib.crc32(f"{symbol}{salt}".encode()))
+
+    def upstream(self, symbol, name, args, kwargs):
+        time.sleep(self.latency)
+        generator = getattr(self, f"simulate_{name}", None)
+        if generator is None:
+            raise AttributeError(f"SimulatedProvider has no data for '{name}'")
+        return generator(symbol, *args, **kwargs)
+
+    def upstream_download(self, symbols, kwargs):
+        time.sleep(self.latency)
+        start, end = kwargs.get('start'), kwargs.get('end')
+        return pd.concat({symbol: self.simulate_history(symbol, start=start, end=end) for symbol in symbols}, axis=1)
+
+    def simulate_history(self, symbol, period=None, start=None, end=None, interval='1d'):
+        rng = self.rng(symbol)
+        dates = pd.bdate_range(end=self.end, periods=252 * self.years, name='Date')
+        close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, len(dates))))
+        if interval != '1d':
+            day = dates[-1]
+            dates = pd.date_range(day + pd.Timedelta(hours=9, minutes=30), day + pd.Timedelta(hours=15, minutes=59),
+                                  freq=interval.replace('m', 'min'), name='Datetime')
+            close = close[-1] * np.exp(np.cumsum(rng.normal(0, 0.001, len(dates))))
+        df = pd.DataFrame({'Open': close, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close,
+                           'Volume': rng.integers(1e5, 1e7, len(dates)), 'Dividends': 0.0, 'Stock Splits': 0.0},
+                          index=dates)
+        if start is not None:
+            df = df[df.index >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df.index < pd.Timestamp(end)]
+        return df
+
+    def simulate_info(self, symbol):
+        rng = self.rng(symbol, 'info')
+        return {'symbol': symbol, 'shortName': f"{symbol} Inc.", 'sector': ['Technology', 'Energy', 'Health'][
+            rng.integers(3)], 'marketCap': float(rng.integers(1e9, 1e12)), 'trailingPE': float(rng.uniform(5, 40))}
+
+    def simulate_dividends(self, symbol):
+        dates = pd.date_range(end=self.end, periods=8, freq='QS', name='Date')
+        return pd.Series(np.round(self.rng(symbol, 'dividends').uniform(0.1, 1.0, len(dates)), 2), index=dates,
+                         name='Dividends')
+
+    def simulate_earnings_dates(self, symbol):
+        dates = pd.date_range(end=self.end + pd.DateOffset(months=3), periods=8, freq='QS',
+                              name='Earnings Date')
+        rng = self.rng(symbol, 'earnings')
+        return pd.DataFrame({'EPS Estimate': rng.uniform(0.5, 2, len(dates)),
+                             'Reported EPS': rng.uniform(0.5, 2, len(dates))}, index=dates)
+
+    def simulate_news(self, symbol):
+        published = int(self.end.timestamp())
+        return [{'id': f"{symbol}-{i}", 'title': f"{symbol} headline {i}", 'publisher': 'Simulated Wire',
+                 'link': f"https://example.com/{symbol}/{i}", 'providerPublishTime': published - 3600 * i}
+                for i in range(5)]
+
+    def simulate_options(self, symbol):
+        return tuple(f"{day:%Y-%m-%d}" for day in pd.date_range(self.end, periods=4, freq='W-FRI'))
+
+    def simulate_option_chain(self, symbol, expiration):
+        spot = float(self.simulate_history(symbol)['Close'].iloc[-1])
+        strikes = np.round(spot * np.linspace(0.8, 1.2, 21), 1)
+        rng = self.rng(symbol, expiration)
+
+        def side(intrinsic):
+            price = np.maximum(intrinsic, 0) + rng.uniform(0.5, 3, len(strikes))
+            return pd.DataFrame({'contractSymbol': [f"{symbol}{expiration}{k}" for k in strikes], 'strike': strikes,
+                                 'lastPrice': price, 'bid': price * 0.98, 'ask': price * 1.02,
+                                 'volume': rng.integers(0, 1000, len(strikes)),
+                                 'openInterest': rng.integers(0, 5000, len(strikes)),
+                                 'impliedVolatility': rng.uniform(0.15, 0.6, len(strikes))})
+        return types.SimpleNamespace(calls=side(spot - strikes), puts=side(strikes - spot))
+
+    def simulate_statement(self, symbol, items, periods, freq):
+        dates = pd.date_range(end=self.end, periods=periods, freq=freq)[::-1]
+        rng = self.rng(symbol, ''.join(items) + freq)
+        return pd.DataFrame(rng.uniform(1e8, 1e10, (len(items), len(dates))), index=items, columns=dates)
+
+    def simulate_balance_sheet(self, symbol):
+        return self.simulate_statement(symbol, ['Total Assets', 'Total Debt', 'Stockholders Equity'], 4, 'YE')
+
+    def simulate_quarterly_balance_sheet(self, symbol):
+        return self.simulate_statement(symbol, ['Total Assets', 'Total Debt', 'Stockholders Equity'], 5, 'QE')
+
+    def simulate_income_stmt(self, symbol):
+        return self.simulate_statement(symbol, ['Total Revenue', 'Net Income', 'Diluted EPS'], 4, 'YE')
+
+    def simulate_quarterly_income_stmt(self, symbol):
+        return self.simulate_statement(symbol, ['Total Revenue', 'Net Income', 'Diluted EPS'], 5, 'QE')
+
+    def simulate_cashflow(self, symbol):
+        return self.simulate_statement(symbol, ['Operating Cash Flow', 'Free Cash Flow'], 4, 'YE')
+
+    def simulate_quarterly_cashflow(self, symbol):
+        return self.simulate_statement(symbol, ['Operating Cash Flow', 'Free Cash Flow'], 5, 'QE')
+
+
+_SHARED = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_provider():
+    """The process-wide YFinanceProvider, so every YFDownload shares its session, handles and in-flight calls."""
+    with _SHARED_LOCK:
+        if 'yfinance' not in _SHARED:
+            _SHARED['yfinance'] = YFinanceProvider()
+        return _SHARED['yfinance']
@@ -1,11 +1,31 @@
 import os
+import threading
 import pandas as pd
+from data_store import DataStore, FrameCache
+from quote_index import QuoteIndex
+from news_store import NewsStore
+
 
 class DataRetriever:
-    def __init__(self, directory='AK47_Finance/Data'):
+    def __init__(self, directory='AK47_Finance/Data', cache_bytes=256 * 1024 * 1024):
         self.directory = directory
         self.portfolios_directory = os.path.join(self.directory, 'Portfolios')
         self.historical_data_directory = self.directory
+        self.store = DataStore(self.historical_data_directory)
+        self.cache = FrameCache(cache_bytes)
+        self.quotes = QuoteIndex(self.store)
+        self.news = NewsStore(self.store)
+        self.lock = threading.Lock()  # GUI loader threads share one retriever
+
+    def read_cached_history(self, ticker_symbol, columns=None):
+        """Read a ticker's history through the frame cache. Returns None if no history is stored."""
+        path = self.store.find_file(ticker_symbol, 'historical_data')
+        if path is None:
+            return None
+        return self.cache.get(path, lambda: self.store.read_history(ticker_symbol, columns=columns), columns)
+
+    def cache_stats(self):
+        return self.cache.stats()
 
     def load_all_portfolios(self):
         """Load all portfolios from the directory."""
@@ -16,13 +36,11 @@ class DataRetriever:
             portfolios[name] = pd.read_csv(path).set_index('Ticker')['Shares'].to_dict()
         return portfolios
 
-    def retrieve_historical_data(self, ticker_symbol):
-        data_file_path = os.path.join(self.directory, ticker_symbol, f"{ticker_symbol}_historical_data.csv")
-        if os.path.exists(data_file_path):
-            return pd.read_csv(data_file_path, index_col='Date', parse_dates=True)
-        else:
+    def retrieve_historical_data(self, ticker_symbol, columns=None):
+        data = self.read_cached_history(ticker_symbol, columns=columns)
+        if data is None:
             print(f"No data found for {ticker_symbol}.")
-            return None
+        return data
 
     def retrieve_all_historical_data_for_portfolio(self, portfolio):
         historical_data = {}
@@ -33,13 +51,18 @@ class DataRetriever:
                     historical_data[ticker_symbol] = data
         return historical_data
 
-    def retrieve_news_for_ticker(self, ticker_symbol):
-        news_file_path = os.path.join(self.directory, ticker_symbol, f"{ticker_symbol}_News.csv")
-        if os.path.exists(news_file_path):
-            return pd.read_csv(news_file_path)
-        else:
+    def retrieve_news_for_ticker(self, ticker_symbol, limit=20):
+        """Return the `limit` most recent stored articles for a ticker, newest first, or None if there are none."""
+        self.news.refresh()
+        news = self.news.latest(ticker_symbol, limit)
+        if news.empty:
             print(f"No news found for {ticker_symbol}.")
             return None
+        return news
+
+    def search_news(self, query, tickers=None, start=None, end=None, limit=20):
+        self.news.refresh()
+        return self.news.search(query, tickers, start, end, limit)
 
     def retrieve_all_news_for_portfolio(self, portfolio):
         news_data = {}
@@ -61,24 +84,24 @@ class DataRetriever:
         detailed_values = {}
         total_portfolio_value = 0
 
+        # Latest closes come from the quote index; entries whose history file changed are rebuilt first,
+        # by one thread at a time so concurrent loads neither rebuild nor save the index twice
+        tickers = [ticker for ticker in portfolio['Ticker'] if ticker != 'Cash']
+        with self.lock:
+            self.quotes.refresh()
+            self.quotes.check(tickers)
+            latest_closes = {ticker: self.quotes.latest_close(ticker) for ticker in tickers}
+
         # First pass to calculate total portfolio value
-        for index, row in portfolio.iterrows():
-            ticker, shares = row['Ticker'], row['Shares']
-            if ticker != 'Cash':
-                data_file_path = os.path.join(self.historical_data_directory, ticker, f"{ticker}_historical_data.csv")
-                if os.path.exists(data_file_path):
-                    hist_data = pd.read_csv(data_file_path, index_col='Date', parse_dates=True)
-                    latest_close = hist_data['Close'].iloc[0]
-                    total_portfolio_value += latest_close * shares
+        for ticker, shares in zip(portfolio['Ticker'], portfolio['Shares']):
+            if ticker != 'Cash' and latest_closes[ticker] is not None:
+                total_portfolio_value += latest_closes[ticker] * shares
 
         # Second pass to calculate individual details and weights
-        for index, row in portfolio.iterrows():
-            ticker, shares = row['Ticker'], row['Shares']
+        for ticker, shares in zip(portfolio['Ticker'], portfolio['Shares']):
             if ticker != 'Cash':
-                data_file_path = os.path.join(self.historical_data_directory, ticker, f"{ticker}_historical_data.csv")
-                if os.path.exists(data_file_path):
-                    hist_data = pd.read_csv(data_file_path, index_col='Date', parse_dates=True)
-                    latest_close = hist_data['Close'].iloc[0]
+                latest_close = latest_closes[ticker]
+                if latest_close is not None:
                     total_value = latest_close * shares
                     weight = (total_value / total_portfolio_value) * 100
                     detailed_values[ticker] = {'Shares': shares, 'Value': latest_close, 'Total Value': total_value, 'Weight': weight}
@@ -0,0 +1,360 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401 - only needed for the columnar formats
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+FILE_EXTENSIONS = {'csv': '.csv', 'parquet': '.parquet', 'feather': '.feather'}
+DEFAULT_FORMAT = 'parquet' if HAS_PYARROW else 'csv'
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume', 'Dividends', 'Stock Splits']
+UNNAMED_INDEX_LABELS = ('index', 'Unnamed: 0')  # what CSV and Arrow call an index written without a name
+
+
+def parse_dates(values):
+    """Parse stored date strings, dropping the UTC offset yfinance appends so bars keep their exchange-local time."""
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        if getattr(values.dt, 'tz', None) is not None:
+            values = values.dt.tz_localize(None)
+        return pd.DatetimeIndex(values)
+    return pd.DatetimeIndex(pd.to_datetime(values.astype(str).str.slice(0, 19)))
+
+
+class DataStore:
+    """Per-ticker data store under `<directory>/<TICKER>/<TICKER>_<dataset>.<ext>` with pluggable file formats."""
+
+    def __init__(self, directory="Data", file_format=None):
+        self.directory = directory
+        self.file_format = file_format or DEFAULT_FORMAT
+        if self.file_format not in FILE_EXTENSIONS:
+            raise ValueError(f"Unsupported file format: {self.file_format}")
+        if self.file_format != 'csv' and not HAS_PYARROW:
+            raise ImportError(f"pyarrow is required for the {self.file_format} format")
+
+    def file_path(self, ticker_symbol, dataset, directory=None, file_format=None):
+        """Return the path a dataset is written to in the given (or the store's) format."""
+        directory = ticker_symbol if directory is None else directory
+        extension = FILE_EXTENSIONS[file_format or self.file_format]
+        return os.path.join(self.directory, directory, f"{ticker_symbol}_{dataset}{extension}")
+
+    def find_file(self, ticker_symbol, dataset, directory=None):
+        """Return the existing file for a dataset, preferring the store's format, or None."""
+        formats = [self.file_format] + [f for f in FILE_EXTENSIONS if f != self.file_format]
+        for file_format in formats:
+            if file_format != 'csv' and not HAS_PYARROW:
+                continue
+            path = self.file_path(ticker_symbol, dataset, directory, file_format)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def exists(self, ticker_symbol, dataset, directory=None):
+        return self.find_file(ticker_symbol, dataset, directory) is not None
+
+    def write(self, df, ticker_symbol, dataset, directory=None, index=True):
+        """Write a frame in the store's format and remove copies of the dataset left in other formats."""
+        path = self.file_path(ticker_symbol, dataset, directory)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_frame(df, path, index=index)
+        for file_format in FILE_EXTENSIONS:
+            stale_path = self.file_path(ticker_symbol, dataset, directory, file_format)
+            if stale_path != path and os.path.exists(stale_path):
+                os.remove(stale_path)
+        return path
+
+    def read(self, ticker_symbol, dataset, columns=None, index_col=None, directory=None):
+        """Read a dataset, loading only `columns` (plus the index) when given. Returns None if it is missing."""
+        path = self.find_file(ticker_symbol, dataset, directory)
+        if path is None:
+            return None
+        return read_frame(path, columns=columns, index_col=index_col)
+
+    def write_history(self, df, ticker_symbol, dataset="historical_data", directory=None):
+        """Write a Date-indexed history in canonical (ascending, tz-naive, one bar per date) order."""
+        return self.write(canonical_history(df), ticker_symbol, dataset, directory=directory, index=True)
+
+    def read_history(self, ticker_symbol, columns=None, dataset="historical_data", directory=None):
+        """Read a Date-indexed price history with a tz-naive DatetimeIndex."""
+        df = self.read(ticker_symbol, dataset, columns=columns, index_col='Date', directory=directory)
+        if df is not None:
+            df.index = parse_dates(df.index)
+            df.index.name = 'Date'
+        return df
+
+    def history_bounds(self, ticker_symbol, dataset="historical_data", directory=None):
+        """Return (first_date, last_date) of a stored history without parsing the whole file, or None."""
+        path = self.find_file(ticker_symbol, dataset, directory)
+        if path is None:
+            return None
+        if path.endswith('.csv'):
+            return _csv_edge_dates(path)
+        dates = read_frame(path, columns=['Date'])['Date']
+        if dates.empty:
+            return None
+        dates = parse_dates(dates)
+        return dates[0], dates[-1]
+
+    def append_history(self, new_data, ticker_symbol, dataset="historical_data", directory=None):
+        """Merge new bars into a stored history; stored bars within the new date range are replaced.
+
+        When the new bars reach the end of a CSV file in canonical order, the file is truncated and
+        appended in place, touching only its tail. Otherwise (columnar files, windows in the middle
+        of the history, legacy descending CSVs) the merged history is rewritten.
+        """
+        new_data = canonical_history(new_data)
+        path = self.find_file(ticker_symbol, dataset, directory)
+        if new_data.empty:
+            return path
+        if path is None:
+            return self.write_history(new_data, ticker_symbol, dataset, directory)
+        if path == self.file_path(ticker_symbol, dataset, directory) and path.endswith('.csv'):
+            bounds = _csv_edge_dates(path)
+            if bounds is not None and bounds[0] <= bounds[1] <= new_data.index[-1]:
+                columns = pd.read_csv(path, nrows=0).columns
+                if _truncate_csv_from(path, new_data.index[0]):
+                    new_data = new_data.reindex(columns=[c for c in columns if c != 'Date'])
+                    new_data.to_csv(path, mode='a', header=False)
+                    return path
+        existing = self.read_history(ticker_symbol, dataset=dataset, directory=directory)
+        existing = existing[(existing.index < new_data.index[0]) | (existing.index > new_data.index[-1])]
+        if not existing.empty:
+            new_data = new_data.reindex(columns=existing.columns.union(new_data.columns, sort=False))
+        return self.write_history(pd.concat([existing, new_data]), ticker_symbol, dataset, directory)
+
+
+def canonical_history(df):
+    """Return a history sorted ascending by a tz-naive Date index with duplicate bars removed (last wins)."""
+    df = df.copy()
+    df.index = parse_dates(df.index)
+    df.index.name = 'Date'
+    df = df[~df.index.duplicated(keep='last')]
+    return df.sort_index()
+
+
+def _csv_date(line):
+    return pd.Timestamp(line.split(b',', 1)[0][:19].decode())
+
+
+def _csv_edge_dates(path, block_size=8192):
+    """Read the first and last dates of a Date-first CSV from its head and tail only."""
+    with open(path, 'rb') as file:
+        file.readline()
+        first_line = file.readline().strip()
+        if not first_line:
+            return None
+        file.seek(0, os.SEEK_END)
+        file.seek(max(0, file.tell() - block_size))
+        last_line = [line for line in file.read().splitlines() if line.strip()][-1]
+    return _csv_date(first_line), _csv_date(last_line)
+
+
+def _truncate_csv_from(path, cutoff, block_size=65536):
+    """Cut trailing rows dated on or after `cutoff` from an ascending CSV. Returns False if they extend past the tail block."""
+    with open(path, 'rb+') as file:
+        file.seek(0, os.SEEK_END)
+        size = file.tell()
+        offset = max(0, size - block_size)
+        file.seek(offset)
+        block = file.read()
+        lines = block.splitlines(keepends=True)
+        positions = []
+        position = offset
+        for line in lines:
+            positions.append(position)
+            position += len(line)
+        truncate_at = size
+        for index in range(len(lines) - 1, -1, -1):
+            if index == 0 and offset > 0:
+                return False  # the first line of the block may be partial
+            line = lines[index].strip()
+            if not line:
+                truncate_at = positions[index]
+                continue
+            try:
+                line_date = _csv_date(line)
+            except ValueError:
+                break  # reached the header
+            if line_date < cutoff:
+                break
+            truncate_at = positions[index]
+        if truncate_at < size:
+            file.truncate(truncate_at)
+        elif not block.endswith(b'\n'):
+            file.write(b'\n')
+    return True
+
+
+def write_frame(df, path, index=True):
+    """Write a frame to `path`, picking the format from the file extension."""
+    if path.endswith('.csv'):
+        df.to_csv(path, index=index)
+        return
+    df = df.reset_index() if index else df.reset_index(drop=True)
+    df = _prepare_binary_frame(df)
+    if path.endswith('.parquet'):
+        df.to_parquet(path, index=False)
+    else:
+        df.to_feather(path)
+
+
+def read_frame(path, columns=None, index_col=None):
+    """Read a frame written by `write_frame`, projecting to `columns` where the format allows it.
+
+    `index_col` is a column name or a position; an index written without a name comes back unnamed
+    whatever the format (CSV labels it 'Unnamed: 0', the binary formats 'index').
+    """
+    positional = isinstance(index_col, int)
+    requested = None
+    if columns is not None:
+        columns = list(columns)
+        if positional:
+            requested, columns = columns, None  # the label column's name is only known after reading
+        elif index_col is not None and index_col not in columns:
+            columns = [index_col] + columns
+    if path.endswith('.csv'):
+        df = pd.read_csv(path, usecols=columns)
+    elif path.endswith('.parquet'):
+        df = pd.read_parquet(path, columns=columns)
+    else:
+        df = pd.read_feather(path, columns=columns)
+    if positional:
+        index_col = df.columns[index_col]
+    if index_col is not None and index_col in df.columns:
+        df = df.set_index(index_col)
+        if df.index.name in UNNAMED_INDEX_LABELS:
+            df.index.name = None
+    return df if requested is None else df[requested]
+
+
+def _column_label(column):
+    """A column name as CSV writes it, so date-labelled columns (statements) match across formats."""
+    if isinstance(column, pd.Timestamp) and column == column.normalize():
+        return column.strftime('%Y-%m-%d')
+    return str(column)
+
+
+def _prepare_binary_frame(df):
+    """Make a frame storable by Arrow: string column names and no mixed-type object columns."""
+    df = df.copy()
+    df.columns = [_column_label(column) for column in df.columns]
+    for column in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[column]) and getattr(df[column].dt, 'tz', None) is not None:
+            df[column] = df[column].dt.tz_localize(None)
+        elif df[column].dtype == object:
+            df[column] = df[column].map(lambda value: value if value is None or isinstance(value, str) else str(value))
+    for column in PRICE_COLUMNS:
+        if column in df.columns and pd.api.types.is_numeric_dtype(df[column]):
+            df[column] = df[column].astype('float64')
+    return df
+
+
+class FrameCache:
+    """Bounded LRU cache of parsed frames keyed on file path, mtime, size and column projection.
+
+    Entries are evicted least-recently-used first once their combined memory footprint exceeds
+    `max_bytes`. A file whose mtime or size changed no longer matches its old entries, which are
+    dropped on the next lookup.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # (path, mtime_ns, size, columns) -> (frame, nbytes)
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.lock = threading.Lock()
+
+    def get(self, path, loader, columns=None):
+        """Return the cached frame for `path`, calling `loader()` to parse it on a miss."""
+        stat = os.stat(path)
+        columns = tuple(columns) if columns is not None else None
+        key = (path, stat.st_mtime_ns, stat.st_size, columns)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[0].copy(deep=False)
+            self.misses += 1
+            self.invalidate(path, keep=(stat.st_mtime_ns, stat.st_size))
+        frame = loader()
+        if frame is not None:
+            self.put(key, frame)
+            frame = frame.copy(deep=False)
+        return frame
+
+    def put(self, key, frame):
+        nbytes = int(frame.memory_usage(deep=True).sum()) + frame.index.memory_usage(deep=True)
+        if nbytes > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self.current_bytes -= self.entries.pop(key)[1]
+            self.entries[key] = (frame, nbytes)
+            self.current_bytes += nbytes
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self.entries.popitem(last=False)
+                self.current_bytes -= evicted_bytes
+                self.evictions += 1
+
+    def invalidate(self, path, keep=None):
+        """Drop entries for `path` (other than those matching the `keep` (mtime_ns, size) version)."""
+        stale = [key for key in self.entries if key[0] == path and key[1:3] != keep]
+        for key in stale:
+            self.current_bytes -= self.entries.pop(key)[1]
+            self.invalidations += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        return {'Hits': self.hits, 'Misses': self.misses, 'Evictions': self.evictions,
+                'Invalidations': self.invalidations, 'Entries': len(self.entries), 'Bytes': self.current_bytes}
+
+
+def migrate_csv_tree(directory="Data", file_format=None, remove_csv=False):
+    """Convert every CSV under `directory` (except portfolios) to the given format. Returns the number of files converted."""
+    store = DataStore(directory, file_format)
+    if store.file_format == 'csv':
+        print("Target format is csv; nothing to migrate.")
+        return 0
+    converted = 0
+    for root, _, files in os.walk(directory):
+        if os.path.basename(root) == 'Portfolios':
+            continue
+        for file_name in files:
+            if not file_name.endswith('.csv'):
+                continue
+            csv_path = os.path.join(root, file_name)
+            target_path = csv_path[:-4] + FILE_EXTENSIONS[store.file_format]
+            try:
+                df = pd.read_csv(csv_path)
+                if 'Date' in df.columns:
+                    df['Date'] = parse_dates(df['Date']).values
+                write_frame(df, target_path, index=False)
+                if remove_csv:
+                    os.remove(csv_path)
+                converted += 1
+            except Exception as e:
+                print(f"Error migrating {csv_path}: {e}")
+    print(f"Migrated {converted} files under {directory} to {store.file_format}.")
+    return converted
+
+
+if __name__ == "__main__":
+    # python data_store.py migrate [Data] [parquet|feather]
+    if len(sys.argv) > 1 and sys.argv[1] == 'migrate':
+        migrate_csv_tree(sys.argv[2] if len(sys.argv) > 2 else "Data",
+                         sys.argv[3] if len(sys.argv) > 3 else None)
+    else:
+        print("Usage: python data_store.py migrate [data directory] [parquet|feather]")
@@ -0,0 +1,146 @@
+import copy
+import time
+import random
+import threading
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
+# Dataset name -> YFDownload method taking a ticker symbol
+DATASET_METHODS = {
+    'historical_data': 'download_historical_data',
+    'history_update': 'update_historical_data',
+    'Info': 'download_stock_info',
+    'Earnings_Dates': 'download_earnings_dates',
+    'Options': 'download_stock_options',
+    'Dividends': 'download_dividends',
+    'News': 'download_stock_news',
+    'Balance_Sheet': 'download_balance_sheet',
+    'Income_Stmt': 'download_income_statement',
+    'Cash_Flows': 'download_cash_flows',
+}
+ALL_DATASETS = ['historical_data', 'Info', 'Earnings_Dates', 'Options', 'Dividends', 'News',
+                'Balance_Sheet', 'Income_Stmt', 'Cash_Flows']
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing `rate` calls per second with bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class DownloadReport:
+    """Outcome of a scheduler run: one record per (ticker, dataset) job plus the values returned."""
+
+    def __init__(self):
+        self.records = []
+        self.values = {}
+        self.elapsed = 0.0
+
+    def add(self, ticker_symbol, dataset, status, attempts, seconds, error=None, value=None):
+        self.records.append({'Ticker': ticker_symbol, 'Dataset': dataset, 'Status': status,
+                             'Attempts': attempts, 'Seconds': seconds, 'Error': error})
+        if status == 'ok':
+            self.values[(ticker_symbol, dataset)] = value
+
+    @property
+    def succeeded(self):
+        return [r for r in self.records if r['Status'] == 'ok']
+
+    @property
+    def failed(self):
+        return [r for r in self.records if r['Status'] != 'ok']
+
+    def to_frame(self):
+        return pd.DataFrame(self.records, columns=['Ticker', 'Dataset', 'Status', 'Attempts', 'Seconds', 'Error'])
+
+    def summary(self):
+        retries = sum(r['Attempts'] - 1 for r in self.records)
+        rate = len(self.records) / self.elapsed if self.elapsed else 0.0
+        return (f"{len(self.succeeded)} of {len(self.records)} downloads succeeded, {len(self.failed)} failed, "
+                f"{retries} retries, {self.elapsed:.2f}s ({rate:.1f} jobs/s)")
+
+
+class DownloadScheduler:
+    """Runs (ticker, dataset) download jobs for a YFDownload on a thread pool.
+
+    Every attempt takes a token from a shared bucket, failed attempts are retried with exponential
+    backoff and full jitter, and a failing ticker never stops the others: each job ends up as one
+    record in the returned DownloadReport instead of a printed error.
+    """
+
+    def __init__(self, downloader, max_workers=8, rate=5.0, burst=None, max_retries=3,
+                 base_delay=0.5, max_delay=30.0, seed=None):
+        self.downloader = copy.copy(downloader)  # shares the store, but raises errors so they can be retried
+        self.downloader.raise_errors = True
+        self.downloader.defer_saves = True  # a freshness manifest is saved once at the end of each run
+        self.max_workers = max_workers
+        self.bucket = TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.random = random.Random(seed)
+
+    def dataset_function(self, dataset):
+        if dataset.startswith('intraday_'):
+            interval = dataset[len('intraday_'):]
+            return lambda ticker_symbol: self.downloader.download_intraday_data(ticker_symbol, interval)
+        if dataset == 'history_update':
+            return lambda ticker_symbol: self.downloader.history_updater.update(ticker_symbol, save=False)
+        return getattr(self.downloader, DATASET_METHODS[dataset])
+
+    def backoff_delay(self, attempt):
+        return self.random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def run_job(self, ticker_symbol, dataset):
+        function = self.dataset_function(dataset)
+        start = time.perf_counter()
+        for attempt in range(1, self.max_retries + 2):
+            self.bucket.acquire()
+            try:
+                value = function(ticker_symbol)
+                return ticker_symbol, dataset, 'ok', attempt, time.perf_counter() - start, None, value
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                if attempt > self.max_retries:
+                    break
+                time.sleep(self.backoff_delay(attempt - 1))
+        return ticker_symbol, dataset, 'failed', attempt, time.perf_counter() - start, error, None
+
+    def run(self, jobs):
+        """Run an iterable of (ticker, dataset) jobs and return a DownloadReport."""
+        jobs = list(jobs)
+        report = DownloadReport()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self.run_job, ticker_symbol, dataset) for ticker_symbol, dataset in jobs]
+            for future in futures:
+                report.add(*future.result())
+        if any(dataset == 'history_update' for _, dataset in jobs):
+            self.downloader.history_updater.save_watermarks()
+        if getattr(self.downloader, 'freshness', None) is not None:
+            self.downloader.freshness.save()
+        report.elapsed = time.perf_counter() - start
+        return report
+
+    def download(self, ticker_symbols, datasets=None):
+        """Download every dataset in `datasets` (default: all of them) for every ticker."""
+        datasets = datasets or ALL_DATASETS
+        return self.run([(ticker_symbol, dataset) for ticker_symbol in ticker_symbols for dataset in datasets])
@@ -0,0 +1,190 @@
+import os
+import json
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+from data_store import FrameCache
+from quote_index import file_version
+
+MANIFEST_COLUMNS = ['Ticker', 'Hash', 'Version', 'Rows', 'Last Date', 'First Close', 'Last Close']
+
+# The features the prediction notebooks build by hand
+NOTEBOOK_FEATURES = [
+    {'name': 'MA_10', 'op': 'rolling_mean', 'column': 'Close', 'window': 10},
+    {'name': 'MA_50', 'op': 'rolling_mean', 'column': 'Close', 'window': 50},
+    {'name': 'MA_Diff', 'op': 'diff', 'left': 'MA_10', 'right': 'MA_50'},
+    {'name': 'Tomorrow', 'op': 'forward', 'column': 'Close', 'horizon': 1},
+    {'name': 'Target', 'op': 'target', 'column': 'Close', 'horizon': 1},
+]
+
+
+def _up_days(column):
+    return (column > column.shift(1)).astype(np.float64).where(column.shift(1).notna())
+
+
+# op -> (function(columns, feature) -> Series, rows of history it looks back, rows it looks ahead)
+OPERATIONS = {
+    'column': (lambda c, f: c[f['column']], lambda f: 0, lambda f: 0),
+    'rolling_mean': (lambda c, f: c[f['column']].rolling(f['window']).mean(), lambda f: f['window'], lambda f: 0),
+    'rolling_std': (lambda c, f: c[f['column']].rolling(f['window']).std(), lambda f: f['window'], lambda f: 0),
+    'ratio_to_mean': (lambda c, f: c[f['column']] / c[f['column']].rolling(f['window']).mean(),
+                      lambda f: f['window'], lambda f: 0),
+    'return': (lambda c, f: c[f['column']] / c[f['column']].shift(f.get('window', 1)) - 1,
+               lambda f: f.get('window', 1), lambda f: 0),
+    'lag': (lambda c, f: c[f['column']].shift(f['lag']), lambda f: f['lag'], lambda f: 0),
+    'trend': (lambda c, f: _up_days(c[f['column']]).shift(1).rolling(f['window']).sum(),
+              lambda f: f['window'] + 1, lambda f: 0),
+    'diff': (lambda c, f: c[f['left']] - c[f['right']], lambda f: 0, lambda f: 0),
+    'ratio': (lambda c, f: c[f['left']] / c[f['right']], lambda f: 0, lambda f: 0),
+    'forward': (lambda c, f: c[f['column']].shift(-f['horizon']), lambda f: 0, lambda f: f['horizon']),
+    'forward_return': (lambda c, f: c[f['column']].shift(-f['horizon']) / c[f['column']] - 1,
+                       lambda f: 0, lambda f: f['horizon']),
+    'target': (lambda c, f: (c[f['column']].shift(-f['horizon']) > c[f['column']]).astype(np.float64)
+               .where(c[f['column']].shift(-f['horizon']).notna()), lambda f: 0, lambda f: f['horizon']),
+}
+
+
+def definition_hash(features):
+    """Stable hash of a feature set's definitions (order included)."""
+    return hashlib.sha1(json.dumps(features, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def lookback_and_lookahead(features):
+    """Rows of earlier history needed to compute a new row, and trailing rows that change when bars are appended.
+
+    Features built on other features (diff, ratio) add the lookback of their inputs.
+    """
+    lookbacks, lookaheads = {}, {}
+    for feature in features:
+        _, lookback, lookahead = OPERATIONS[feature['op']]
+        inputs = [feature[key] for key in ('column', 'left', 'right') if key in feature]
+        lookbacks[feature['name']] = lookback(feature) + max([lookbacks.get(i, 0) for i in inputs] or [0])
+        lookaheads[feature['name']] = lookahead(feature) + max([lookaheads.get(i, 0) for i in inputs] or [0])
+    return max(lookbacks.values(), default=0), max(lookaheads.values(), default=0)
+
+
+def compute_features(history, features):
+    """Evaluate a feature set over a Date-indexed price history. Later features may use earlier ones."""
+    columns = {column: history[column].astype(np.float64) for column in history.columns}
+    for feature in features:
+        columns[feature['name']] = OPERATIONS[feature['op']][0](columns, feature)
+    return pd.DataFrame({feature['name']: columns[feature['name']] for feature in features}, index=history.index)
+
+
+def edge_closes(history, rows):
+    """Close of the first and of the `rows`-th bar of a history (NaN without closes)."""
+    if 'Close' not in history or not rows:
+        return np.nan, np.nan
+    return float(history['Close'].iloc[0]), float(history['Close'].iloc[rows - 1])
+
+
+def same_closes(history, rows, entry):
+    """True if the history's first `rows` bars still have the closes the cached features were computed from."""
+    if 'Close' not in history:
+        return True
+    recorded = np.array([entry.get('First Close', np.nan), entry.get('Last Close', np.nan)], dtype=np.float64)
+    return bool(np.allclose(edge_closes(history, rows), recorded, rtol=1e-12, atol=0.0))
+
+
+class FeatureStore:
+    """Feature sets computed from the local price store, cached per ticker and feature-set hash.
+
+    Frames live in `<directory>/<TICKER>/Features/<TICKER>_<hash>.<ext>`; `Features/manifest.csv`
+    records the history file version, row count, last date and first and last closes each was
+    computed from. When bars have only been appended since, just the new rows (plus the trailing rows
+    whose forward-looking values were still unknown) are computed from a window of `lookback` earlier
+    bars. A rewritten history (re-adjusted after a split or dividend) keeps its dates but changes the
+    closes, so it is rebuilt in full.
+    """
+
+    def __init__(self, store, manifest_file=None, cache_bytes=256 * 1024 * 1024):
+        self.store = store
+        self.cache = FrameCache(cache_bytes)
+        self.manifest_file = manifest_file or os.path.join(store.directory, 'Features', 'manifest.csv')
+        self.lock = threading.Lock()
+        self.manifest = self.load_manifest()
+        self.rows_computed = 0
+        self.rows_reused = 0
+
+    def load_manifest(self):
+        if not os.path.exists(self.manifest_file):
+            return {}
+        df = pd.read_csv(self.manifest_file, dtype={'Version': str}, parse_dates=['Last Date'])
+        return {(row['Ticker'], row['Hash']): row for row in df.to_dict('records')}
+
+    def save_manifest(self):
+        with self.lock:
+            os.makedirs(os.path.dirname(self.manifest_file), exist_ok=True)
+            pd.DataFrame(list(self.manifest.values()),
+                         columns=MANIFEST_COLUMNS).to_csv(self.manifest_file, index=False)
+
+    def get(self, ticker_symbol, features, save=True):
+        """Return the feature frame of a ticker, computing only what its stored history added. None if no history."""
+        key = (ticker_symbol, definition_hash(features))
+        path = self.store.find_file(ticker_symbol, 'historical_data')
+        if path is None:
+            print(f"No historical data found for {ticker_symbol}.")
+            return None
+        version = file_version(path)
+        entry = self.manifest.get(key)
+        cached = self.read_cached(ticker_symbol, key[1]) if entry is not None else None
+        if cached is not None:
+            if entry['Version'] == version:
+                self.rows_reused += len(cached)
+                return cached
+        history = self.store.read_history(ticker_symbol)
+        lookback, lookahead = lookback_and_lookahead(features)
+        rows = len(cached) if cached is not None else 0
+        appended = (cached is not None and rows <= len(history) and rows > lookahead and
+                    history.index[rows - 1] == pd.Timestamp(entry['Last Date']) and history.index[0] == cached.index[0]
+                    and same_closes(history, rows, entry))
+        if appended:
+            keep = rows - lookahead
+            tail = compute_features(history.iloc[max(0, keep - lookback):], features).iloc[keep - max(0, keep - lookback):]
+            frame = pd.concat([cached.iloc[:keep], tail])
+            self.rows_reused += keep
+            self.rows_computed += len(tail)
+        else:
+            frame = compute_features(history, features)
+            self.rows_computed += len(frame)
+        frame.index.name = 'Date'
+        feature_path = self.store.write(frame, ticker_symbol, key[1], directory=f"{ticker_symbol}/Features")
+        stat = os.stat(feature_path)
+        self.cache.put((feature_path, stat.st_mtime_ns, stat.st_size, None), frame)
+        first_close, last_close = edge_closes(history, len(frame))
+        self.manifest[key] = {'Ticker': ticker_symbol, 'Hash': key[1], 'Version': version, 'Rows': len(frame),
+                              'Last Date': frame.index[-1] if len(frame) else pd.NaT,
+                              'First Close': first_close, 'Last Close': last_close}
+        if save:
+            self.save_manifest()
+        return frame
+
+    def read_cached(self, ticker_symbol, feature_hash):
+        path = self.store.find_file(ticker_symbol, feature_hash, directory=f"{ticker_symbol}/Features")
+        if path is None:
+            return None
+
+        def load():
+            frame = self.store.read(ticker_symbol, feature_hash, index_col='Date', directory=f"{ticker_symbol}/Features")
+            frame.index = pd.DatetimeIndex(frame.index, name='Date')
+            return frame
+        return self.cache.get(path, load)
+
+    def get_many(self, tickers, features):
+        """Return {ticker: feature frame} for the tickers with stored history."""
+        frames = {}
+        for ticker in tickers:
+            frame = self.get(ticker, features, save=False)
+            if frame is not None:
+                frames[ticker] = frame
+        self.save_manifest()
+        return frames
+
+    def panel(self, tickers, features):
+        """Feature frames of many tickers stacked on a (Ticker, Date) index."""
+        frames = self.get_many(tickers, features)
+        return pd.concat(frames, names=['Ticker', 'Date']) if frames else pd.DataFrame(columns=[f['name'] for f in features])
+
+    def stats(self):
+        return {'Rows Computed': self.rows_computed, 'Rows Reused': self.rows_reused}
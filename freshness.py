@@ -0,0 +1,188 @@
+import os
+import sys
+import json
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+from data_store import DataStore
+from market_calendar import MarketCalendar
+from quote_index import file_version
+
+MANIFEST_COLUMNS = ['Symbol', 'Dataset', 'Fetched', 'Rows', 'Hash', 'Bytes', 'TTL']
+SESSION_TTL = 'session'  # fresh until the next session close (plus SESSION_DELAY) after the fetch
+SESSION_DELAY = pd.Timedelta(minutes=15)
+
+# Dataset -> how long a fetch stays fresh; intraday datasets ('intraday_1m', ...) share the 'intraday' entry.
+# Kept shorter than the refresh service's cadences so a scheduled run is never skipped as fresh.
+DEFAULT_TTLS = {
+    'historical_data': SESSION_TTL,
+    'Info': pd.Timedelta(days=1),
+    'Earnings_Dates': pd.Timedelta(days=7),
+    'Options': pd.Timedelta(minutes=30),
+    'Dividends': pd.Timedelta(days=1),
+    'News': pd.Timedelta(hours=1),
+    'Balance_Sheet': pd.Timedelta(days=3),
+    'Income_Stmt': pd.Timedelta(days=3),
+    'Cash_Flows': pd.Timedelta(days=3),
+    'intraday': pd.Timedelta(minutes=5),
+}
+
+
+def _update_digest(digest, payload):
+    if isinstance(payload, (pd.DataFrame, pd.Series)):
+        try:
+            digest.update(pd.util.hash_pandas_object(payload, index=True).values.tobytes())
+        except TypeError:  # unhashable cells (lists, dicts)
+            digest.update(payload.to_csv().encode())
+        if isinstance(payload, pd.DataFrame):
+            digest.update(repr(list(payload.columns)).encode())
+    elif isinstance(payload, (list, tuple)) and not any(isinstance(item, dict) for item in payload):
+        for item in payload:
+            _update_digest(digest, item)
+    elif isinstance(payload, (dict, list)):
+        digest.update(json.dumps(payload, sort_keys=True, default=str).encode())
+    else:
+        digest.update(repr(payload).encode())
+
+
+def content_hash(payload):
+    """Stable digest of a downloaded payload (frames, series, dicts, lists and tuples of them)."""
+    digest = hashlib.sha1()
+    _update_digest(digest, payload)
+    return digest.hexdigest()
+
+
+def fingerprint(payload):
+    """(content hash, rows, bytes) of a downloaded payload, as recorded in the manifest."""
+    rows, size = payload_size(payload)
+    return content_hash(payload), rows, size
+
+
+def payload_size(payload):
+    """Return (rows, bytes in memory) of a downloaded payload."""
+    if payload is None:
+        return 0, 0
+    if isinstance(payload, (pd.DataFrame, pd.Series)):
+        memory = payload.memory_usage(deep=True)
+        return len(payload), int(np.sum(memory))
+    if isinstance(payload, (list, tuple)) and not any(isinstance(item, dict) for item in payload):
+        sizes = [payload_size(item) for item in payload]
+        return sum(rows for rows, _ in sizes), sum(size for _, size in sizes)
+    if isinstance(payload, (dict, list)):
+        return len(payload), len(json.dumps(payload, default=str))
+    return 1, len(repr(payload))
+
+
+class FreshnessManifest:
+    """Fetch time, row count, content hash and size of every (symbol, dataset) download.
+
+    Downloads ask `skip_fetch` before calling the provider and `unchanged` before writing a payload,
+    and `record` the fetch only once its payload is stored (or skipped as unchanged), so a failed
+    write is retried by the next download. TTLs are per dataset and can be overridden; daily bars
+    stay fresh until the next session close. `record` does not save: callers `save` once per run.
+    Savings are counted in `stats` so callers can report them per run.
+    """
+
+    def __init__(self, store, manifest_file=None, ttls=None, calendar=None):
+        self.store = store
+        self.manifest_file = manifest_file or os.path.join(store.directory, 'freshness_manifest.csv')
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.calendar = calendar or MarketCalendar()
+        self.lock = threading.Lock()
+        self.loaded_version = None
+        self.entries = self.load()
+        self.stats = {'Fetches': 0, 'Calls Saved': 0, 'Writes Saved': 0, 'Bytes Saved': 0}
+
+    def load(self):
+        if not os.path.exists(self.manifest_file):
+            return {}
+        self.loaded_version = file_version(self.manifest_file)
+        df = pd.read_csv(self.manifest_file, parse_dates=['Fetched'], dtype={'Hash': str, 'TTL': str})
+        return {(row['Symbol'], row['Dataset']): row for row in df.to_dict('records')}
+
+    def refresh(self):
+        """Reload the manifest if another process rewrote it since it was loaded."""
+        if os.path.exists(self.manifest_file) and file_version(self.manifest_file) != self.loaded_version:
+            with self.lock:
+                self.entries = self.load()
+
+    def save(self):
+        with self.lock:
+            df = pd.DataFrame(list(self.entries.values()), columns=MANIFEST_COLUMNS)
+            os.makedirs(os.path.dirname(self.manifest_file) or '.', exist_ok=True)
+            df.to_csv(self.manifest_file, index=False)
+            self.loaded_version = file_version(self.manifest_file)
+
+    def ttl(self, dataset):
+        if dataset.startswith('intraday_') and dataset not in self.ttls:
+            dataset = 'intraday'
+        return self.ttls.get(dataset, pd.Timedelta(0))
+
+    def expires(self, dataset, fetched):
+        """When a fetch of `dataset` made at `fetched` (naive UTC) goes stale (naive UTC)."""
+        ttl = self.ttl(dataset)
+        if ttl != SESSION_TTL:
+            return fetched + pd.Timedelta(ttl)
+        moment = self.calendar.local(pd.Timestamp(fetched).tz_localize('UTC'))
+        day = self.calendar.next_session(moment)
+        if self.calendar.session_close(day) + SESSION_DELAY <= moment:
+            day = self.calendar.next_session(day, inclusive=False)
+        return (self.calendar.session_close(day) + SESSION_DELAY).tz_convert('UTC').tz_localize(None)
+
+    def is_fresh(self, symbol, dataset, now=None):
+        entry = self.entries.get((symbol, dataset))
+        if entry is None:
+            return False
+        now = now or pd.Timestamp.now(tz='UTC').tz_localize(None)
+        return now < self.expires(dataset, pd.Timestamp(entry['Fetched']))
+
+    def skip_fetch(self, symbol, dataset, now=None):
+        """True when the last fetch is still fresh; counts the call and bytes saved."""
+        if not self.is_fresh(symbol, dataset, now):
+            return False
+        with self.lock:
+            self.stats['Calls Saved'] += 1
+            self.stats['Bytes Saved'] += int(self.entries[(symbol, dataset)]['Bytes'])
+        return True
+
+    def unchanged(self, symbol, dataset, payload_fingerprint):
+        """True if a payload's `fingerprint` matches the last recorded fetch."""
+        entry = self.entries.get((symbol, dataset))
+        return entry is not None and entry['Hash'] == payload_fingerprint[0]
+
+    def record(self, symbol, dataset, payload_fingerprint, written=True, now=None):
+        """Record a completed fetch whose payload was written (or skipped as unchanged when `written` is False)."""
+        digest, rows, size = payload_fingerprint
+        now = now or pd.Timestamp.now(tz='UTC').tz_localize(None)
+        with self.lock:
+            self.entries[(symbol, dataset)] = {'Symbol': symbol, 'Dataset': dataset, 'Fetched': now, 'Rows': rows,
+                                               'Hash': digest, 'Bytes': size, 'TTL': str(self.ttl(dataset))}
+            self.stats['Fetches'] += 1
+            if not written:
+                self.stats['Writes Saved'] += 1
+                self.stats['Bytes Saved'] += size
+
+    def invalidate(self, symbol, dataset=None):
+        """Forget the fetches of a symbol (or one of its datasets) so the next download refetches them."""
+        with self.lock:
+            for key in [key for key in self.entries if key[0] == symbol and dataset in (None, key[1])]:
+                del self.entries[key]
+        self.save()
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.stats)
+
+    def summary(self, since=None):
+        """One line describing the savings since a `snapshot()` (default: since the manifest was created)."""
+        stats = self.snapshot()
+        if since is not None:
+            stats = {key: value - since.get(key, 0) for key, value in stats.items()}
+        return (f"{stats['Fetches']} fetches, {stats['Calls Saved']} calls skipped as fresh, "
+                f"{stats['Writes Saved']} unchanged writes skipped, {stats['Bytes Saved'] / 1e6:.2f} MB saved")
+
+
+if __name__ == "__main__":
+    manifest = FreshnessManifest(DataStore(sys.argv[1] if len(sys.argv) > 1 else 'Data'))
+    print(pd.DataFrame(list(manifest.entries.values()), columns=MANIFEST_COLUMNS))
@@ -0,0 +1,253 @@
+import os
+import sys
+import time
+import threading
+import itertools
+import numpy as np
+import pandas as pd
+from data_store import DataStore, FILE_EXTENSIONS, write_frame, read_frame
+
+FUNDAMENTAL_COLUMNS = ['Symbol', 'Statement', 'Period Type', 'Period End', 'Line Item', 'Value']
+KEY_COLUMNS = ['Symbol', 'Statement', 'Period Type', 'Period End', 'Line Item']
+CATEGORY_COLUMNS = ['Symbol', 'Statement', 'Period Type', 'Line Item']
+# Per-ticker dataset written by YFDownload -> (statement, period type)
+STATEMENT_DATASETS = {
+    'Balance_Sheet': ('balance_sheet', 'annual'), 'Qtly_Balance_Sheet': ('balance_sheet', 'quarterly'),
+    'Income_Stmt': ('income_stmt', 'annual'), 'Qtly_Income_Stmt': ('income_stmt', 'quarterly'),
+    'Cash_Flows': ('cash_flow', 'annual'), 'Qtly_Cash_Flows': ('cash_flow', 'quarterly'),
+}
+RATIO_ITEMS = ['Total Revenue', 'Gross Profit', 'Operating Income', 'Net Income', 'Total Debt',
+               'Stockholders Equity', 'Total Assets', 'Free Cash Flow', 'Operating Cash Flow',
+               'Capital Expenditure', 'Ordinary Shares Number']
+
+
+def to_long(statement_frame, symbol, statement, period_type):
+    """Melt a yfinance statement (line items as rows, period ends as columns) to FUNDAMENTAL_COLUMNS rows."""
+    if statement_frame is None or statement_frame.empty:
+        return pd.DataFrame(columns=FUNDAMENTAL_COLUMNS)
+    try:
+        values = statement_frame.to_numpy(dtype=np.float64)
+    except (TypeError, ValueError):
+        values = statement_frame.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+    items, periods = np.nonzero(~np.isnan(values))
+    return pd.DataFrame({
+        'Symbol': symbol, 'Statement': statement, 'Period Type': period_type,
+        'Period End': pd.to_datetime(statement_frame.columns.astype(str).str.slice(0, 10))[periods],
+        'Line Item': statement_frame.index.astype(str)[items],
+        'Value': values[items, periods],
+    }, columns=FUNDAMENTAL_COLUMNS)
+
+
+def typed(df):
+    df = df.copy()
+    for column in CATEGORY_COLUMNS:
+        df[column] = df[column].astype(str).astype('category')
+    df['Period End'] = pd.to_datetime(df['Period End'])
+    df['Value'] = df['Value'].astype(np.float64)
+    return df
+
+
+class FundamentalsWarehouse:
+    """All downloaded statements of all symbols as one long table in `<directory>/Fundamentals`.
+
+    Each load writes its rows as a small delta segment next to the consolidated `fundamentals` file, so
+    downloads never rewrite the whole table; a later load of the same (symbol, statement, period type,
+    period end, line item) replaces the earlier value. `table` folds pending deltas in, sorted by
+    (line item, period type, period end, symbol) with an index of row ranges per (line item, period
+    type), and `compact` merges the delta segments into the consolidated file.
+    """
+
+    def __init__(self, store, directory=None, compact_after=256):
+        self.store = store
+        self.directory = directory or os.path.join(store.directory, 'Fundamentals')
+        self.extension = FILE_EXTENSIONS[store.file_format]
+        self.compact_after = compact_after
+        self.counter = itertools.count()
+        self.lock = threading.RLock()
+        self.frame = None
+        self.segments = set()
+        self.pending = []
+        self.ranges = {}
+
+    def base_path(self):
+        return os.path.join(self.directory, f"fundamentals{self.extension}")
+
+    def delta_files(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                      if name.startswith('delta_') and os.path.splitext(name)[1] in FILE_EXTENSIONS.values())
+
+    def load(self, symbol, statement, period_type, statement_frame):
+        """Add one downloaded statement. Returns the number of values loaded."""
+        rows = to_long(statement_frame, symbol, statement, period_type)
+        if rows.empty:
+            return 0
+        with self.lock:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"delta_{time.time_ns()}_{os.getpid()}_{next(self.counter)}{self.extension}")
+            write_frame(rows, path, index=False)
+            self.segments.add(path)
+            self.pending.append(rows)
+        return len(rows)
+
+    def load_dataset(self, symbol, dataset, statement_frame):
+        statement, period_type = STATEMENT_DATASETS[dataset]
+        return self.load(symbol, statement, period_type, statement_frame)
+
+    def read_file(self, path):
+        df = read_frame(path)
+        return df if not df.empty else pd.DataFrame(columns=FUNDAMENTAL_COLUMNS)
+
+    def table(self):
+        """Return the consolidated, typed table, folding in deltas loaded here or written by other processes."""
+        with self.lock:
+            frames = []
+            if self.frame is None:
+                base = self.base_path()
+                self.frame = typed(self.read_file(base)) if os.path.exists(base) else typed(pd.DataFrame(columns=FUNDAMENTAL_COLUMNS))
+            for path in self.delta_files():
+                if path not in self.segments:
+                    frames.append(self.read_file(path))
+                    self.segments.add(path)
+            frames = self.pending + frames
+            self.pending = []
+            if frames:
+                merged = pd.concat([self.frame.astype({c: str for c in CATEGORY_COLUMNS})] + frames, ignore_index=True)
+                merged = typed(merged.drop_duplicates(KEY_COLUMNS, keep='last'))
+                self.frame = merged.sort_values(['Line Item', 'Period Type', 'Period End', 'Symbol'],
+                                                ignore_index=True)
+                self.build_ranges()
+                if len(self.segments) >= self.compact_after:
+                    self.compact()
+            elif not self.ranges and len(self.frame):
+                self.build_ranges()
+            return self.frame
+
+    def build_ranges(self):
+        """Index the row range of every (line item, period type) in the sorted table."""
+        items = self.frame['Line Item']
+        period_types = self.frame['Period Type']
+        keys = items.cat.codes.to_numpy(np.int64) * len(period_types.cat.categories) + period_types.cat.codes.to_numpy()
+        if not len(keys):
+            self.ranges = {}
+            return
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        ends = np.r_[starts[1:], len(keys)]
+        self.ranges = {(items.iat[start], period_types.iat[start]): (start, end) for start, end in zip(starts, ends)}
+
+    def compact(self):
+        """Write the consolidated table and remove the delta segments it contains."""
+        with self.lock:
+            frame = self.table()
+            os.makedirs(self.directory, exist_ok=True)
+            write_frame(frame, self.base_path(), index=False)
+            for path in self.segments:
+                if os.path.exists(path):
+                    os.remove(path)
+            self.segments = set()
+
+    def line_item(self, line_item, period_type='annual'):
+        """All (symbol, period end, value) rows of one line item, read from its indexed row range."""
+        frame = self.table()
+        start, end = self.ranges.get((line_item, period_type), (0, 0))
+        return frame.iloc[start:end]
+
+    def cross_section(self, line_item, period_type='annual', period_end=None):
+        """Value of a line item per symbol for `period_end` (default: each symbol's latest period)."""
+        rows = self.line_item(line_item, period_type)
+        if period_end is not None:
+            rows = rows[rows['Period End'] == pd.Timestamp(period_end)]
+        else:
+            rows = rows.drop_duplicates('Symbol', keep='last')
+        return pd.Series(rows['Value'].to_numpy(), index=rows['Symbol'].astype(str).to_numpy(), name=line_item)
+
+    def panel(self, line_items, period_type='annual'):
+        """(symbol, period end) x line item frame of the given line items, sorted by symbol then period."""
+        frames = [self.line_item(item, period_type) for item in line_items]
+        frames = [frame for frame in frames if len(frame)]
+        if not frames:
+            return pd.DataFrame(columns=list(line_items), index=pd.MultiIndex.from_arrays([[], []], names=['Symbol', 'Period End']))
+        rows = pd.concat(frames, ignore_index=True)
+        rows['Symbol'] = rows['Symbol'].astype(str)
+        rows['Line Item'] = rows['Line Item'].astype(str)
+        wide = rows.pivot_table(index=['Symbol', 'Period End'], columns='Line Item', values='Value', aggfunc='last')
+        return wide.reindex(columns=list(line_items)).sort_index()
+
+    def import_legacy(self):
+        """Load the per-ticker statement files already on disk. Returns the number of values loaded."""
+        loaded = 0
+        for name in sorted(os.listdir(self.store.directory)):
+            if not os.path.isdir(os.path.join(self.store.directory, name)):
+                continue
+            for dataset in STATEMENT_DATASETS:
+                statement_frame = self.store.read(name, dataset, index_col=0)
+                if statement_frame is not None:
+                    loaded += self.load_dataset(name, dataset, statement_frame)
+        return loaded
+
+
+def year_earlier_rows(symbols, period_ends, tolerance_days=20):
+    """Row of the same symbol's period ending a year (within `tolerance_days`) before each row, or -1."""
+    rows = pd.DataFrame({'Symbol': np.asarray(symbols, dtype=object),
+                         'Period End': pd.to_datetime(np.asarray(period_ends)), 'Row': np.arange(len(symbols))})
+    earlier = rows.assign(**{'Period End': rows['Period End'] + pd.DateOffset(years=1)})
+    matched = pd.merge_asof(rows.sort_values('Period End'), earlier.sort_values('Period End'), on='Period End',
+                            by='Symbol', direction='nearest', tolerance=pd.Timedelta(days=tolerance_days),
+                            suffixes=('', ' Earlier'))
+    previous_rows = np.full(len(rows), -1, dtype=np.int64)
+    found = matched['Row Earlier'].notna().to_numpy()
+    previous_rows[matched['Row'].to_numpy()[found]] = matched['Row Earlier'].to_numpy()[found].astype(np.int64)
+    return previous_rows
+
+
+def compute_ratios(panel, prices=None):
+    """Margins, leverage, free-cash-flow yield and growth for every (symbol, period) row of a `panel` frame.
+
+    `prices` ({symbol: price} or Series) gives market capitalisation for FCF yield from the latest
+    share count. Growth compares each period with the same symbol's period ending about a year
+    earlier, and is NaN when that period is missing.
+    """
+    values = {item: panel[item].to_numpy(dtype=np.float64) if item in panel else np.full(len(panel), np.nan)
+              for item in RATIO_ITEMS}
+    free_cash_flow = np.where(np.isnan(values['Free Cash Flow']),
+                              values['Operating Cash Flow'] + values['Capital Expenditure'], values['Free Cash Flow'])
+    symbols = panel.index.get_level_values('Symbol').to_numpy()
+    previous_rows = year_earlier_rows(symbols, panel.index.get_level_values('Period End'))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratios = {
+            'Gross Margin': values['Gross Profit'] / values['Total Revenue'],
+            'Operating Margin': values['Operating Income'] / values['Total Revenue'],
+            'Net Margin': values['Net Income'] / values['Total Revenue'],
+            'Debt to Equity': values['Total Debt'] / values['Stockholders Equity'],
+            'Debt to Assets': values['Total Debt'] / values['Total Assets'],
+            'Return on Equity': values['Net Income'] / values['Stockholders Equity'],
+            'Free Cash Flow': free_cash_flow,
+        }
+        for item, name in (('Total Revenue', 'Revenue Growth'), ('Net Income', 'Net Income Growth')):
+            previous = np.where(previous_rows >= 0, values[item][previous_rows], np.nan)
+            ratios[name] = values[item] / previous - 1
+            ratios[name][previous <= 0] = np.nan
+        if prices is not None:
+            price = pd.Series(prices, dtype=np.float64).reindex(symbols).to_numpy()
+            market_cap = price * values['Ordinary Shares Number']
+            ratios['Market Cap'] = market_cap
+            ratios['FCF Yield'] = free_cash_flow / market_cap
+    return pd.DataFrame(ratios, index=panel.index)
+
+
+def universe_ratios(warehouse, prices=None, period_type='annual', latest_only=True):
+    """Ratios for every symbol in the warehouse in one pass; by default only each symbol's latest period."""
+    ratios = compute_ratios(warehouse.panel(RATIO_ITEMS, period_type), prices)
+    if latest_only:
+        ratios = ratios[~ratios.index.get_level_values('Symbol').duplicated(keep='last')].droplevel('Period End')
+    return ratios
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == 'import':
+        warehouse = FundamentalsWarehouse(DataStore(sys.argv[2] if len(sys.argv) > 2 else 'Data'))
+        print(f"Imported {warehouse.import_legacy()} values.")
+        warehouse.compact()
+    else:
+        print("Usage: python fundamentals.py import [data directory]")
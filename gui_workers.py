@@ -0,0 +1,116 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BackgroundLoader:
+    """Runs loading functions on a thread pool and hands their results back to the Tk thread.
+
+    Workers put finished futures on a queue that `drain` empties from `root.after`, so Tk widgets are
+    only touched on the main thread. Requests are grouped by channel ('portfolio', 'news', ...): a new
+    request on a channel cancels the pending one and results of superseded requests are dropped.
+    """
+
+    def __init__(self, root, max_workers=4, poll_interval=15):
+        self.root = root
+        self.poll_interval = poll_interval
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='gui-loader')
+        self.results = queue.Queue()
+        self.generations = {}
+        self.pending = {}
+        self.stale = 0
+        self.after_id = self.root.after(self.poll_interval, self.drain)
+
+    def submit(self, channel, function, callback, *args):
+        """Run `function(*args)` in the background and call `callback(result)` on the Tk thread."""
+        generation = self.cancel(channel)
+        future = self.executor.submit(function, *args)
+        self.pending[channel] = future
+        future.add_done_callback(lambda done: self.results.put((channel, generation, done, callback)))
+        return generation
+
+    def cancel(self, channel):
+        """Supersede the current request on `channel`. Returns the channel's new generation."""
+        generation = self.generations.get(channel, 0) + 1
+        self.generations[channel] = generation
+        previous = self.pending.pop(channel, None)
+        if previous is not None:
+            previous.cancel()
+        return generation
+
+    def drain(self):
+        while True:
+            try:
+                channel, generation, future, callback = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if generation != self.generations.get(channel) or future.cancelled():
+                self.stale += 1
+                continue
+            self.pending.pop(channel, None)
+            error = future.exception()
+            if error is not None:
+                print(f"Error loading {channel}: {error}")
+            else:
+                callback(future.result())
+        self.after_id = self.root.after(self.poll_interval, self.drain)
+
+    def shutdown(self):
+        self.root.after_cancel(self.after_id)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class TreeviewPager:
+    """Fills a Treeview a chunk of rows per Tk tick, so thousands of rows never block the event loop.
+
+    `show` replaces the table's contents; a later `show` (or `cancel`) stops an unfinished fill.
+    `on_first_page` is called once the first chunk is on screen.
+    """
+
+    def __init__(self, root, tree, chunk_size=200, on_first_page=None):
+        self.root = root
+        self.tree = tree
+        self.chunk_size = chunk_size
+        self.on_first_page = on_first_page
+        self.rows = []
+        self.items = []
+        self.position = 0
+        self.after_id = None
+
+    def show(self, rows):
+        self.cancel()
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        self.rows = list(rows)
+        self.items = []
+        self.position = 0
+        self.insert_chunk()
+
+    def insert_chunk(self):
+        self.after_id = None
+        end = min(self.position + self.chunk_size, len(self.rows))
+        for values in self.rows[self.position:end]:
+            self.items.append(self.tree.insert("", "end", values=values))
+        first_page = self.position == 0
+        self.position = end
+        if first_page and self.on_first_page is not None:
+            self.on_first_page()
+        if self.position < len(self.rows):
+            self.after_id = self.root.after(1, self.insert_chunk)
+
+    def set_cell(self, row, column, text):
+        """Change one cell of row `row`, on screen if already inserted, otherwise in the rows still to insert."""
+        if row < self.position:
+            self.tree.set(self.items[row], f"#{column + 1}", text)
+        else:
+            values = list(self.rows[row])
+            values[column] = text
+            self.rows[row] = tuple(values)
+
+    def cancel(self):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def done(self):
+        return self.after_id is None
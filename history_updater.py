@@ -0,0 +1,158 @@
+import os
+import threading
+import pandas as pd
+from data_store import parse_dates
+
+
+class HistoryUpdater:
+    """Incremental daily-history updates driven by per-file high-water marks.
+
+    A watermark records the last stored bar of a history file together with the file's size and
+    mtime. While the file is unchanged the watermark answers "where did we stop" without opening it;
+    otherwise only the head and tail of the file are read. Each update then fetches from the last
+    stored bar onwards (so a partial last bar is refreshed), merges the overlap and appends.
+    """
+
+    def __init__(self, store, fetch_history, watermark_file=None, fetch_bulk_history=None, quote_index=None):
+        self.store = store
+        self.fetch_history = fetch_history  # fetch_history(ticker_symbol, start=None, end=None) -> DataFrame
+        self.fetch_bulk_history = fetch_bulk_history  # fetch_bulk_history(ticker_symbols, start=None, end=None) -> {ticker: DataFrame}
+        self.watermark_file = watermark_file or os.path.join(store.directory, 'history_watermarks.csv')
+        self.quote_index = quote_index  # QuoteIndex kept in step with every merge, if given
+        self.watermarks = self.load_watermarks()
+        self.lock = threading.Lock()  # updates may run concurrently from the download scheduler
+
+    def load_watermarks(self):
+        if not os.path.exists(self.watermark_file):
+            return {}
+        df = pd.read_csv(self.watermark_file, parse_dates=['Last Date'])
+        return {row['Path']: {'Last Date': row['Last Date'], 'Size': row['Size'], 'Mtime': row['Mtime']}
+                for row in df.to_dict('records')}
+
+    def save_watermarks(self):
+        """Persist the watermarks (and the quote index, if one is attached)."""
+        if self.quote_index is not None:
+            self.quote_index.save()
+        with self.lock:
+            rows = [{'Path': path, **mark} for path, mark in self.watermarks.items()]
+            os.makedirs(os.path.dirname(self.watermark_file) or '.', exist_ok=True)
+            pd.DataFrame(rows, columns=['Path', 'Last Date', 'Size', 'Mtime']).to_csv(self.watermark_file, index=False)
+
+    def last_stored_date(self, ticker_symbol, directory=None):
+        """Return the date of the last stored bar, or None if there is no stored history."""
+        path = self.store.find_file(ticker_symbol, 'historical_data', directory)
+        if path is None:
+            return None
+        mark = self.watermarks.get(path)
+        stat = os.stat(path)
+        if mark is not None and mark['Size'] == stat.st_size and mark['Mtime'] == stat.st_mtime_ns:
+            return pd.Timestamp(mark['Last Date'])
+        bounds = self.store.history_bounds(ticker_symbol, directory=directory)
+        if bounds is None:
+            return None
+        return max(bounds)
+
+    def record_watermark(self, path, last_date):
+        stat = os.stat(path)
+        with self.lock:
+            self.watermarks[path] = {'Last Date': pd.Timestamp(last_date), 'Size': stat.st_size, 'Mtime': stat.st_mtime_ns}
+
+    def update(self, ticker_symbol, directory=None, save=True):
+        """Bring one ticker's history up to date. Returns the number of new or refreshed bars written."""
+        today = pd.Timestamp.today().normalize()
+        last_date = self.last_stored_date(ticker_symbol, directory)
+        if last_date is not None and last_date >= today:
+            print(f"Data for {ticker_symbol} is already up to date.")
+            return 0
+        new_data = self.fetch_history(ticker_symbol, start=last_date)
+        if new_data is None or new_data.empty:
+            print(f"No new data available to update for {ticker_symbol}.")
+            return 0
+        self.merge(ticker_symbol, new_data, last_date, directory)
+        if save:
+            self.save_watermarks()
+        return len(new_data)
+
+    def merge(self, ticker_symbol, new_data, last_date=None, directory=None):
+        """Merge fetched bars into the stored history and move the ticker's watermark."""
+        path = self.store.append_history(new_data, ticker_symbol, directory=directory)
+        if self.quote_index is not None:
+            self.quote_index.record(ticker_symbol, new_data, path)
+        self.record_watermark(path, max(parse_dates(new_data.index).max(), last_date or pd.Timestamp.min))
+        return path
+
+    def update_many(self, ticker_symbols, directory=None):
+        """Update several tickers, saving the watermark file once at the end. Returns {ticker: bars written}."""
+        results = {}
+        try:
+            for ticker_symbol in ticker_symbols:
+                try:
+                    results[ticker_symbol] = self.update(ticker_symbol, directory, save=False)
+                except Exception as e:
+                    print(f"Error updating historical data for {ticker_symbol}: {e}")
+                    results[ticker_symbol] = None
+        finally:
+            self.save_watermarks()
+        return results
+
+    def merge_window(self, ticker_symbols, start=None, end=None, batch_size=100, directory=None):
+        """Fetch one date window for many tickers in batched requests and merge each ticker's slice.
+
+        Tickers missing from a batch response (or every ticker of a batch whose request failed) are
+        fetched one by one. Returns ({ticker: bars written or None on failure}, batched request count).
+        """
+        ticker_symbols = list(ticker_symbols)
+        results = {}
+        requests = 0
+        for offset in range(0, len(ticker_symbols), batch_size):
+            batch = ticker_symbols[offset:offset + batch_size]
+            frames = {}
+            if self.fetch_bulk_history is not None:
+                requests += 1
+                try:
+                    frames = self.fetch_bulk_history(batch, start=start, end=end)
+                except Exception as e:
+                    print(f"Error fetching batch of {len(batch)} tickers, falling back to single fetches: {e}")
+            for ticker_symbol in batch:
+                try:
+                    new_data = frames.get(ticker_symbol)
+                    if new_data is None or new_data.empty:
+                        new_data = self.fetch_history(ticker_symbol, start=start, end=end)
+                    if new_data is None or new_data.empty:
+                        results[ticker_symbol] = 0
+                        continue
+                    last_date = self.last_stored_date(ticker_symbol, directory)
+                    self.merge(ticker_symbol, new_data, last_date, directory)
+                    results[ticker_symbol] = len(new_data)
+                except Exception as e:
+                    print(f"Error updating historical data for {ticker_symbol}: {e}")
+                    results[ticker_symbol] = None
+        return results, requests
+
+    def update_bulk(self, ticker_symbols, batch_size=100, directory=None):
+        """Bring many tickers up to date, batching tickers that share the same last stored bar.
+
+        After a normal nightly run nearly every ticker stops on the same date, so the whole universe is
+        refreshed with a handful of batched requests. Returns {ticker: bars written or None on failure}.
+        """
+        today = pd.Timestamp.today().normalize()
+        groups = {}
+        results = {}
+        for ticker_symbol in ticker_symbols:
+            last_date = self.last_stored_date(ticker_symbol, directory)
+            if last_date is not None and last_date >= today:
+                results[ticker_symbol] = 0
+            else:
+                groups.setdefault(last_date, []).append(ticker_symbol)
+        requests = 0
+        try:
+            for start, group in groups.items():
+                group_results, group_requests = self.merge_window(group, start=start, batch_size=batch_size,
+                                                                  directory=directory)
+                results.update(group_results)
+                requests += group_requests
+        finally:
+            self.save_watermarks()
+        updated = sum(1 for bars in results.values() if bars)
+        print(f"Updated {updated} of {len(results)} tickers with {requests} batched requests.")
+        return results
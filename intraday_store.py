@@ -0,0 +1,129 @@
+import os
+import numpy as np
+import pandas as pd
+from data_store import FILE_EXTENSIONS, FrameCache, parse_dates, write_frame, read_frame
+
+BAR_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def resample_bars(bars, interval, offset='9h30min'):
+    """Aggregate sorted intraday bars into `interval` OHLCV bars plus VWAP, without a pandas groupby.
+
+    Buckets are anchored at midnight + `offset` (the 9:30 session open by default, so hourly bars run
+    9:30-10:30). VWAP weights the typical price (High + Low + Close) / 3 by volume.
+    """
+    if bars.empty:
+        return pd.DataFrame(columns=BAR_COLUMNS + ['VWAP'], index=pd.DatetimeIndex([], name='Datetime'))
+    step = pd.Timedelta(interval).value
+    anchor = pd.Timedelta(offset).value
+    times = bars.index.values.astype('datetime64[ns]').astype(np.int64)
+    days = times - times % 86_400_000_000_000
+    buckets = days + anchor + (times - days - anchor) // step * step
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(times)] - 1
+    high = bars['High'].to_numpy(dtype=np.float64)
+    low = bars['Low'].to_numpy(dtype=np.float64)
+    close = bars['Close'].to_numpy(dtype=np.float64)
+    volume = bars['Volume'].to_numpy(dtype=np.float64)
+    volume_sum = np.add.reduceat(volume, starts)
+    weighted = np.add.reduceat((high + low + close) / 3 * volume, starts)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        vwap = np.where(volume_sum > 0, weighted / volume_sum, close[ends])
+    return pd.DataFrame({
+        'Open': bars['Open'].to_numpy(dtype=np.float64)[starts],
+        'High': np.maximum.reduceat(high, starts),
+        'Low': np.minimum.reduceat(low, starts),
+        'Close': close[ends],
+        'Volume': volume_sum,
+        'VWAP': vwap,
+    }, index=pd.DatetimeIndex(buckets[starts].astype('datetime64[ns]'), name='Datetime'))
+
+
+class IntradayStore:
+    """Intraday bars kept as one partition per trading day: `<TICKER>/Intraday/<interval>/<TICKER>_<date>.<ext>`.
+
+    New fetches are merged into the day partitions they overlap (later bars replace earlier ones with
+    the same timestamp), so the provider's rolling 7/60-day window accumulates into a full history.
+    Resampled intervals are written next to their source as `<target>_from_<source>` partitions and
+    rebuilt only when the source partition is newer. Parsed partitions are kept in a FrameCache.
+    """
+
+    def __init__(self, store, cache_bytes=256 * 1024 * 1024):
+        self.store = store
+        self.cache = FrameCache(cache_bytes)
+
+    def interval_directory(self, ticker_symbol, interval):
+        return os.path.join(self.store.directory, ticker_symbol, 'Intraday', interval)
+
+    def partition_path(self, ticker_symbol, interval, day):
+        extension = FILE_EXTENSIONS[self.store.file_format]
+        return os.path.join(self.interval_directory(ticker_symbol, interval),
+                            f"{ticker_symbol}_{pd.Timestamp(day):%Y-%m-%d}{extension}")
+
+    def partitions(self, ticker_symbol, interval, start=None, end=None):
+        """Return {day: path} for the stored days between start and end (inclusive)."""
+        directory = self.interval_directory(ticker_symbol, interval)
+        if not os.path.isdir(directory):
+            return {}
+        prefix = f"{ticker_symbol}_"
+        start = pd.Timestamp(start).normalize() if start is not None else None
+        end = pd.Timestamp(end).normalize() if end is not None else None
+        partitions = {}
+        for file_name in os.listdir(directory):
+            name, _ = os.path.splitext(file_name)
+            if not name.startswith(prefix):
+                continue
+            day = pd.Timestamp(name[len(prefix):])
+            if (start is None or day >= start) and (end is None or day <= end):
+                partitions[day] = os.path.join(directory, file_name)
+        return dict(sorted(partitions.items()))
+
+    def read_partition(self, path):
+        def load():
+            df = read_frame(path, index_col='Datetime')
+            df.index = parse_dates(df.index)
+            df.index.name = 'Datetime'
+            return df
+        return self.cache.get(path, load)
+
+    def write_bars(self, ticker_symbol, interval, bars):
+        """Merge fetched bars into their day partitions. Returns the number of partitions written."""
+        if bars is None or bars.empty:
+            return 0
+        bars = bars.copy()
+        bars.index = parse_dates(bars.index)
+        bars.index.name = 'Datetime'
+        os.makedirs(self.interval_directory(ticker_symbol, interval), exist_ok=True)
+        written = 0
+        for day, day_bars in bars.groupby(bars.index.normalize()):
+            path = self.partition_path(ticker_symbol, interval, day)
+            if os.path.exists(path):
+                day_bars = pd.concat([self.read_partition(path), day_bars])
+            day_bars = day_bars[~day_bars.index.duplicated(keep='last')].sort_index()
+            write_frame(day_bars, path)
+            written += 1
+        return written
+
+    def read_bars(self, ticker_symbol, interval, start=None, end=None):
+        """Return the stored bars for the days from start to end (inclusive), reading only those partitions."""
+        frames = [self.read_partition(path) for path in self.partitions(ticker_symbol, interval, start, end).values()]
+        if not frames:
+            return pd.DataFrame(columns=BAR_COLUMNS, index=pd.DatetimeIndex([], name='Datetime'))
+        return pd.concat(frames)
+
+    def resample(self, ticker_symbol, interval, start=None, end=None, source_interval='1m'):
+        """Return `interval` OHLCV + VWAP bars for the days from start to end, built from `source_interval` bars.
+
+        Days whose derived partition is at least as new as the source partition are read, not recomputed.
+        """
+        derived_interval = f"{interval}_from_{source_interval}"
+        os.makedirs(self.interval_directory(ticker_symbol, derived_interval), exist_ok=True)
+        frames = []
+        for day, source_path in self.partitions(ticker_symbol, source_interval, start, end).items():
+            derived_path = self.partition_path(ticker_symbol, derived_interval, day)
+            if not os.path.exists(derived_path) or os.stat(derived_path).st_mtime_ns < os.stat(source_path).st_mtime_ns:
+                write_frame(resample_bars(self.read_partition(source_path), interval), derived_path)
+            frames.append(self.read_partition(derived_path))
+        if not frames:
+            return resample_bars(pd.DataFrame(columns=BAR_COLUMNS), interval)
+        return pd.concat(frames)
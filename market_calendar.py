@@ -0,0 +1,126 @@
+import datetime as dt
+import functools
+import pandas as pd
+
+EXCHANGE_TIMEZONE = 'America/New_York'
+OPEN_TIME = dt.time(9, 30)
+CLOSE_TIME = dt.time(16, 0)
+EARLY_CLOSE_TIME = dt.time(13, 0)
+
+
+def _nth_weekday(year, month, weekday, n):
+    first = dt.date(year, month, 1)
+    return first + dt.timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+
+
+def _last_weekday(year, month, weekday):
+    last = dt.date(year + month // 12, month % 12 + 1, 1) - dt.timedelta(days=1)
+    return last - dt.timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _easter(year):
+    """Gregorian Easter Sunday (anonymous Gregorian algorithm)."""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = divmod(b, 4)
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return dt.date(year, month, day + 1)
+
+
+def _observed(day):
+    """Saturday holidays are observed on Friday, Sunday ones on Monday."""
+    if day.weekday() == 5:
+        return day - dt.timedelta(days=1)
+    if day.weekday() == 6:
+        return day + dt.timedelta(days=1)
+    return day
+
+
+@functools.lru_cache(maxsize=None)
+def nyse_holidays(year):
+    """Full-day NYSE closures of a year under the current rules (ad hoc closures are not included)."""
+    holidays = {
+        _nth_weekday(year, 2, 0, 3),  # Washington's Birthday
+        _easter(year) - dt.timedelta(days=2),  # Good Friday
+        _last_weekday(year, 5, 0),  # Memorial Day
+        _observed(dt.date(year, 7, 4)),
+        _nth_weekday(year, 9, 0, 1),  # Labor Day
+        _nth_weekday(year, 11, 3, 4),  # Thanksgiving
+        _observed(dt.date(year, 12, 25)),
+    }
+    # A Saturday New Year's Day is not observed on the Friday before (the last session of the year)
+    if dt.date(year, 1, 1).weekday() != 5:
+        holidays.add(_observed(dt.date(year, 1, 1)))
+    if year >= 1998:
+        holidays.add(_nth_weekday(year, 1, 0, 3))  # Martin Luther King Jr. Day
+    if year >= 2022:
+        holidays.add(_observed(dt.date(year, 6, 19)))  # Juneteenth
+    return frozenset(holidays)
+
+
+@functools.lru_cache(maxsize=None)
+def nyse_early_closes(year):
+    """Sessions closing at 13:00: the day before Independence Day, the day after Thanksgiving and Christmas Eve."""
+    days = {_nth_weekday(year, 11, 3, 4) + dt.timedelta(days=1)}
+    july_third, christmas_eve = dt.date(year, 7, 3), dt.date(year, 12, 24)
+    if july_third.weekday() < 4 and dt.date(year, 7, 4).weekday() < 5:
+        days.add(july_third)
+    if christmas_eve.weekday() < 5:
+        days.add(christmas_eve)
+    return frozenset(day for day in days if day.weekday() < 5 and day not in nyse_holidays(year))
+
+
+class MarketCalendar:
+    """Trading sessions of an exchange (NYSE rules by default) with open and close times in its timezone."""
+
+    def __init__(self, timezone=EXCHANGE_TIMEZONE, holidays=nyse_holidays, early_closes=nyse_early_closes):
+        self.timezone = timezone
+        self.holidays = holidays
+        self.early_closes = early_closes
+
+    def is_session(self, day):
+        day = pd.Timestamp(day).date()
+        return day.weekday() < 5 and day not in self.holidays(day.year)
+
+    def session_open(self, day):
+        return pd.Timestamp(dt.datetime.combine(pd.Timestamp(day).date(), OPEN_TIME), tz=self.timezone)
+
+    def session_close(self, day):
+        day = pd.Timestamp(day).date()
+        close = EARLY_CLOSE_TIME if day in self.early_closes(day.year) else CLOSE_TIME
+        return pd.Timestamp(dt.datetime.combine(day, close), tz=self.timezone)
+
+    def next_session(self, day, inclusive=True):
+        day = pd.Timestamp(day).date() + dt.timedelta(days=0 if inclusive else 1)
+        while not self.is_session(day):
+            day += dt.timedelta(days=1)
+        return day
+
+    def previous_session(self, day, inclusive=True):
+        day = pd.Timestamp(day).date() - dt.timedelta(days=0 if inclusive else 1)
+        while not self.is_session(day):
+            day -= dt.timedelta(days=1)
+        return day
+
+    def sessions(self, start, end):
+        """Session dates from `start` to `end`, inclusive."""
+        days = pd.bdate_range(pd.Timestamp(start).date(), pd.Timestamp(end).date())
+        return [day.date() for day in days if self.is_session(day)]
+
+    def local(self, moment):
+        moment = pd.Timestamp(moment)
+        return moment.tz_localize(self.timezone) if moment.tz is None else moment.tz_convert(self.timezone)
+
+    def is_open(self, moment):
+        moment = self.local(moment)
+        return self.is_session(moment) and self.session_open(moment) <= moment < self.session_close(moment)
+
+    def last_completed_session(self, moment):
+        """The latest session whose close is at or before `moment`."""
+        moment = self.local(moment)
+        day = self.previous_session(moment)
+        return day if self.session_close(day) <= moment else self.previous_session(day, inclusive=False)
@@ -0,0 +1,164 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from data_store import DataStore
+from price_panel import PricePanel, holdings_matrix
+
+FAN_PERCENTILES = (5, 25, 50, 75, 95)
+
+# Simulation inputs, set once per worker process by the pool initializer
+_INPUTS = {}
+
+
+def estimate_returns(prices, lookback=756):
+    """Daily log returns of the last `lookback` rows of a forward-filled dates x symbols price matrix.
+
+    Rows where any symbol has no price yet (before its listing) are dropped.
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        returns = np.diff(np.log(prices[-(lookback + 1):]), axis=0)
+    return returns[~np.isnan(returns).any(axis=1)]
+
+
+def _set_inputs(inputs):
+    _INPUTS.clear()
+    _INPUTS.update(inputs)
+
+
+def simulate_chunk(task):
+    """Simulate one chunk of paths. Returns (terminal values, values at the recorded steps) per portfolio.
+
+    Paths are advanced one day at a time, so memory is O(paths x symbols) per chunk whatever the horizon.
+    """
+    seed, paths = task
+    inputs = _INPUTS
+    rng = np.random.default_rng(seed)
+    returns, positions = inputs['returns'], inputs['positions']  # positions: symbols x portfolios, in currency
+    horizon, record_every, method = inputs['horizon'], inputs['record_every'], inputs['method']
+    log_levels = np.zeros((paths, returns.shape[1]))
+    recorded = []
+    for step in range(1, horizon + 1):
+        if method == 'bootstrap':
+            log_levels += returns[rng.integers(0, len(returns), paths)]
+        else:
+            log_levels += inputs['drift'] + rng.standard_normal((paths, returns.shape[1])) @ inputs['cholesky'].T
+        if step % record_every == 0 or step == horizon:
+            recorded.append((np.exp(log_levels) @ positions + inputs['cash']).astype(np.float32))
+    return recorded[-1], np.stack(recorded, axis=1)
+
+
+class MonteCarloSimulator:
+    """Simulates buy-and-hold values of many portfolios over a horizon from the stored price histories.
+
+    'bootstrap' resamples whole days of historical log returns (keeping cross-asset correlation);
+    'gbm' draws correlated normal log returns with the historical mean and covariance. Paths run in
+    chunks of `chunk_size` across a process pool; every chunk gets its own child of one SeedSequence,
+    so results are reproducible for a seed regardless of the number of workers.
+    """
+
+    def __init__(self, store, lookback=756, chunk_size=2000, max_workers=None):
+        self.store = store
+        self.panel = PricePanel(store)
+        self.lookback = lookback
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers or os.cpu_count()
+
+    def prepare(self, portfolios, horizon, method, record_every):
+        universe = [ticker for holdings in portfolios.values() for ticker in holdings if ticker != 'Cash']
+        _, symbols, prices = self.panel.load(universe)
+        missing = set(universe) - set(symbols)
+        if missing:
+            print(f"No historical data found for {', '.join(sorted(missing))}.")
+        returns = estimate_returns(prices, self.lookback)
+        if len(returns) < 2:
+            raise ValueError("Not enough overlapping history to estimate returns")
+        latest = prices[-1]
+        positions = (holdings_matrix(portfolios, symbols) * latest).T
+        cash = np.array([float(holdings.get('Cash', 0.0)) for holdings in portfolios.values()])
+        inputs = {'returns': returns, 'positions': positions, 'cash': cash, 'horizon': horizon,
+                  'record_every': record_every, 'method': method}
+        if method == 'gbm':
+            covariance = np.atleast_2d(np.cov(returns, rowvar=False))
+            inputs['drift'] = returns.mean(axis=0)
+            # A small ridge keeps the Cholesky factorisation stable for (near-)collinear histories
+            inputs['cholesky'] = np.linalg.cholesky(covariance + np.eye(len(covariance)) * 1e-12)
+        elif method != 'bootstrap':
+            raise ValueError(f"Unknown simulation method: {method}")
+        return inputs, positions.sum(axis=0) + cash
+
+    def simulate(self, portfolios, paths=20000, horizon=252, method='bootstrap', seed=0, record_every=5):
+        """Return (terminal values: paths x portfolios, recorded values: paths x steps x portfolios, start values)."""
+        inputs, start_values = self.prepare(portfolios, horizon, method, record_every)
+        chunks = [min(self.chunk_size, paths - start) for start in range(0, paths, self.chunk_size)]
+        seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+        tasks = list(zip(seeds, chunks))
+        if self.max_workers == 1:
+            _set_inputs(inputs)
+            results = [simulate_chunk(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_set_inputs,
+                                     initargs=(inputs,)) as executor:
+                results = list(executor.map(simulate_chunk, tasks))
+        terminal = np.concatenate([result[0] for result in results])
+        recorded = np.concatenate([result[1] for result in results])
+        return terminal, recorded, start_values
+
+    def report(self, portfolios, paths=20000, horizon=252, method='bootstrap', seed=0, record_every=5,
+               levels=(0.95, 0.99)):
+        """Simulate and summarise every portfolio.
+
+        Returns (risk table, {portfolio: fan chart frame}): VaR/CVaR are losses over the horizon as a
+        fraction of today's value; fan charts hold value percentiles at every recorded step.
+        """
+        terminal, recorded, start_values = self.simulate(portfolios, paths, horizon, method, seed, record_every)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            horizon_returns = terminal / start_values - 1
+        rows = {}
+        for column, name in enumerate(portfolios):
+            outcome = horizon_returns[:, column]
+            row = {'Start Value': start_values[column], 'Expected Return': outcome.mean(),
+                   'Median Return': np.median(outcome), 'P(Loss)': (outcome < 0).mean()}
+            for level in levels:
+                cutoff = np.quantile(outcome, 1 - level)
+                row[f"VaR {level:.0%}"] = -cutoff
+                row[f"CVaR {level:.0%}"] = -outcome[outcome <= cutoff].mean()
+            rows[name] = row
+        steps = [step for step in range(1, horizon + 1) if step % record_every == 0 or step == horizon]
+        percentiles = np.percentile(recorded, FAN_PERCENTILES, axis=0)  # percentiles x steps x portfolios
+        fans = {name: pd.DataFrame(percentiles[:, :, column].T, index=pd.Index(steps, name='Day'),
+                                   columns=[f"P{p}" for p in FAN_PERCENTILES])
+                for column, name in enumerate(portfolios)}
+        return pd.DataFrame(rows).T, fans
+
+
+def plot_fan_chart(fan, title):
+    import matplotlib.pyplot as plt
+    plt.figure(figsize=(10, 6))
+    plt.fill_between(fan.index, fan['P5'], fan['P95'], alpha=0.2, label='5-95%')
+    plt.fill_between(fan.index, fan['P25'], fan['P75'], alpha=0.4, label='25-75%')
+    plt.plot(fan.index, fan['P50'], label='Median')
+    plt.title(title)
+    plt.xlabel('Trading days ahead')
+    plt.ylabel('Portfolio value')
+    plt.legend()
+    plt.show()
+
+
+def load_portfolios(portfolios_directory):
+    portfolios = {}
+    for file_name in sorted(os.listdir(portfolios_directory)):
+        if file_name.endswith('.csv'):
+            df = pd.read_csv(os.path.join(portfolios_directory, file_name))
+            portfolios[file_name[:-4]] = df.groupby('Ticker')['Shares'].sum().to_dict()
+    return portfolios
+
+
+if __name__ == "__main__":
+    directory = sys.argv[1] if len(sys.argv) > 1 else 'Data'
+    portfolios = load_portfolios(os.path.join(directory, 'Portfolios'))
+    risk, fans = MonteCarloSimulator(DataStore(directory)).report(portfolios)
+    print(risk)
+    for name, fan in fans.items():
+        plot_fan_chart(fan, f"{name}: simulated value over the next year")
@@ -0,0 +1,279 @@
+import os
+import re
+import ast
+import sys
+import time
+import hashlib
+import threading
+import itertools
+import numpy as np
+import pandas as pd
+from data_store import DataStore, FILE_EXTENSIONS, write_frame, read_frame
+
+NEWS_COLUMNS = ['Id', 'Ticker', 'Published', 'Title', 'Summary', 'Publisher', 'Url', 'Type']
+STOPWORDS = {'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'in', 'is', 'it', 'its',
+             'of', 'on', 'or', 'that', 'the', 'to', 'was', 'were', 'will', 'with'}
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    return [token for token in TOKEN_PATTERN.findall(str(text).lower()) if token not in STOPWORDS]
+
+
+def _first(*values):
+    for value in values:
+        if isinstance(value, dict):
+            value = value.get('url')
+        if value is not None and value == value and value != '':
+            return value
+    return None
+
+
+def normalize_news(ticker_symbol, items):
+    """Normalize yfinance news items (the flat legacy layout or the nested 'content' layout) to NEWS_COLUMNS.
+
+    Articles without an id are keyed on a hash of their URL (or title). Stored NEWS_COLUMNS frames pass through.
+    """
+    if isinstance(items, pd.DataFrame):
+        return items.assign(Ticker=ticker_symbol)[NEWS_COLUMNS]
+    rows = []
+    for item in items:
+        content = item.get('content')
+        if isinstance(content, str) and content.startswith('{'):
+            content = ast.literal_eval(content)  # nested layout read back from a legacy CSV
+        content = content if isinstance(content, dict) else item
+        url = _first(content.get('canonicalUrl'), content.get('clickThroughUrl'), content.get('link'), item.get('link'))
+        title = _first(content.get('title'), item.get('title'))
+        article_id = _first(item.get('id'), content.get('id'), item.get('uuid'))
+        if article_id is None:
+            article_id = hashlib.sha1(str(url or title).encode()).hexdigest()
+        published = _first(content.get('pubDate'), content.get('displayTime'), item.get('providerPublishTime'))
+        if isinstance(published, (int, float, np.integer, np.floating)):
+            published = pd.Timestamp(int(published), unit='s')
+        published = pd.Timestamp(published) if published is not None else pd.NaT
+        if published is not pd.NaT and published.tzinfo is not None:
+            published = published.tz_convert('UTC').tz_localize(None)
+        provider = content.get('provider')
+        rows.append({
+            'Id': str(article_id), 'Ticker': ticker_symbol, 'Published': published,
+            'Title': title or '', 'Summary': _first(content.get('summary'), content.get('description')) or '',
+            'Publisher': _first(provider.get('displayName') if isinstance(provider, dict) else None,
+                                content.get('publisher'), item.get('publisher')) or '',
+            'Url': url or '', 'Type': _first(content.get('contentType'), content.get('type'), item.get('type')) or '',
+        })
+    df = pd.DataFrame(rows, columns=NEWS_COLUMNS)
+    df['Published'] = pd.to_datetime(df['Published'])
+    return df
+
+
+class NewsIndex:
+    """In-memory inverted index over article titles and summaries, with ticker and date postings.
+
+    Documents are articles (one per id, whatever tickers they were fetched for); doc ids are assigned in
+    insertion order, so every postings list stays sorted and queries intersect them with numpy.
+    """
+
+    def __init__(self):
+        self.articles = {}  # article id -> doc id
+        self.rows = []  # doc id -> article fields
+        self.published = []
+        self.keys = set()  # (article id, ticker) pairs already indexed
+        self.terms = {}
+        self.tickers = {}
+        self.arrays = {}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def add(self, news):
+        """Index the rows of a NEWS_COLUMNS frame not seen before. Returns the new rows."""
+        added = []
+        for row in news.to_dict('records'):
+            key = (row['Id'], row['Ticker'])
+            if key in self.keys:
+                continue
+            self.keys.add(key)
+            added.append(row)
+            doc = self.articles.get(row['Id'])
+            if doc is None:
+                doc = len(self.rows)
+                self.articles[row['Id']] = doc
+                self.rows.append({**row, 'Tickers': [row['Ticker']]})
+                published = row['Published']
+                self.published.append(pd.Timestamp(published).value if not pd.isna(published) else np.iinfo(np.int64).min + 1)
+                for term in set(tokenize(row['Title']) + tokenize(row['Summary'])):
+                    self._post(self.terms, term, doc)
+            else:
+                self.rows[doc]['Tickers'].append(row['Ticker'])
+            self._post(self.tickers, row['Ticker'], doc)
+        if added:
+            self.arrays.pop('published', None)
+        return pd.DataFrame(added, columns=NEWS_COLUMNS)
+
+    def _post(self, postings, key, doc):
+        docs = postings.setdefault(key, [])
+        if not docs or docs[-1] != doc:
+            docs.append(doc)
+            self.arrays.pop((id(postings), key), None)
+
+    def _array(self, postings, key):
+        cache_key = (id(postings), key)
+        if cache_key not in self.arrays:
+            self.arrays[cache_key] = np.array(postings.get(key, []), dtype=np.int64)
+        return self.arrays[cache_key]
+
+    def _published(self):
+        if 'published' not in self.arrays:
+            self.arrays['published'] = np.array(self.published, dtype=np.int64)
+        return self.arrays['published']
+
+    def search(self, query=None, tickers=None, start=None, end=None, limit=20):
+        """Return the doc ids of the `limit` most recent articles matching all query terms, tickers and dates."""
+        docs = None
+        for term in tokenize(query or ''):
+            postings = self._array(self.terms, term)
+            docs = postings if docs is None else np.intersect1d(docs, postings, assume_unique=True)
+        if tickers is not None:
+            tickers = [tickers] if isinstance(tickers, str) else tickers
+            ticker_docs = np.unique(np.concatenate([self._array(self.tickers, t) for t in tickers] or [np.array([], np.int64)]))
+            docs = ticker_docs if docs is None else np.intersect1d(docs, ticker_docs, assume_unique=True)
+        if docs is None:
+            docs = np.arange(len(self.rows))
+        published = self._published()[docs]
+        mask = np.ones(len(docs), dtype=bool)
+        if start is not None:
+            mask &= published >= pd.Timestamp(start).value
+        if end is not None:
+            mask &= published <= pd.Timestamp(end).value
+        docs, published = docs[mask], published[mask]
+        if limit is not None and len(docs) > limit:
+            top = np.argpartition(-published, limit - 1)[:limit]
+            docs, published = docs[top], published[top]
+        return docs[np.argsort(-published, kind='stable')]
+
+    def frame(self, docs):
+        rows = [self.rows[doc] for doc in docs]
+        df = pd.DataFrame(rows, columns=NEWS_COLUMNS + ['Tickers'])
+        df['Tickers'] = [' '.join(row['Tickers']) for row in rows]
+        return df.drop(columns='Ticker')
+
+
+class NewsStore:
+    """Append-only news for all tickers in `<directory>/News/news_<time>_<pid>_<n>.<ext>` segments.
+
+    The NewsIndex is built from the segments on first use. Each append writes only the (article id,
+    ticker) rows not stored yet as a new immutable segment and adds them to the index; `refresh`
+    indexes segments written by other processes and `compact` merges the segments into one, which
+    happens on its own once `compact_after` segments are indexed.
+    """
+
+    def __init__(self, store, news_directory=None, compact_after=256):
+        self.store = store
+        self.news_directory = news_directory or os.path.join(store.directory, 'News')
+        self.compact_after = compact_after
+        self.index = NewsIndex()
+        self.loaded = False
+        self.segments = set()
+        self.counter = itertools.count()
+        self.lock = threading.Lock()
+
+    def segment_files(self):
+        if not os.path.isdir(self.news_directory):
+            return []
+        return sorted(os.path.join(self.news_directory, name) for name in os.listdir(self.news_directory)
+                      if name.startswith('news_') and os.path.splitext(name)[1] in FILE_EXTENSIONS.values())
+
+    def read_segment(self, path):
+        df = read_frame(path)
+        df['Published'] = pd.to_datetime(df['Published'])
+        for column in NEWS_COLUMNS:
+            if column != 'Published':
+                df[column] = df[column].fillna('').astype(str)
+        return df
+
+    def refresh(self):
+        """Index segments not indexed yet. Returns the number of new rows."""
+        with self.lock:
+            return self._refresh()
+
+    def _refresh(self):
+        added = 0
+        for path in self.segment_files():
+            if path not in self.segments:
+                added += len(self.index.add(self.read_segment(path)))
+                self.segments.add(path)
+        self.loaded = True
+        if len(self.segments) >= self.compact_after:
+            self._compact()
+        return added
+
+    def _load(self):
+        if not self.loaded:
+            self._refresh()
+
+    def append(self, ticker_symbol, items):
+        """Store raw yfinance news items (or a NEWS_COLUMNS frame) for a ticker. Returns the number of new rows."""
+        news = items if isinstance(items, pd.DataFrame) else normalize_news(ticker_symbol, items)
+        news = news.drop_duplicates(['Id', 'Ticker'], keep='last')
+        with self.lock:
+            self._load()
+            added = self.index.add(news)
+            if added.empty:
+                return 0
+            os.makedirs(self.news_directory, exist_ok=True)
+            path = os.path.join(self.news_directory, f"news_{time.time_ns()}_{os.getpid()}_{next(self.counter)}"
+                                                     f"{FILE_EXTENSIONS[self.store.file_format]}")
+            write_frame(added, path, index=False)
+            self.segments.add(path)
+            if len(self.segments) >= self.compact_after:
+                self._compact()
+            return len(added)
+
+    def search(self, query=None, tickers=None, start=None, end=None, limit=20):
+        """Most recent articles (newest first) matching every keyword in `query`, any of `tickers` and the date range."""
+        with self.lock:
+            self._load()
+            return self.index.frame(self.index.search(query, tickers, start, end, limit))
+
+    def latest(self, ticker_symbol, limit=20):
+        return self.search(tickers=ticker_symbol, limit=limit)
+
+    def compact(self):
+        """Merge all segments into one. Returns the number of segments replaced."""
+        with self.lock:
+            return self._compact()
+
+    def _compact(self):
+        paths = self.segment_files()
+        if len(paths) < 2:
+            return 0
+        merged = pd.concat([self.read_segment(path) for path in paths], ignore_index=True)
+        merged = merged.drop_duplicates(['Id', 'Ticker'], keep='first')
+        path = os.path.join(self.news_directory, f"news_{time.time_ns()}_{os.getpid()}_{next(self.counter)}"
+                                                 f"{FILE_EXTENSIONS[self.store.file_format]}")
+        write_frame(merged, path, index=False)
+        if self.loaded:
+            # Segments other processes wrote since the last refresh are in the merged file
+            self.index.add(merged)
+            self.segments.add(path)
+        for old_path in paths:
+            if os.path.exists(old_path):
+                os.remove(old_path)
+            self.segments.discard(old_path)
+        return len(paths)
+
+    def import_legacy(self):
+        """Append the per-ticker `<TICKER>_News` files written by earlier versions. Returns the number of new rows."""
+        added = 0
+        for name in sorted(os.listdir(self.store.directory)):
+            legacy = self.store.read(name, 'News') if os.path.isdir(os.path.join(self.store.directory, name)) else None
+            if legacy is not None and not legacy.empty:
+                added += self.append(name, legacy.to_dict('records'))
+        return added
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == 'import':
+        print(f"Imported {NewsStore(DataStore(sys.argv[2] if len(sys.argv) > 2 else 'Data')).import_legacy()} news rows.")
+    else:
+        print("Usage: python news_store.py import [data directory]")
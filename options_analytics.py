@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+
+try:
+    from scipy.special import ndtr as norm_cdf
+except ImportError:
+    def norm_cdf(x):
+        """Standard normal CDF by Hart's double-precision algorithm (West, 2005)."""
+        x = np.asarray(x, dtype=np.float64)
+        z = np.abs(x)
+        e = np.exp(-0.5 * z * z)
+        numerator = ((((((3.52624965998911e-02 * z + 0.700383064443688) * z + 6.37396220353165) * z
+                        + 33.912866078383) * z + 112.079291497871) * z + 221.213596169931) * z + 220.206867912376)
+        denominator = (((((((8.83883476483184e-02 * z + 1.75566716318264) * z + 16.064177579207) * z
+                          + 86.7807322029461) * z + 296.564248779674) * z + 637.333633378831) * z
+                        + 793.826512519948) * z + 440.413735824752)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            continued = z + 1 / (z + 2 / (z + 3 / (z + 4 / (z + 0.65))))
+            tail = np.where(z < 7.07106781186547, e * numerator / denominator, e / continued / 2.506628274631)
+        tail = np.where(z > 37, 0.0, tail)
+        return np.where(x > 0, 1.0 - tail, tail)
+
+SQRT_2PI = np.sqrt(2.0 * np.pi)
+
+
+def norm_pdf(x):
+    return np.exp(-0.5 * x * x) / SQRT_2PI
+
+
+def _d1_d2(S, K, T, r, sigma, q):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sqrt_t = np.sqrt(T)
+        d1 = (np.log(S / K) + (r - q + 0.5 * sigma * sigma) * T) / (sigma * sqrt_t)
+    return d1, d1 - sigma * sqrt_t, sqrt_t
+
+
+def black_scholes_price(S, K, T, r, sigma, is_call, q=0.0):
+    """Black-Scholes-Merton price of European options; all arguments broadcast as NumPy arrays."""
+    d1, d2, _ = _d1_d2(S, K, T, r, sigma, q)
+    discount_s = S * np.exp(-q * T)
+    discount_k = K * np.exp(-r * T)
+    call = discount_s * norm_cdf(d1) - discount_k * norm_cdf(d2)
+    put = discount_k * norm_cdf(-d2) - discount_s * norm_cdf(-d1)
+    return np.where(is_call, call, put)
+
+
+def greeks(S, K, T, r, sigma, is_call, q=0.0):
+    """Return {'Delta', 'Gamma', 'Vega', 'Theta', 'Rho'}; vega and rho per 1.00 change, theta per year."""
+    d1, d2, sqrt_t = _d1_d2(S, K, T, r, sigma, q)
+    pdf_d1 = norm_pdf(d1)
+    carry = np.exp(-q * T)
+    discount = np.exp(-r * T)
+    sign = np.where(is_call, 1.0, -1.0)
+    cdf_d1 = norm_cdf(sign * d1)
+    cdf_d2 = norm_cdf(sign * d2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gamma = carry * pdf_d1 / (S * sigma * sqrt_t)
+        theta = (-S * carry * pdf_d1 * sigma / (2 * sqrt_t)
+                 - sign * r * K * discount * cdf_d2 + sign * q * S * carry * cdf_d1)
+    return {
+        'Delta': sign * carry * cdf_d1,
+        'Gamma': gamma,
+        'Vega': S * carry * pdf_d1 * sqrt_t,
+        'Theta': theta,
+        'Rho': sign * K * T * discount * cdf_d2,
+    }
+
+
+def implied_volatility(price, S, K, T, r, is_call, q=0.0, tol=1e-8, max_iter=60, low=1e-4, high=5.0):
+    """Vectorized implied volatility: Newton steps safeguarded by a shrinking bisection bracket.
+
+    Every contract keeps a [low, high] bracket that is narrowed with the sign of the pricing error; a
+    Newton step that leaves the bracket (or has a vanishing vega) is replaced by bisection, which
+    gives Newton's speed near the root and bisection's robustness far from it. Contracts priced
+    outside the no-arbitrage bounds, or whose root lies outside [low, high], return NaN.
+    """
+    price, S, K, T, r, q = np.broadcast_arrays(*[np.asarray(v, dtype=np.float64) for v in (price, S, K, T, r, q)])
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), price.shape)
+    shape = price.shape
+    price, S, K, T, r, q, is_call = [np.ravel(v) for v in (price, S, K, T, r, q, is_call)]
+    lower_bound = np.where(is_call, np.maximum(S * np.exp(-q * T) - K * np.exp(-r * T), 0.0),
+                           np.maximum(K * np.exp(-r * T) - S * np.exp(-q * T), 0.0))
+    upper_bound = np.where(is_call, S * np.exp(-q * T), K * np.exp(-r * T))
+    valid = (T > 0) & (price > lower_bound) & (price < upper_bound) & np.isfinite(price)
+
+    lo = np.full(price.shape, low)
+    hi = np.full(price.shape, high)
+    # Brenner-Subrahmanyam starting point, clipped into the bracket
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sigma = np.clip(np.sqrt(2 * np.pi / T) * price / S, low * 2, high / 2)
+    sigma = np.where(valid, sigma, 0.5 * (low + high))
+    active = valid.copy()
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        index = np.nonzero(active)[0]
+        s = sigma[index]
+        error = black_scholes_price(S[index], K[index], T[index], r[index], s, is_call[index], q[index]) - price[index]
+        vega = greeks(S[index], K[index], T[index], r[index], s, is_call[index], q[index])['Vega']
+        lo[index] = np.where(error < 0, s, lo[index])
+        hi[index] = np.where(error > 0, s, hi[index])
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            newton = s - error / vega
+        bisect = 0.5 * (lo[index] + hi[index])
+        use_newton = np.isfinite(newton) & (newton > lo[index]) & (newton < hi[index])
+        step = np.where(use_newton, newton, bisect)
+        sigma[index] = step
+        done = (np.abs(error) < tol) | (np.abs(step - s) < tol * 1e-2) | (hi[index] - lo[index] < tol)
+        active[index[done]] = False
+    converged = valid & (sigma > low) & (sigma < high)
+    return np.where(converged, sigma, np.nan).reshape(shape)
+
+
+def time_to_expiry(expirations, valuation_time=None):
+    """Years (ACT/365) from the valuation time to 4pm on each expiration date."""
+    valuation_time = pd.Timestamp(valuation_time or pd.Timestamp.now())
+    expiry = pd.to_datetime(pd.Series(expirations)).dt.normalize() + pd.Timedelta(hours=16)
+    return ((expiry - valuation_time).dt.total_seconds() / (365.0 * 86400)).to_numpy()
+
+
+def chain_greeks(chain, spot, r=0.0, q=0.0, valuation_time=None, solve_iv=True):
+    """Add IV and greeks to an option chain frame (as returned by download_stock_options or OptionsStore.query).
+
+    Prices use the bid/ask mid where both are quoted and the last trade otherwise. `spot` is a scalar
+    or an array aligned with the rows (for chains of several underlyings). With solve_iv=False the
+    provider's impliedVolatility column is used instead of solving.
+    """
+    chain = chain.copy()
+    bid = chain['bid'].to_numpy(dtype=np.float64)
+    ask = chain['ask'].to_numpy(dtype=np.float64)
+    price = np.where((bid > 0) & (ask > 0), 0.5 * (bid + ask), chain['lastPrice'].to_numpy(dtype=np.float64))
+    S = np.broadcast_to(np.asarray(spot, dtype=np.float64), price.shape)
+    K = chain['strike'].to_numpy(dtype=np.float64)
+    T = time_to_expiry(chain['Expiration'], valuation_time)
+    is_call = (chain['Type'].astype(str) == 'Call').to_numpy()
+    if solve_iv:
+        sigma = implied_volatility(price, S, K, T, r, is_call, q)
+    else:
+        sigma = chain['impliedVolatility'].to_numpy(dtype=np.float64)
+    chain['Mid'] = price
+    chain['IV'] = sigma
+    for name, values in greeks(S, K, T, r, sigma, is_call, q).items():
+        chain[name] = values
+    return chain
+
+
+def multi_chain_greeks(chains, spots, r=0.0, q=0.0, valuation_time=None):
+    """Run `chain_greeks` once over the chains of many underlyings ({ticker: chain}, {ticker: spot})."""
+    combined = pd.concat(chains, names=['Ticker']).reset_index(level=0).reset_index(drop=True)
+    spot = combined['Ticker'].map(spots).to_numpy(dtype=np.float64)
+    return chain_greeks(combined, spot, r, q, valuation_time)
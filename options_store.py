@@ -0,0 +1,135 @@
+import os
+import pandas as pd
+from data_store import FILE_EXTENSIONS, write_frame, read_frame
+
+OPTION_DTYPES = {
+    'contractSymbol': 'string',
+    'strike': 'float32', 'lastPrice': 'float32', 'bid': 'float32', 'ask': 'float32',
+    'change': 'float32', 'percentChange': 'float32', 'impliedVolatility': 'float32',
+    'volume': 'Int32', 'openInterest': 'Int32',
+    'inTheMoney': 'boolean',
+    'contractSize': 'category', 'currency': 'category', 'Type': 'category',
+}
+
+
+def compact_chain(df):
+    """Cast an option chain to compact dtypes (float32 prices, integer volume/OI, categorical labels)."""
+    df = df.copy()
+    for column, dtype in OPTION_DTYPES.items():
+        if column in df.columns:
+            if dtype == 'Int32':
+                df[column] = pd.to_numeric(df[column], errors='coerce').round().astype(dtype)
+            else:
+                df[column] = df[column].astype(dtype)
+    if 'lastTradeDate' in df.columns:
+        df['lastTradeDate'] = pd.to_datetime(df['lastTradeDate'], utc=True).dt.tz_localize(None)
+    if 'Expiration' in df.columns:
+        df['Expiration'] = pd.to_datetime(df['Expiration'])
+    return df
+
+
+class OptionsStore:
+    """Option chains stored as `<TICKER>/Options/<snapshot>/<TICKER>_<expiration>.<ext>` partitions.
+
+    Every download becomes a new snapshot instead of overwriting the last one, and queries only open
+    the partitions whose expiration falls in the requested range.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    def snapshot_directory(self, ticker_symbol, snapshot=None):
+        base = os.path.join(self.store.directory, ticker_symbol, 'Options')
+        return base if snapshot is None else os.path.join(base, snapshot)
+
+    def write_snapshot(self, ticker_symbol, chains, snapshot_time=None):
+        """Write {expiration: chain frame} as one snapshot. Returns the snapshot id.
+
+        Ids are the snapshot time to the second, with a `-<n>` suffix for later snapshots in the same
+        second; they sort chronologically, including after older minute-resolution ids.
+        """
+        stamp = pd.Timestamp(snapshot_time or pd.Timestamp.now()).strftime('%Y-%m-%dT%H%M%S')
+        os.makedirs(self.snapshot_directory(ticker_symbol), exist_ok=True)
+        snapshot, sequence = stamp, 0
+        while True:
+            directory = self.snapshot_directory(ticker_symbol, snapshot)
+            try:
+                os.mkdir(directory)
+                break
+            except FileExistsError:
+                sequence += 1
+                snapshot = f"{stamp}-{sequence}"
+        extension = FILE_EXTENSIONS[self.store.file_format]
+        for expiration, chain in chains.items():
+            path = os.path.join(directory, f"{ticker_symbol}_{expiration}{extension}")
+            write_frame(compact_chain(chain), path, index=False)
+        return snapshot
+
+    def snapshots(self, ticker_symbol):
+        directory = self.snapshot_directory(ticker_symbol)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name for name in os.listdir(directory) if os.path.isdir(os.path.join(directory, name)))
+
+    def partitions(self, ticker_symbol, snapshot):
+        """Return {expiration Timestamp: path} for one snapshot."""
+        directory = self.snapshot_directory(ticker_symbol, snapshot)
+        partitions = {}
+        prefix = f"{ticker_symbol}_"
+        for file_name in os.listdir(directory):
+            name, _ = os.path.splitext(file_name)
+            if name.startswith(prefix):
+                partitions[pd.Timestamp(name[len(prefix):])] = os.path.join(directory, file_name)
+        return dict(sorted(partitions.items()))
+
+    def query(self, ticker_symbol, snapshot=None, expiry_start=None, expiry_end=None, strike_min=None,
+              strike_max=None, moneyness=None, spot=None, option_type=None, columns=None):
+        """Return the contracts of one snapshot (default: the latest) matching the filters.
+
+        `moneyness` is a (low, high) band on strike / spot; `spot` defaults to the latest stored close.
+        Partitions outside [expiry_start, expiry_end] are never read, and strike filters are pushed
+        down into Parquet reads.
+        """
+        snapshots = self.snapshots(ticker_symbol)
+        if not snapshots:
+            print(f"No options data found for {ticker_symbol}.")
+            return None
+        snapshot = snapshot or snapshots[-1]
+        if moneyness is not None:
+            if spot is None:
+                history = self.store.read_history(ticker_symbol, columns=['Close'])
+                spot = None if history is None else float(history['Close'].iloc[-1])
+            if spot is None:
+                raise ValueError(f"A spot price is needed for a moneyness filter on {ticker_symbol}")
+            low, high = moneyness
+            strike_min = max(strike_min or 0.0, low * spot)
+            strike_max = min(strike_max or float('inf'), high * spot)
+        frames = []
+        for expiration, path in self.partitions(ticker_symbol, snapshot).items():
+            if expiry_start is not None and expiration < pd.Timestamp(expiry_start):
+                continue
+            if expiry_end is not None and expiration > pd.Timestamp(expiry_end):
+                continue
+            frames.append(self.read_partition(path, strike_min, strike_max, columns))
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        df = pd.concat(frames, ignore_index=True)
+        if strike_min is not None:
+            df = df[df['strike'] >= strike_min]
+        if strike_max is not None:
+            df = df[df['strike'] <= strike_max]
+        if option_type is not None:
+            df = df[df['Type'] == option_type]
+        return compact_chain(df).reset_index(drop=True)
+
+    def read_partition(self, path, strike_min=None, strike_max=None, columns=None):
+        if columns is not None:
+            columns = list(dict.fromkeys(list(columns) + ['strike', 'Type']))
+        if path.endswith('.parquet'):
+            filters = []
+            if strike_min is not None:
+                filters.append(('strike', '>=', strike_min))
+            if strike_max is not None:
+                filters.append(('strike', '<=', strike_max))
+            return pd.read_parquet(path, columns=columns, filters=filters or None)
+        return read_frame(path, columns=columns)
@@ -1,46 +1,100 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import os
+from data_store import DataStore
+from quote_index import QuoteIndex
+from price_panel import PricePanel
+from monte_carlo import MonteCarloSimulator, plot_fan_chart
+from portfolio_optimizer import PortfolioOptimizer
+from transaction_ledger import TransactionLedger
 
 class PortfolioAnalytics:
     def __init__(self, portfolios_directory='AK47_Finance/Data/Portfolios', historical_data_directory='AK47_Finance/Data'):
         self.portfolios_directory = portfolios_directory
         self.historical_data_directory = historical_data_directory
+        self.store = DataStore(historical_data_directory)
+        self.quotes = QuoteIndex(self.store)
+        self.panel = PricePanel(self.store)
+        self.optimizer = PortfolioOptimizer(self.store)
         self.historical_data = {}
+        self.portfolio_value = None
     
     def load_and_analyze_all_portfolios(self):
         """Load and analyze all portfolios in the directory."""
         portfolio_files = [f for f in os.listdir(self.portfolios_directory) if f.endswith('.csv')]
+        portfolios = {}
         for portfolio_file in portfolio_files:
-            portfolio_path = os.path.join(self.portfolios_directory, portfolio_file)
-            self.load_portfolio_data(portfolio_path)
+            self.load_portfolio_data(os.path.join(self.portfolios_directory, portfolio_file))
+            portfolios[portfolio_file] = self.portfolio
+        # Value every portfolio at once on the shared, aligned price panel
+        all_portfolio_values = self.panel.portfolio_values(portfolios)
+        for portfolio_file, portfolio in portfolios.items():
+            self.portfolio = portfolio
+            self.portfolio_value = all_portfolio_values[portfolio_file]
+            # Portfolios with a transaction ledger are valued with the holdings of each date instead
+            name = portfolio_file[:-4]
+            if os.path.isdir(os.path.join(self.historical_data_directory, 'Ledgers', name)):
+                ledger = TransactionLedger(self.store, name)
+                if len(ledger.entries):
+                    self.portfolio_value = ledger.value_over_time(self.panel, include_cash=False)
             self.load_historical_data()
             print(f"Analyzing portfolio: {portfolio_file}")
             self.visualize_asset_allocation()
             self.visualize_performance()
     
+    def simulate_all_portfolios(self, paths=20000, horizon=252, method='bootstrap', seed=0):
+        """Simulate every portfolio forward; print VaR/CVaR and show a percentile fan chart for each."""
+        portfolios = {}
+        for portfolio_file in sorted(f for f in os.listdir(self.portfolios_directory) if f.endswith('.csv')):
+            self.load_portfolio_data(os.path.join(self.portfolios_directory, portfolio_file))
+            portfolios[portfolio_file] = self.portfolio
+        risk, fans = MonteCarloSimulator(self.store).report(portfolios, paths, horizon, method, seed)
+        print(risk)
+        for portfolio_file, fan in fans.items():
+            plot_fan_chart(fan, f"{portfolio_file}: simulated value over {horizon} trading days")
+        return risk, fans
+
+    def optimize_all_portfolios(self, method='shrinkage', cap=1.0, points=50):
+        """Compare every portfolio's current weights with the min-variance and max-Sharpe weights of its holdings."""
+        comparisons = {}
+        for portfolio_file in sorted(f for f in os.listdir(self.portfolios_directory) if f.endswith('.csv')):
+            self.load_portfolio_data(os.path.join(self.portfolios_directory, portfolio_file))
+            tickers = [ticker for ticker in self.portfolio if ticker != 'Cash']
+            result = self.optimizer.optimize(tickers, method, max(cap, 1 / max(len(tickers), 1)), points)
+            self.quotes.check(result['min_variance'].index)
+            values = pd.Series({ticker: self.quotes.latest_close(ticker) * self.portfolio[ticker]
+                                for ticker in result['min_variance'].index})
+            comparison = pd.DataFrame({'Current': values / values.sum(), 'Min Variance': result['min_variance'],
+                                       'Max Sharpe': result['max_sharpe']})
+            print(f"Optimizing portfolio: {portfolio_file}")
+            print(comparison.round(4))
+            comparisons[portfolio_file] = comparison
+        return comparisons
+
     def load_portfolio_data(self, portfolio_path):
         """Load portfolio data from CSV."""
         self.portfolio = pd.read_csv(portfolio_path).set_index('Ticker')['Shares'].to_dict()
+        self.portfolio_value = None
         
     def load_historical_data(self):
         """Load historical data for each ticker in the portfolio from local files."""
         self.historical_data = {}
         for ticker, shares in self.portfolio.items():
             if ticker != 'Cash':
-                data_file_path = os.path.join(self.historical_data_directory, ticker, f"{ticker}_historical_data.csv")
-                if os.path.exists(data_file_path):
-                    hist_data = pd.read_csv(data_file_path, index_col='Date', parse_dates=True)
-                    self.historical_data[ticker] = hist_data['Close'] * shares
+                close = self.panel.series(ticker)
+                if close is not None:
+                    self.historical_data[ticker] = close * shares
 
     def calculate_portfolio_value_over_time(self):
         """Calculate the total value of the portfolio over time."""
-        portfolio_value = pd.DataFrame(self.historical_data).sum(axis=1)
-        return portfolio_value
+        if self.portfolio_value is None:
+            self.portfolio_value = self.panel.portfolio_values({'Portfolio': self.portfolio})['Portfolio']
+        return self.portfolio_value
     
     def visualize_asset_allocation(self):
         """Visualize the asset allocation of the portfolio."""
-        latest_close_prices = {ticker: data.iloc[-1] for ticker, data in self.historical_data.items()}
+        self.quotes.check(self.historical_data.keys())
+        latest_close_prices = {ticker: self.quotes.latest_close(ticker) * self.portfolio[ticker] for ticker in self.historical_data}
         total_value = sum(latest_close_prices.values())
         print(total_value)
         allocations = {ticker: (value / total_value) * 100 for ticker, value in latest_close_prices.items()}
@@ -1,5 +1,8 @@
 from yf_download import YFDownload
-from datetime import datetime
+from download_scheduler import DownloadScheduler
+from news_store import normalize_news
+from data_store import DataStore
+from transaction_ledger import TransactionLedger
 import pandas as pd
 import os
 
@@ -10,6 +13,8 @@ class PortfolioDownloader:
         self.csv_path = ''
         self.total_cash = initial_cash
         self.portfolio = {}
+        self.store = DataStore(directory)
+        self.ledger = None
         self.load_portfolio()
 
     def ensure_directory_exists(self):
@@ -24,14 +29,19 @@ class PortfolioDownloader:
 
     def load_portfolio(self):
         self.retrieve_portfolio_name()
-        if os.path.exists(self.csv_path):
+        # The ledger is the record of every transaction; the CSV is kept as the net-holdings view
+        self.ledger = TransactionLedger(self.store, self.portfolio_name)
+        if len(self.ledger.entries):
+            self.portfolio, self.total_cash = self.ledger.holdings()
+        elif os.path.exists(self.csv_path):
             df = pd.read_csv(self.csv_path)
-            if 'Cash' in df.columns:
+            if 'Cash' in df['Ticker'].values:
                 cash_row = df[df['Ticker'] == 'Cash']
                 if not cash_row.empty:
                     self.total_cash = cash_row['Shares'].values[0]
                 df = df[df['Ticker'] != 'Cash']
             self.portfolio = df.set_index('Ticker')['Shares'].to_dict()
+            self.ledger.import_portfolio(self.portfolio, self.total_cash)
         else:
             print(f"No portfolio found at {self.csv_path}.")
             self.initialize_portfolio()
@@ -46,6 +56,7 @@ class PortfolioDownloader:
             shares = float(input(f"Enter the number of shares for {ticker_symbol}: "))
             self.portfolio[ticker_symbol] = shares
 
+        self.ledger.import_portfolio(self.portfolio, self.total_cash)
         self.save_portfolio()
         print("Portfolio initialization complete.")
 
@@ -67,21 +78,20 @@ class PortfolioDownloader:
                     shares = float(input("Enter the number of shares: "))
                     if shares < 0:
                         raise ValueError("Number of shares cannot be negative.")
+                    price = input("Enter the price per share (leave blank if unknown): ").strip()
+                    price = float(price) if price else float('nan')
 
                     if buy_or_sell == 'buy':
-                        # If buying, add the shares to the portfolio
-                        if ticker_symbol in self.portfolio:
-                            self.portfolio[ticker_symbol] += shares
-                        else:
-                            self.portfolio[ticker_symbol] = shares
+                        # Record the purchase; holdings and cash are derived from the ledger
+                        self.ledger.record('buy', ticker_symbol, shares, price)
+                        self.portfolio, self.total_cash = self.ledger.holdings()
                         print(f"Added {shares} shares of {ticker_symbol} to your portfolio.")
                     elif buy_or_sell == 'sell':
-                        # If selling, subtract the shares from the portfolio, if possible
+                        # If selling, record the sale only if enough shares are held
                         if ticker_symbol in self.portfolio and self.portfolio[ticker_symbol] >= shares:
-                            self.portfolio[ticker_symbol] -= shares
+                            self.ledger.record('sell', ticker_symbol, shares, price)
+                            self.portfolio, self.total_cash = self.ledger.holdings()
                             print(f"Sold {shares} shares of {ticker_symbol} from your portfolio.")
-                            if self.portfolio[ticker_symbol] == 0:
-                                del self.portfolio[ticker_symbol]  # Remove the ticker if shares are zero
                         else:
                             print("Not enough shares to sell or ticker not in portfolio.")
                     else:
@@ -99,17 +109,32 @@ class PortfolioDownloader:
             else:
                 print("Please answer with 'yes' or 'no'.")
 
-    def retrieve_ticker_data(self):
+    def holdings_as_of(self, date):
+        """Return ({ticker: shares}, cash) held at the end of `date`."""
+        return self.ledger.holdings(date)
+
+    def holdings_over_time(self, dates):
+        """Return a dates x tickers frame of shares held (plus 'Cash') for historical valuation."""
+        return self.ledger.holdings_over_time(dates)
+
+    def retrieve_ticker_data(self, max_workers=8):
         portfolio_details = {}
         total_portfolio_value = self.total_cash  # Start with cash held
 
-        for ticker_symbol, shares in self.portfolio.items():
-            if ticker_symbol == 'Cash':
-                continue
+        # Download every ticker's datasets concurrently, then assemble the details from the report
+        tickers = [ticker_symbol for ticker_symbol in self.portfolio if ticker_symbol != 'Cash']
+        datasets = ['historical_data', 'Info', 'Dividends', 'Earnings_Dates', 'Options', 'News']
+        scheduler = DownloadScheduler(YFDownload(data_directory=self.directory), max_workers=max_workers)
+        report = scheduler.download(tickers, datasets)
+        for record in report.failed:
+            print(f"Error downloading {record['Dataset']} for {record['Ticker']}: {record['Error']}")
+
+        for ticker_symbol in tickers:
+            shares = self.portfolio[ticker_symbol]
             ticker_data = {}
             # Historical data
-            df_hist = YFDownload.download_historical_data(ticker_symbol)
-            if not df_hist.empty:
+            df_hist = report.values.get((ticker_symbol, 'historical_data'))
+            if df_hist is not None and not df_hist.empty:
                 last_close = df_hist['Close'].iloc[-1]
                 total_value = last_close * shares
                 ticker_data.update({'Last Close': last_close, 'Total Value': total_value, 'Shares': shares})
@@ -118,29 +143,29 @@ class PortfolioDownloader:
                 print(f"No historical data for {ticker_symbol}")
 
             # Stock Info
-            stock_info = YFDownload.download_stock_info(ticker_symbol)
+            stock_info = report.values.get((ticker_symbol, 'Info'))
             if stock_info is not None:
                 ticker_data.update({'Stock Info': stock_info})
 
             # Dividends
-            dividends = YFDownload.download_dividends(ticker_symbol)
+            dividends = report.values.get((ticker_symbol, 'Dividends'))
             if dividends is not None and not dividends.empty:
                 ticker_data.update({'Recent Dividend': dividends.iloc[-1]})
 
             # Earnings Dates
-            earnings_dates = YFDownload.download_earnings_dates(ticker_symbol)
+            earnings_dates = report.values.get((ticker_symbol, 'Earnings_Dates'))
             if earnings_dates is not None:
                 ticker_data.update({'Earnings Dates': earnings_dates})
 
             # Options Data (Summary)
-            options_summary = YFDownload.download_stock_options(ticker_symbol)
+            options_summary = report.values.get((ticker_symbol, 'Options'))
             if options_summary is not None:
                 ticker_data.update({'Options Summary': options_summary})
 
             # Stock News (Latest Headline)
-            stock_news = YFDownload.download_stock_news(ticker_symbol)
+            stock_news = report.values.get((ticker_symbol, 'News'))
             if stock_news is not None and len(stock_news) > 0:
-                ticker_data.update({'Latest News': stock_news[0]['title']})
+                ticker_data.update({'Latest News': normalize_news(ticker_symbol, stock_news[:1])['Title'].iloc[0]})
 
             portfolio_details[ticker_symbol] = ticker_data
 
@@ -148,42 +173,11 @@ class PortfolioDownloader:
 
     def update_portfolio_data(self):
         """Updates the portfolio data by downloading only the missing recent data."""
-        for ticker_symbol, shares in self.portfolio.items():
-            if ticker_symbol == 'Cash':
-                continue  
-            print(ticker_symbol)
-            # Determine the directory and file path for historical data
-            data_directory = f"{self.directory}/{ticker_symbol}"
-            data_file_path = f"{data_directory}/{ticker_symbol}_historical_data.csv"
-
-            # Check if historical data file exists
-            if os.path.exists(data_file_path):
-                historical_data = pd.read_csv(data_file_path, parse_dates=['Date'], index_col='Date')
-                print(historical_data)
-                # Find the last date for which data was downloaded
-                last_downloaded_date = historical_data.index.max().tz_localize(None)
-                print(last_downloaded_date)
-                
-                # Determine the date range for new data
-                today = pd.Timestamp(datetime.today().date())  # Ensure we're using a normalized date without time
-                print(today)
-                if last_downloaded_date < today:
-                    # Fetch new data from the day after the last downloaded date up to today
-                    new_data = YFDownload.download_historical_data(ticker_symbol, start=last_downloaded_date + pd.Timedelta(days=1), end=today)
-
-                    # Append new data to existing historical data
-                    if not new_data.empty:
-                        updated_data = pd.concat([historical_data, new_data])
-                        updated_data.to_csv(data_file_path)
-                        print(f"Updated historical data for {ticker_symbol}.")
-                    else:
-                        print(f"No new data to update for {ticker_symbol}.")
-                else:
-                    print(f"Data for {ticker_symbol} is already up to date.")
-            else:
-                print(f"No existing data found for {ticker_symbol}. Downloading full historical data.")
-                # Download full historical data if no existing data found
-                YFDownload.download_historical_data(ticker_symbol)
+        downloader = YFDownload(data_directory=self.directory)
+        tickers = [ticker_symbol for ticker_symbol in self.portfolio if ticker_symbol != 'Cash']
+        for ticker_symbol, new_bars in downloader.history_updater.update_many(tickers).items():
+            if new_bars:
+                print(f"Updated historical data for {ticker_symbol} ({new_bars} bars).")
 
 # # # Example usage
 if __name__ == "__main__":
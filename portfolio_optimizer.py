@@ -0,0 +1,325 @@
+import numpy as np
+import pandas as pd
+from quote_index import file_version
+from price_panel import PricePanel
+from risk_metrics import PERIODS_PER_YEAR
+
+ESTIMATORS = ('sample', 'ewma', 'shrinkage')
+
+
+class CovarianceState:
+    """Running return and covariance estimates of a fixed universe, updated one bar at a time.
+
+    The window sums (sum of returns, cross products and the fourth-moment terms Ledoit-Wolf needs) add
+    the new bar and drop the one leaving a ring buffer, and the EWMA sums decay by one step, so a bar
+    costs O(symbols^2) instead of a rebuild. The window sums are recomputed from the buffer once per
+    window of appends to keep floating point drift from accumulating. Missing returns count as 0.
+    """
+
+    def __init__(self, symbols, window=252, halflife=63):
+        self.symbols = list(symbols)
+        self.window = window
+        self.decay = 0.5 ** (1 / halflife)
+        n = len(self.symbols)
+        self.buffer = np.zeros((window, n))
+        self.position = 0
+        self.rows = 0
+        self.since_resync = 0
+        self.sx, self.sxx, self.q = np.zeros(n), np.zeros((n, n)), np.zeros(n)
+        self.sa = self.saa = 0.0
+        self.ew_weight = 0.0
+        self.ew_sum, self.ew_products = np.zeros(n), np.zeros((n, n))
+
+    @classmethod
+    def from_returns(cls, symbols, returns, window=252, halflife=63):
+        """Build the state from a dates x symbols return matrix with a few matrix products."""
+        state = cls(symbols, window, halflife)
+        returns = np.nan_to_num(np.asarray(returns, dtype=np.float64))
+        tail = returns[-window:]
+        state.buffer[:len(tail)] = tail
+        state.rows = len(tail)
+        state.position = len(tail) % window
+        state.resync()
+        # Weights beyond 20 half-lives are below 1e-6 and left out
+        recent = returns[-int(20 * halflife):]
+        weights = state.decay ** np.arange(len(recent) - 1, -1, -1)
+        state.ew_weight = weights.sum()
+        state.ew_sum = weights @ recent
+        state.ew_products = (recent * weights[:, None]).T @ recent
+        return state
+
+    def resync(self):
+        rows = self.buffer[:self.rows]
+        squares = (rows ** 2).sum(axis=1)
+        self.sx = rows.sum(axis=0)
+        self.sxx = rows.T @ rows
+        self.sa, self.saa, self.q = squares.sum(), (squares ** 2).sum(), squares @ rows
+        self.since_resync = 0
+
+    def append(self, returns_row):
+        """Add one bar of returns (NaN for no bar)."""
+        x = np.nan_to_num(np.asarray(returns_row, dtype=np.float64))
+        if self.rows == self.window:
+            old = self.buffer[self.position]
+            old_square = old @ old
+            self.sx -= old
+            self.sxx -= np.outer(old, old)
+            self.sa -= old_square
+            self.saa -= old_square ** 2
+            self.q -= old_square * old
+        else:
+            self.rows += 1
+        square = x @ x
+        self.sx += x
+        self.sxx += np.outer(x, x)
+        self.sa += square
+        self.saa += square ** 2
+        self.q += square * x
+        self.buffer[self.position] = x
+        self.position = (self.position + 1) % self.window
+        self.ew_weight = self.decay * self.ew_weight + 1
+        self.ew_sum = self.decay * self.ew_sum + x
+        self.ew_products *= self.decay
+        self.ew_products += np.outer(x, x)
+        self.since_resync += 1
+        if self.since_resync >= self.window:
+            self.resync()
+
+    def estimate(self, method='shrinkage'):
+        """Return (mean, covariance) of daily returns: 'sample', 'ewma' or 'shrinkage' (Ledoit-Wolf to a scaled identity)."""
+        if method == 'ewma':
+            mean = self.ew_sum / self.ew_weight
+            return mean, self.ew_products / self.ew_weight - np.outer(mean, mean)
+        if method not in ESTIMATORS:
+            raise ValueError(f"Unknown covariance estimator: {method}")
+        rows = self.rows
+        mean = self.sx / rows
+        if method == 'sample':
+            return mean, (self.sxx - rows * np.outer(mean, mean)) / (rows - 1)
+        sample = self.sxx / rows - np.outer(mean, mean)
+        # sum over the window of |x_t - mean|^4, expanded into the running sums
+        centre = mean @ mean
+        fourth = (self.saa + 4 * mean @ self.sxx @ mean + rows * centre ** 2 - 4 * mean @ self.q
+                  + 2 * centre * self.sa - 4 * centre * (mean @ self.sx))
+        target = np.trace(sample) / len(mean)
+        dispersion = ((sample - target * np.eye(len(mean))) ** 2).sum()
+        if dispersion <= 0:
+            return mean, sample
+        noise = min(max((fourth - rows * (sample ** 2).sum()) / rows ** 2, 0.0), dispersion)
+        shrinkage = noise / dispersion
+        return mean, shrinkage * target * np.eye(len(mean)) + (1 - shrinkage) * sample
+
+
+class CovarianceCache:
+    """CovarianceState per (universe, window, halflife), kept current with the local price store.
+
+    A refresh compares the history file versions of the universe with those the state was built from,
+    reads only the changed histories and appends their bars after the last date seen. If a changed
+    history no longer matches the last price seen (a rewrite rather than an append) the state is rebuilt.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.entries = {}
+        self.rows_appended = 0
+        self.rebuilds = 0
+
+    def versions(self, symbols):
+        paths = {symbol: self.store.find_file(symbol, 'historical_data') for symbol in symbols}
+        return {symbol: file_version(path) for symbol, path in paths.items() if path is not None}
+
+    def get(self, symbols, window=252, halflife=63):
+        """Return the up-to-date CovarianceState of `symbols` (those without stored history are left out)."""
+        key = (tuple(dict.fromkeys(symbols)), window, halflife)
+        versions = self.versions(key[0])
+        entry = self.entries.get(key)
+        if entry is not None and entry['versions'].keys() == versions.keys():
+            changed = [symbol for symbol in entry['state'].symbols if versions[symbol] != entry['versions'][symbol]]
+            if not changed or self.append(entry, changed):
+                entry['versions'] = versions
+                return entry['state']
+        self.entries[key] = self.build(list(versions), window, halflife, versions)
+        return self.entries[key]['state']
+
+    def build(self, symbols, window, halflife, versions):
+        self.rebuilds += 1
+        dates, available, prices = PricePanel(self.store).load(symbols)
+        returns = prices[1:] / prices[:-1] - 1
+        state = CovarianceState.from_returns(available, returns, window, halflife)
+        return {'state': state, 'versions': versions, 'last_date': dates[-1] if len(dates) else None,
+                'last_prices': prices[-1] if len(prices) else np.full(len(available), np.nan)}
+
+    def append(self, entry, changed):
+        """Append the bars the changed histories gained since the last date. False if a rebuild is needed."""
+        state, last_date = entry['state'], entry['last_date']
+        columns = {symbol: column for column, symbol in enumerate(state.symbols)}
+        panel = PricePanel(self.store)
+        new_dates = set()
+        for symbol in changed:
+            series = panel.series(symbol)
+            previous = entry['last_prices'][columns[symbol]]
+            if last_date is None or (not np.isnan(previous) and series.get(last_date) != previous):
+                return False
+            new_dates.update(series.index[series.index > last_date])
+        if not new_dates:
+            return True
+        dates = sorted(new_dates)
+        prices = np.tile(entry['last_prices'], (len(dates) + 1, 1))
+        for symbol in changed:
+            prices[1:, columns[symbol]] = panel.series(symbol).reindex(dates).to_numpy()
+        prices = pd.DataFrame(prices).ffill().to_numpy()
+        for row in prices[1:] / prices[:-1] - 1:
+            state.append(row)
+        self.rows_appended += len(dates)
+        entry['last_date'] = dates[-1]
+        entry['last_prices'] = prices[-1]
+        return True
+
+
+def project_capped_simplex(values, cap=1.0, theta=None, iterations=100):
+    """Euclidean projection of every column onto {w: sum(w) = 1, 0 <= w <= cap}.
+
+    Finds the shift theta with sum(clip(v - theta, 0, cap)) = 1. The sum is piecewise linear in theta,
+    so Newton steps (falling back to false position inside the bracket) end on the exact root in a few
+    passes, fewer still when started from the previous `theta`. Returns (projection, theta).
+    """
+    n = len(values)
+    low, high = values.min(axis=0) - cap, values.max(axis=0)
+    low_error, high_error = np.full(values.shape[1], n * cap - 1.0), np.full(values.shape[1], -1.0)
+    theta = (low + high) / 2 if theta is None else theta
+    for _ in range(iterations):
+        shifted = values - theta
+        error = np.clip(shifted, 0, cap).sum(axis=0) - 1
+        if np.abs(error).max() < 1e-12:
+            break
+        above = error > 0
+        low, low_error = np.where(above, theta, low), np.where(above, error, low_error)
+        high, high_error = np.where(above, high, theta), np.where(above, high_error, error)
+        interior = ((shifted > 0) & (shifted < cap)).sum(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = theta + error / interior
+            secant = low + low_error * (high - low) / (low_error - high_error)
+        theta = np.where((interior > 0) & (newton > low) & (newton < high), newton, secant)
+    return np.clip(values - theta, 0, cap), theta
+
+
+def largest_eigenvalue(matrix, iterations=100):
+    vector = np.ones(len(matrix)) / np.sqrt(len(matrix))
+    value = 0.0
+    for _ in range(iterations):
+        product = matrix @ vector
+        norm = np.linalg.norm(product)
+        if norm == 0:
+            return 0.0
+        vector = product / norm
+        if abs(norm - value) <= 1e-9 * norm:
+            break
+        value = norm
+    return norm
+
+
+def solve_frontier(mean, cov, risk_aversions, cap=1.0, weights=None, tolerance=1e-8, max_iterations=20000,
+                   lipschitz=None):
+    """Minimize w'Σw - τ μ'w for every risk tolerance τ at once, long only with every weight <= cap.
+
+    Each τ is one column of a batched accelerated projected gradient (FISTA with adaptive restart);
+    columns drop out of the batch as they converge. `weights` optionally warm-starts the columns.
+    Returns a symbols x len(τ) weight matrix.
+    """
+    n = len(mean)
+    if cap * n < 1 - 1e-12:
+        raise ValueError(f"A weight cap of {cap} cannot be met with {n} symbols")
+    taus = np.atleast_1d(np.asarray(risk_aversions, dtype=np.float64))
+    # 5% margin on the power-iteration estimate keeps the step within 1/L
+    step = 1 / (1.05 * (lipschitz or 2 * max(largest_eigenvalue(cov), 1e-12)))
+    if weights is None:
+        weights = np.full((n, len(taus)), 1 / n)
+    result, theta = project_capped_simplex(np.array(weights, dtype=np.float64), cap)
+    active = np.arange(len(taus))
+    weights, momentum, linear = result.copy(), result.copy(), np.outer(mean, taus)
+    t = np.ones(len(taus))
+    for _ in range(max_iterations):
+        gradient = 2 * (cov @ momentum) - linear
+        updated, theta = project_capped_simplex(momentum - step * gradient, cap, theta)
+        change = updated - weights
+        converged = np.abs(change).max(axis=0) < tolerance
+        if converged.any():
+            result[:, active[converged]] = updated[:, converged]
+            keep = ~converged
+            if not keep.any():
+                return result
+            active, updated, change, momentum = active[keep], updated[:, keep], change[:, keep], momentum[:, keep]
+            linear, theta, t = linear[:, keep], theta[keep], t[keep]
+        restart = ((momentum - updated) * change).sum(axis=0) > 0
+        t = np.where(restart, 1.0, t)
+        t_next = (1 + np.sqrt(1 + 4 * t * t)) / 2
+        momentum = updated + ((t - 1) / t_next) * change
+        weights, t = updated, t_next
+    result[:, active] = weights
+    return result
+
+
+def portfolio_statistics(weights, mean, cov, risk_free_rate=0.0, periods_per_year=PERIODS_PER_YEAR):
+    """Annualized (return, volatility, Sharpe) of every weight column."""
+    returns = (mean @ weights) * periods_per_year
+    volatility = np.sqrt(np.maximum(np.einsum('ik,ij,jk->k', weights, cov, weights), 0) * periods_per_year)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = (returns - risk_free_rate) / volatility
+    return returns, volatility, sharpe
+
+
+def efficient_frontier(mean, cov, symbols, points=50, cap=1.0, risk_free_rate=0.0, refinements=2):
+    """Solve the long-only, capped frontier of daily return estimates.
+
+    Returns (frontier: Risk Aversion, Return, Volatility, Sharpe per point, weights: symbols x points,
+    min variance weights, max Sharpe weights). The first point (τ = 0) is the minimum-variance portfolio.
+    The max-Sharpe portfolio is the best frontier point, refined `refinements` times on a finer batch of
+    τ between its neighbours (Sharpe is unimodal along the frontier).
+    """
+    lipschitz = 2 * max(largest_eigenvalue(cov), 1e-12)
+    scale = lipschitz / max(np.ptp(mean), 1e-12)
+    taus = np.concatenate([[0.0], scale * np.logspace(-4, 1, points - 1)])
+    weights = solve_frontier(mean, cov, taus, cap, lipschitz=lipschitz)
+    returns, volatility, sharpe = portfolio_statistics(weights, mean, cov, risk_free_rate)
+    best_taus, best_weights, best_sharpe = taus, weights, np.nan_to_num(sharpe, nan=-np.inf)
+    for _ in range(refinements):
+        best = int(np.argmax(best_sharpe))
+        grid = np.linspace(best_taus[max(best - 1, 0)], best_taus[min(best + 1, len(best_taus) - 1)], 9)
+        start = np.repeat(best_weights[:, [best]], len(grid), axis=1)
+        best_taus = grid
+        best_weights = solve_frontier(mean, cov, grid, cap, start, lipschitz=lipschitz)
+        best_sharpe = np.nan_to_num(portfolio_statistics(best_weights, mean, cov, risk_free_rate)[2], nan=-np.inf)
+    frontier = pd.DataFrame({'Risk Aversion': taus, 'Return': returns, 'Volatility': volatility, 'Sharpe': sharpe})
+    return (frontier, pd.DataFrame(weights, index=symbols), pd.Series(weights[:, 0], index=symbols),
+            pd.Series(best_weights[:, int(np.argmax(best_sharpe))], index=symbols))
+
+
+class PortfolioOptimizer:
+    """Mean-variance optimization of universes of stored symbols on cached, incrementally updated estimates."""
+
+    def __init__(self, store, window=252, halflife=63, risk_free_rate=0.0):
+        self.store = store
+        self.window = window
+        self.halflife = halflife
+        self.risk_free_rate = risk_free_rate
+        self.covariances = CovarianceCache(store)
+
+    def estimates(self, symbols, method='shrinkage', window=None):
+        """Return (symbols, daily mean returns, daily covariance) of the symbols with stored history."""
+        state = self.covariances.get(symbols, window or self.window, self.halflife)
+        mean, cov = state.estimate(method)
+        return state.symbols, mean, cov
+
+    def optimize(self, symbols, method='shrinkage', cap=1.0, points=50, window=None):
+        """Return {'frontier', 'weights', 'min_variance', 'max_sharpe'} for a universe (see efficient_frontier)."""
+        available, mean, cov = self.estimates(symbols, method, window)
+        missing = set(symbols) - set(available)
+        if missing:
+            print(f"No historical data found for {', '.join(sorted(missing))}.")
+        frontier, weights, min_variance, max_sharpe = efficient_frontier(mean, cov, available, points, cap,
+                                                                         self.risk_free_rate)
+        return {'frontier': frontier, 'weights': weights, 'min_variance': min_variance, 'max_sharpe': max_sharpe}
+
+    def optimize_many(self, universes, method='shrinkage', cap=1.0, points=50, window=None):
+        """Optimize every {name: symbols} universe. Universes sharing symbols and window reuse cached estimates."""
+        return {name: self.optimize(symbols, method, cap, points, window) for name, symbols in universes.items()}
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+
+def align_series(dates_list, values_list, dtype=np.float64):
+    """Align per-symbol (dates, values) arrays on their union calendar. Returns (dates, dates x symbols matrix)."""
+    dates_list = [np.asarray(dates, dtype='datetime64[ns]') for dates in dates_list]
+    calendar = np.unique(np.concatenate(dates_list)) if dates_list else np.array([], dtype='datetime64[ns]')
+    matrix = np.full((len(calendar), len(dates_list)), np.nan, dtype=dtype)
+    for column, (dates, values) in enumerate(zip(dates_list, values_list)):
+        matrix[np.searchsorted(calendar, dates), column] = values
+    return pd.DatetimeIndex(calendar, name='Date'), matrix
+
+
+def forward_fill(matrix, limit=None):
+    """Carry each column's last price over missing rows, at most `limit` rows; rows before a column's first price stay NaN."""
+    rows = np.arange(matrix.shape[0], dtype=np.int32)[:, None]
+    last_valid = np.where(np.isnan(matrix), np.int32(-1), rows)
+    np.maximum.accumulate(last_valid, axis=0, out=last_valid)
+    filled = np.take_along_axis(matrix, np.maximum(last_valid, 0), axis=0)
+    missing = last_valid < 0
+    if limit is not None:
+        missing |= (rows - last_valid) > limit
+    filled[missing] = np.nan
+    return filled
+
+
+class PricePanel:
+    """Aligned date x symbol price matrix for a universe of tickers, shared across portfolios.
+
+    Each symbol's series is read from the store once and kept; `load` aligns any subset on the union
+    of their trading calendars and forward-fills gaps (up to `ffill_limit` rows, unlimited by default)
+    so a missing day or a different exchange calendar carries the last price instead of dropping the
+    holding's value.
+    """
+
+    def __init__(self, store, column='Close', ffill_limit=None, dtype=np.float64):
+        self.store = store
+        self.column = column
+        self.ffill_limit = ffill_limit
+        self.dtype = dtype
+        self.loaded = {}
+
+    def series(self, symbol):
+        """Return a symbol's stored price series (read once per panel), or None if it has no history."""
+        if symbol not in self.loaded:
+            history = self.store.read_history(symbol, columns=[self.column])
+            self.loaded[symbol] = None if history is None else history[self.column].dropna()
+        return self.loaded[symbol]
+
+    def load(self, symbols):
+        """Return (dates, symbols with data, forward-filled dates x symbols matrix)."""
+        available = [symbol for symbol in dict.fromkeys(symbols) if self.series(symbol) is not None]
+        dates, matrix = align_series([self.loaded[s].index.values for s in available],
+                                     [self.loaded[s].values for s in available], self.dtype)
+        return dates, available, forward_fill(matrix, self.ffill_limit)
+
+    def portfolio_values(self, portfolios):
+        """Value every portfolio ({name: {ticker: shares}}) over time with one matrix multiply.
+
+        Returns a dates x portfolios DataFrame. Holdings without stored history are reported and left out.
+        """
+        universe = [ticker for holdings in portfolios.values() for ticker in holdings if ticker != 'Cash']
+        dates, symbols, prices = self.load(universe)
+        missing = set(universe) - set(symbols)
+        if missing:
+            print(f"No historical data found for {', '.join(sorted(missing))}.")
+        holdings = holdings_matrix(portfolios, symbols, self.dtype)
+        values = np.nan_to_num(prices) @ holdings.T
+        return pd.DataFrame(values, index=dates, columns=list(portfolios))
+
+
+def holdings_matrix(portfolios, symbols, dtype=np.float64):
+    """Return a portfolios x symbols matrix of share counts."""
+    columns = {symbol: column for column, symbol in enumerate(symbols)}
+    matrix = np.zeros((len(portfolios), len(symbols)), dtype=dtype)
+    for row, holdings in enumerate(portfolios.values()):
+        for ticker, shares in holdings.items():
+            if ticker in columns:
+                matrix[row, columns[ticker]] += shares
+    return matrix
@@ -0,0 +1,121 @@
+import os
+import threading
+import pandas as pd
+from data_store import parse_dates, read_frame
+
+QUOTE_COLUMNS = ['Symbol', 'Date', 'Close', 'Volume', 'Source', 'Version']
+
+
+def file_version(path):
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+class QuoteIndex:
+    """Consolidated table of each symbol's last stored bar (date, close, volume) and the file version it came from.
+
+    The download and update paths record into it as they write histories, so valuing portfolios is
+    one small read instead of one history parse per holding. `check` compares every entry with the
+    current version of its source file and rebuilds the stale ones from the store.
+    """
+
+    def __init__(self, store, index_file=None):
+        self.store = store
+        self.index_file = index_file or os.path.join(store.directory, 'latest_quotes.csv')
+        self.lock = threading.Lock()
+        self.loaded_version = None
+        self.quotes = self.load()
+
+    def load(self):
+        if not os.path.exists(self.index_file):
+            return {}
+        self.loaded_version = file_version(self.index_file)
+        df = pd.read_csv(self.index_file, parse_dates=['Date'], dtype={'Version': str})
+        return {row['Symbol']: row for row in df.to_dict('records')}
+
+    def refresh(self):
+        """Reload the index if another process rewrote it since it was loaded."""
+        with self.lock:
+            if os.path.exists(self.index_file) and file_version(self.index_file) != self.loaded_version:
+                self.quotes = self.load()
+
+    def save(self):
+        with self.lock:
+            df = pd.DataFrame(list(self.quotes.values()), columns=QUOTE_COLUMNS)
+            os.makedirs(os.path.dirname(self.index_file) or '.', exist_ok=True)
+            df.to_csv(self.index_file, index=False)
+            self.loaded_version = file_version(self.index_file)
+
+    def record(self, symbol, history, path):
+        """Record the last bar of `history`, just written to `path`.
+
+        If the index holds a later bar, `history` was only a window of the file (or replaced a longer
+        history), so the last bar is read back from `path` instead.
+        """
+        if history is None or history.empty:
+            return
+        with self.lock:
+            current = self.quotes.get(symbol)
+        if current is not None and pd.Timestamp(current['Date']) > parse_dates(history.index).max():
+            history = read_frame(path, index_col='Date')
+            if history.empty:
+                with self.lock:
+                    self.quotes.pop(symbol, None)
+                return
+        dates = parse_dates(history.index)
+        last = history.iloc[dates.argmax()]
+        with self.lock:
+            self.quotes[symbol] = {'Symbol': symbol, 'Date': dates.max(), 'Close': float(last['Close']),
+                                   'Volume': float(last['Volume']) if 'Volume' in last else None,
+                                   'Source': path, 'Version': file_version(path)}
+
+    def rebuild_symbol(self, symbol, directory=None):
+        """Rebuild one entry from the stored history. Returns False if the symbol has no history."""
+        path = self.store.find_file(symbol, 'historical_data', directory)
+        if path is None:
+            with self.lock:
+                self.quotes.pop(symbol, None)
+            return False
+        history = self.store.read_history(symbol, columns=['Close', 'Volume'], directory=directory)
+        with self.lock:
+            self.quotes.pop(symbol, None)
+        self.record(symbol, history, path)
+        return True
+
+    def check(self, symbols=None, rebuild=True):
+        """Return the symbols whose entries are missing or stale, rebuilding (and saving) them when `rebuild`."""
+        symbols = list(self.quotes) if symbols is None else list(symbols)
+        stale = []
+        for symbol in symbols:
+            quote = self.quotes.get(symbol)
+            if quote is not None and os.path.exists(quote['Source']) and quote['Version'] == file_version(quote['Source']):
+                continue
+            if quote is None and self.store.find_file(symbol, 'historical_data') is None:
+                continue
+            stale.append(symbol)
+        if rebuild and stale:
+            for symbol in stale:
+                quote = self.quotes.get(symbol)
+                directory = os.path.relpath(os.path.dirname(quote['Source']), self.store.directory) if quote is not None else None
+                self.rebuild_symbol(symbol, directory)
+            self.save()
+        return stale
+
+    def rebuild_all(self):
+        """Rebuild the whole index by scanning the store for histories."""
+        self.quotes = {}
+        suffix = '_historical_data'
+        for root, _, files in os.walk(self.store.directory):
+            for file_name in files:
+                name, _ = os.path.splitext(file_name)
+                if name.endswith(suffix):
+                    symbol = name[:-len(suffix)]
+                    self.rebuild_symbol(symbol, os.path.relpath(root, self.store.directory))
+        self.save()
+
+    def latest_close(self, symbol):
+        quote = self.quotes.get(symbol)
+        return None if quote is None else quote['Close']
+
+    def to_frame(self):
+        return pd.DataFrame(list(self.quotes.values()), columns=QUOTE_COLUMNS).set_index('Symbol')
@@ -0,0 +1,202 @@
+import abc
+import time
+import threading
+import numpy as np
+
+# Treeview columns updated by the stream ("Ticker", "Shares", "Value", "Total_Value", "Weight")
+VALUE_COLUMN, TOTAL_VALUE_COLUMN, WEIGHT_COLUMN = 2, 3, 4
+
+
+class QuoteFeed(abc.ABC):
+    """Interface of a streaming quote source.
+
+    `start(table)` begins pushing ticks with `table.update(symbols, prices)` from the feed's own thread;
+    `subscribe` replaces the set of streamed symbols (`reference_prices` is a hint a feed may ignore).
+    """
+
+    @abc.abstractmethod
+    def subscribe(self, symbols, reference_prices=None):
+        """Stream `symbols` instead of the current set."""
+
+    @abc.abstractmethod
+    def start(self, table):
+        """Start pushing ticks into `table` from the feed's thread."""
+
+    @abc.abstractmethod
+    def stop(self):
+        """Stop streaming and wait for the feed's thread."""
+
+
+class SimulatedFeed(QuoteFeed):
+    """Local feed producing random-walk ticks for the subscribed symbols at `rate` ticks per second."""
+
+    def __init__(self, rate=2000, batch_interval=0.01, volatility=0.0005, seed=None):
+        self.rate = rate
+        self.batch_interval = batch_interval
+        self.volatility = volatility
+        self.rng = np.random.default_rng(seed)
+        self.symbols = np.array([], dtype=object)
+        self.prices = np.array([])
+        self.lock = threading.Lock()
+        self.running = threading.Event()
+        self.thread = None
+        self.ticks_sent = 0
+
+    def subscribe(self, symbols, reference_prices=None):
+        reference_prices = reference_prices or {}
+        with self.lock:
+            current = dict(zip(self.symbols, self.prices))
+            self.symbols = np.array(list(symbols), dtype=object)
+            self.prices = np.array([current.get(s) or reference_prices.get(s) or 100.0 for s in self.symbols])
+
+    def start(self, table):
+        self.running.set()
+        self.thread = threading.Thread(target=self.run, args=(table,), name='simulated-feed', daemon=True)
+        self.thread.start()
+
+    def run(self, table):
+        next_batch = time.perf_counter()
+        while self.running.is_set():
+            with self.lock:
+                count = int(self.rate * self.batch_interval)
+                if len(self.symbols) and count:
+                    rows = self.rng.integers(0, len(self.symbols), count)
+                    for row, shock in zip(rows, self.rng.normal(0, self.volatility, count)):
+                        self.prices[row] *= 1 + shock
+                    table.update(self.symbols[rows], self.prices[rows])
+                    self.ticks_sent += count
+            next_batch += self.batch_interval
+            time.sleep(max(0.0, next_batch - time.perf_counter()))
+
+    def stop(self):
+        self.running.clear()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+
+class LatestPriceTable:
+    """Thread-safe latest price per symbol. Ticks for the same symbol between two reads coalesce into one change."""
+
+    def __init__(self):
+        self.prices = {}
+        self.changed = {}
+        self.ticks = 0
+        self.lock = threading.Lock()
+
+    def update(self, symbols, prices):
+        with self.lock:
+            for symbol, price in zip(symbols, prices):
+                self.prices[symbol] = price
+                self.changed[symbol] = price
+            self.ticks += len(symbols)
+
+    def take_changes(self):
+        """Return {symbol: latest price} for the symbols that ticked since the last call."""
+        with self.lock:
+            changed, self.changed = self.changed, {}
+        return changed
+
+    def latest(self, symbol):
+        return self.prices.get(symbol)
+
+
+class LivePortfolio:
+    """Holdings valued from streamed prices, with the total maintained from per-tick deltas.
+
+    `apply` touches only the rows whose price changed; the running total is resynchronised with a
+    full sum every `resync_every` applies to keep floating-point drift bounded.
+    """
+
+    def __init__(self, holdings, prices, resync_every=1000):
+        self.symbols = list(holdings)
+        self.rows = {symbol: row for row, symbol in enumerate(self.symbols)}
+        self.shares = np.array([holdings[s] for s in self.symbols], dtype=np.float64)
+        self.prices = np.array([prices.get(s) or 0.0 for s in self.symbols], dtype=np.float64)
+        self.values = self.shares * self.prices
+        self.total = self.values.sum()
+        self.resync_every = resync_every
+        self.applied = 0
+
+    def apply(self, changes):
+        """Apply {symbol: price}; returns the row indices whose value changed."""
+        pairs = [(self.rows[s], price) for s, price in changes.items() if s in self.rows]
+        if not pairs:
+            return np.array([], dtype=np.intp)
+        rows = np.fromiter((row for row, _ in pairs), dtype=np.intp, count=len(pairs))
+        prices = np.fromiter((price for _, price in pairs), dtype=np.float64, count=len(pairs))
+        values = self.shares[rows] * prices
+        self.total += (values - self.values[rows]).sum()
+        self.values[rows] = values
+        self.prices[rows] = prices
+        self.applied += 1
+        if self.applied % self.resync_every == 0:
+            self.total = self.values.sum()
+        return rows
+
+    def weights(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.nan_to_num(self.values / self.total * 100)
+
+
+class LiveQuoteView:
+    """Pushes streamed prices into a TreeviewPager's table at no more than `fps` redraws per second.
+
+    Each frame takes the coalesced changes from the price table, updates the Value and Total Value cells
+    of the rows that ticked, and rewrites a Weight cell only if its displayed (2-decimal) value changed.
+    """
+
+    def __init__(self, root, pager, feed, fps=10):
+        self.root = root
+        self.pager = pager
+        self.feed = feed
+        self.frame_interval = int(1000 / fps)
+        self.table = LatestPriceTable()
+        self.portfolio = None
+        self.shown_weights = None
+        self.after_id = None
+        self.frames = 0
+        self.cells_updated = 0
+        self.frame_seconds = 0.0
+
+    def watch(self, holdings, prices):
+        """Stream the holdings ({ticker: shares}) shown in the pager's rows, starting from `prices`."""
+        self.portfolio = LivePortfolio(holdings, prices)
+        self.shown_weights = np.round(self.portfolio.weights(), 2)
+        self.table.take_changes()
+        self.feed.subscribe(self.portfolio.symbols, prices)
+        if self.after_id is None:
+            self.feed.start(self.table)
+            self.after_id = self.root.after(self.frame_interval, self.draw_frame)
+
+    def clear(self):
+        """Stop drawing into the table (e.g. while another portfolio loads); the feed keeps running."""
+        self.portfolio = None
+
+    def draw_frame(self):
+        start = time.perf_counter()
+        changes = self.table.take_changes()
+        if changes and self.portfolio is not None:
+            portfolio = self.portfolio
+            for row in portfolio.apply(changes):
+                self.pager.set_cell(row, VALUE_COLUMN, f"${portfolio.prices[row]:,.2f}")
+                self.pager.set_cell(row, TOTAL_VALUE_COLUMN, f"${portfolio.values[row]:,.2f}")
+                self.cells_updated += 2
+            weights = np.round(portfolio.weights(), 2)
+            for row in np.flatnonzero(weights != self.shown_weights):
+                self.pager.set_cell(row, WEIGHT_COLUMN, f"{weights[row]:.2f}%")
+                self.cells_updated += 1
+            self.shown_weights = weights
+        self.frames += 1
+        self.frame_seconds += time.perf_counter() - start
+        self.after_id = self.root.after(self.frame_interval, self.draw_frame)
+
+    def stop(self):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+        self.feed.stop()
+
+    def stats(self):
+        return {'Ticks': self.table.ticks, 'Frames': self.frames, 'Cells Updated': self.cells_updated,
+                'Avg Frame (ms)': self.frame_seconds / max(self.frames, 1) * 1000}
@@ -0,0 +1,344 @@
+import os
+import sys
+import time
+import heapq
+import datetime as dt
+import threading
+import itertools
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from market_calendar import MarketCalendar
+
+
+class SystemClock:
+    simulated = False
+
+    def now(self):
+        return pd.Timestamp.now(tz='UTC')
+
+    def sleep_until(self, moment, stop_event=None, max_sleep=60.0):
+        """Sleep until `moment` in slices of at most `max_sleep` seconds, returning early once `stop_event` is set."""
+        while not (stop_event is not None and stop_event.is_set()):
+            remaining = (moment - self.now()).total_seconds()
+            if remaining <= 0:
+                return
+            if stop_event is not None:
+                stop_event.wait(min(remaining, max_sleep))
+            else:
+                time.sleep(min(remaining, max_sleep))
+
+    def elapsed(self, start):
+        return time.perf_counter() - start
+
+    def timer(self):
+        return time.perf_counter()
+
+
+class SimulatedClock:
+    """A clock that only moves when slept on or advanced, so a week of scheduling runs in milliseconds.
+
+    Jobs may `advance` it to simulate how long their work takes. The scheduler lets running jobs
+    finish before it moves a simulated clock to the next due time.
+    """
+    simulated = True
+
+    def __init__(self, start):
+        self.current = pd.Timestamp(start)
+        if self.current.tz is None:
+            self.current = self.current.tz_localize('UTC')
+        self.lock = threading.Lock()
+
+    def now(self):
+        with self.lock:
+            return self.current
+
+    def advance(self, seconds):
+        with self.lock:
+            self.current += pd.Timedelta(seconds=seconds)
+
+    def sleep_until(self, moment, stop_event=None, max_sleep=None):
+        with self.lock:
+            self.current = max(self.current, moment)
+
+    def timer(self):
+        return self.now()
+
+    def elapsed(self, start):
+        return (self.now() - start).total_seconds()
+
+
+class AfterClose:
+    """Once per session, `delay` after its close (daily bars)."""
+
+    def __init__(self, delay=pd.Timedelta(minutes=30)):
+        self.delay = pd.Timedelta(delay)
+
+    def next_run(self, calendar, after):
+        day = calendar.previous_session(calendar.local(after))
+        while calendar.session_close(day) + self.delay <= after:
+            day = calendar.next_session(day, inclusive=False)
+        return calendar.session_close(day) + self.delay, str(day)
+
+
+class Every:
+    """Every `minutes` from the open to the close of each session (intraday bars)."""
+
+    def __init__(self, minutes=15):
+        self.step = pd.Timedelta(minutes=minutes)
+
+    def next_run(self, calendar, after):
+        day = calendar.next_session(calendar.local(after))
+        while True:
+            opened, closed = calendar.session_open(day), calendar.session_close(day)
+            if after < closed:
+                slots = max(0, (after - opened) // self.step + 1)
+                moment = opened + slots * self.step
+                if moment <= closed:
+                    return moment, f"{day} {moment:%H:%M}"
+            day = calendar.next_session(day, inclusive=False)
+
+
+class AtTimes:
+    """At fixed exchange-local times of each session, skipping times after an early close (options chains)."""
+
+    def __init__(self, times=('10:00', '15:30')):
+        self.times = sorted(dt.time.fromisoformat(t) for t in times)
+
+    def next_run(self, calendar, after):
+        day = calendar.next_session(calendar.local(after))
+        while True:
+            for clock_time in self.times:
+                moment = pd.Timestamp(dt.datetime.combine(day, clock_time), tz=calendar.timezone)
+                if after < moment <= calendar.session_close(day):
+                    return moment, f"{day} {clock_time:%H:%M}"
+            day = calendar.next_session(day, inclusive=False)
+
+
+class Weekly:
+    """Once per week with at least one session, `delay` after the week's last close (fundamentals)."""
+
+    def __init__(self, delay=pd.Timedelta(hours=2)):
+        self.delay = pd.Timedelta(delay)
+
+    def next_run(self, calendar, after):
+        day = calendar.local(after).date() - dt.timedelta(days=calendar.local(after).weekday())
+        while True:
+            sessions = calendar.sessions(day, day + dt.timedelta(days=4))
+            if sessions and calendar.session_close(sessions[-1]) + self.delay > after:
+                year, week, _ = sessions[-1].isocalendar()
+                return calendar.session_close(sessions[-1]) + self.delay, f"{year}-W{week:02d}"
+            day += dt.timedelta(days=7)
+
+
+class RefreshScheduler:
+    """Runs refresh jobs on their cadences against a market calendar.
+
+    Each job has a cadence (AfterClose, Every, AtTimes, Weekly) giving its next run time and the
+    period it covers (a session, a slot or a week). Non-session days produce no runs, runs missed
+    while the process was down collapse into one catch-up run, and the last period done per job is
+    kept in `state_file`, so a restarted service does not redo a period. Due jobs go to a thread pool
+    (or run inline with max_workers=0); `stats` reports runs, lateness and duration per job and the
+    queue depth.
+    """
+
+    def __init__(self, calendar=None, clock=None, max_workers=2, state_file=None):
+        self.calendar = calendar or MarketCalendar()
+        self.clock = clock or SystemClock()
+        self.state_file = state_file
+        self.executor = ThreadPoolExecutor(max_workers=max_workers) if max_workers else None
+        self.jobs = {}
+        self.heap = []
+        self.sequence = itertools.count()
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.queued = 0
+        self.max_queue_depth = 0
+        self.futures = []
+        self.state = self.load_state()
+
+    def load_state(self):
+        if not self.state_file or not os.path.exists(self.state_file):
+            return {}
+        df = pd.read_csv(self.state_file, dtype=str)
+        return {row['Job']: {'Key': row['Key'], 'Last Run': pd.Timestamp(row['Last Run'])} for row in df.to_dict('records')}
+
+    def save_state(self):
+        if not self.state_file:
+            return
+        with self.lock:
+            rows = [{'Job': name, 'Key': entry['Key'], 'Last Run': entry['Last Run']} for name, entry in self.state.items()]
+        os.makedirs(os.path.dirname(self.state_file) or '.', exist_ok=True)
+        pd.DataFrame(rows, columns=['Job', 'Key', 'Last Run']).to_csv(self.state_file, index=False)
+
+    def add(self, name, cadence, action):
+        """Register `action()` to run on `cadence`."""
+        self.jobs[name] = {'cadence': cadence, 'action': action, 'runs': 0, 'skipped': 0, 'failures': 0,
+                           'lateness': [], 'durations': [], 'last_error': None, 'active': False}
+        last = self.state.get(name)
+        self.schedule(name, last['Last Run'] if last else self.clock.now())
+
+    def schedule(self, name, after):
+        cadence, now = self.jobs[name]['cadence'], self.clock.now()
+        moment, key = cadence.next_run(self.calendar, after)
+        # Runs missed while nothing was running collapse into the latest one
+        while moment < now:
+            following = cadence.next_run(self.calendar, moment)
+            if following[0] > now:
+                break
+            moment, key = following
+        with self.lock:
+            heapq.heappush(self.heap, (moment, next(self.sequence), name, key))
+
+    def next_due(self):
+        with self.lock:
+            return self.heap[0][0] if self.heap else None
+
+    def run_pending(self):
+        """Start every job that is due. Returns the number started."""
+        now = self.clock.now()
+        due = []
+        with self.lock:
+            while self.heap and self.heap[0][0] <= now:
+                due.append(heapq.heappop(self.heap))
+        self.futures = [future for future in self.futures if not future.done()]
+        started = 0
+        for moment, _, name, key in due:
+            self.schedule(name, moment)
+            job, done = self.jobs[name], self.state.get(name)
+            # A period already done (before a restart) or a job still busy with an earlier period is skipped
+            if (done is not None and done['Key'] == key) or job['active']:
+                job['skipped'] += 1
+                continue
+            with self.lock:
+                job['active'] = True
+                self.queued += 1
+                self.max_queue_depth = max(self.max_queue_depth, self.queued)
+            if self.executor is None:
+                self.execute(name, key, moment)
+            else:
+                self.futures.append(self.executor.submit(self.execute, name, key, moment))
+            started += 1
+        return started
+
+    def execute(self, name, key, due):
+        job = self.jobs[name]
+        started = self.clock.now()
+        with self.lock:
+            self.queued -= 1
+        job['lateness'].append((started - due).total_seconds())
+        timer = self.clock.timer()
+        try:
+            job['action']()
+            job['runs'] += 1
+            with self.lock:
+                self.state[name] = {'Key': key, 'Last Run': due}
+            self.save_state()
+        except Exception as e:
+            job['failures'] += 1
+            job['last_error'] = f"{type(e).__name__}: {e}"
+            print(f"Refresh job {name} failed for {key}: {job['last_error']}")
+        job['durations'].append(self.clock.elapsed(timer))
+        job['active'] = False
+
+    def run(self, until=None):
+        """Run jobs as they fall due until `until` (a timestamp) or until `stop` is called."""
+        until = pd.Timestamp(until) if until is not None else None
+        while not self.stop_event.is_set():
+            self.run_pending()
+            moment = self.next_due()
+            if moment is None or (until is not None and moment > until):
+                break
+            if self.clock.simulated:
+                self.drain()
+            self.clock.sleep_until(moment, self.stop_event)
+        if self.clock.simulated:
+            self.drain()
+        if until is not None:
+            self.clock.sleep_until(until, self.stop_event)
+
+    def drain(self):
+        """Wait for every submitted job to finish."""
+        futures, self.futures = self.futures, []
+        for future in futures:
+            future.result()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+
+    def stats(self):
+        """Per-job runs, skips, failures, lateness and duration (seconds), plus the next run and queue depth."""
+        with self.lock:
+            upcoming = {}
+            for moment, _, name, _ in sorted(self.heap):
+                upcoming.setdefault(name, moment)
+        rows = {}
+        for name, job in self.jobs.items():
+            lateness, durations = pd.Series(job['lateness'], dtype=float), pd.Series(job['durations'], dtype=float)
+            rows[name] = {'Runs': job['runs'], 'Skipped': job['skipped'], 'Failures': job['failures'],
+                          'Mean Lateness': lateness.mean(), 'Max Lateness': lateness.max(),
+                          'Mean Duration': durations.mean(), 'Max Duration': durations.max(),
+                          'Next Run': upcoming.get(name)}
+        frame = pd.DataFrame.from_dict(rows, orient='index')
+        frame.attrs['Queue Depth'] = self.queued
+        frame.attrs['Max Queue Depth'] = self.max_queue_depth
+        return frame
+
+
+class RefreshService:
+    """Long-running refresh of every portfolio's data with one warm YFDownload (and its cached stores).
+
+    Daily bars and the market indexes after each close, intraday bars every `intraday_minutes` during
+    the session, option chains at `option_times`, and statements and info weekly; the news segments are
+    compacted after the daily run. The universe is re-planned from the portfolio files on every run,
+    so portfolio edits are picked up without a restart.
+    """
+
+    def __init__(self, downloader, portfolios_directory, clock=None, calendar=None, intraday_minutes=15,
+                 intraday_interval='1m', option_times=('10:00', '15:30'), max_workers=2, download_workers=8):
+        from universe_planner import UniversePlanner
+        self.downloader = downloader
+        self.planner = UniversePlanner(portfolios_directory)
+        self.intraday_interval = intraday_interval
+        self.download_workers = download_workers
+        state_file = os.path.join(downloader.data_directory, 'refresh_state.csv')
+        self.scheduler = RefreshScheduler(calendar, clock, max_workers, state_file)
+        self.scheduler.add('daily_bars', AfterClose(), self.refresh_daily)
+        self.scheduler.add('intraday', Every(intraday_minutes), self.refresh_intraday)
+        self.scheduler.add('options', AtTimes(option_times), lambda: self.refresh_datasets(['Options']))
+        self.scheduler.add('fundamentals', Weekly(),
+                           lambda: self.refresh_datasets(['Balance_Sheet', 'Income_Stmt', 'Cash_Flows', 'Info']))
+
+    def symbols(self):
+        return list(dict.fromkeys(ticker for tickers in self.planner.portfolio_tickers().values() for ticker in tickers))
+
+    def refresh_daily(self):
+        self.planner.run(self.downloader)
+        # Merge the day's news segments so readers index one file instead of one per fetch
+        self.downloader.news_store.compact()
+
+    def refresh_intraday(self):
+        self.refresh_datasets([f"intraday_{self.intraday_interval}"])
+
+    def refresh_datasets(self, datasets):
+        from download_scheduler import DownloadScheduler
+        report = DownloadScheduler(self.downloader, max_workers=self.download_workers).download(self.symbols(), datasets)
+        for record in report.failed:
+            print(f"Error downloading {record['Dataset']} for {record['Ticker']}: {record['Error']}")
+        return report
+
+    def run(self, until=None):
+        try:
+            self.scheduler.run(until)
+        finally:
+            self.scheduler.stop()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        from yf_download import YFDownload
+        data_directory = sys.argv[2] if len(sys.argv) > 2 else 'AK47_Finance/Data'
+        RefreshService(YFDownload(data_directory=data_directory), os.path.join(data_directory, 'Portfolios')).run()
+    else:
+        print("Usage: python refresh_service.py serve [data directory]")
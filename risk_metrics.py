@@ -0,0 +1,187 @@
+import numpy as np
+import pandas as pd
+
+PERIODS_PER_YEAR = 252
+METRICS = ['Volatility', 'Beta', 'Correlation', 'Tracking Error', 'Sharpe', 'Sortino']
+
+
+def to_returns(prices):
+    """Simple daily returns of a dates x symbols price (or portfolio value) frame; gaps stay NaN."""
+    return prices.pct_change(fill_method=None).iloc[1:]
+
+
+def _rolling_sum(values, window):
+    sums = np.cumsum(values, axis=0)
+    sums[window:] -= sums[:-window].copy()
+    return sums
+
+
+def _metrics_from_sums(n, sx, sy, sxx, syy, sxy, sdd, risk_free_rate, periods_per_year):
+    """Turn window sums of returns x, benchmark returns y and squared downside of x into annualized metrics."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        var_x = (sxx - sx * sx / n) / (n - 1)
+        var_y = (syy - sy * sy / n) / (n - 1)
+        cov = (sxy - sx * sy / n) / (n - 1)
+        excess = sx / n - risk_free_rate / periods_per_year
+        annualize = np.sqrt(periods_per_year)
+        return {
+            'Volatility': np.sqrt(var_x) * annualize,
+            'Beta': cov / var_y,
+            'Correlation': cov / np.sqrt(var_x * var_y),
+            'Tracking Error': np.sqrt(np.maximum(var_x + var_y - 2 * cov, 0)) * annualize,
+            'Sharpe': excess / np.sqrt(var_x) * annualize,
+            'Sortino': excess / np.sqrt(sdd / n) * annualize,
+        }
+
+
+def rolling_metrics(returns, benchmark_returns, windows=(21, 63, 252), risk_free_rate=0.0,
+                    periods_per_year=PERIODS_PER_YEAR):
+    """Rolling risk metrics of every column of `returns` against one benchmark return series.
+
+    Each window length costs a handful of cumulative sums over the whole dates x symbols matrix, so
+    many symbols and many windows are evaluated without Python-level loops over dates. A value is
+    reported only once its window holds `window` paired observations. Returns
+    {window: {metric: dates x symbols DataFrame}}.
+    """
+    benchmark_returns = benchmark_returns.reindex(returns.index)
+    x = returns.to_numpy(dtype=np.float64)
+    y = np.broadcast_to(benchmark_returns.to_numpy(dtype=np.float64)[:, None], x.shape)
+    valid = ~np.isnan(x) & ~np.isnan(y)
+    x = np.where(valid, x, 0.0)
+    y = np.where(valid, y, 0.0)
+    downside = np.where(valid, np.minimum(x - risk_free_rate / periods_per_year, 0.0) ** 2, 0.0)
+    results = {}
+    for window in windows:
+        n = _rolling_sum(valid.astype(np.float64), window)
+        metrics = _metrics_from_sums(n, _rolling_sum(x, window), _rolling_sum(y, window),
+                                     _rolling_sum(x * x, window), _rolling_sum(y * y, window),
+                                     _rolling_sum(x * y, window), _rolling_sum(downside, window),
+                                     risk_free_rate, periods_per_year)
+        results[window] = {name: pd.DataFrame(np.where(n >= window, values, np.nan), index=returns.index,
+                                              columns=returns.columns)
+                           for name, values in metrics.items()}
+    return results
+
+
+def benchmark_metrics(returns, benchmarks, windows=(21, 63, 252), risk_free_rate=0.0):
+    """`rolling_metrics` against each column of a benchmarks return frame. Returns {benchmark: {window: {metric: frame}}}."""
+    return {benchmark: rolling_metrics(returns, benchmarks[benchmark], windows, risk_free_rate)
+            for benchmark in benchmarks.columns}
+
+
+def max_drawdown(prices):
+    """Largest peak-to-trough decline of each column over the whole history (a negative fraction)."""
+    values = prices.to_numpy(dtype=np.float64)
+    peaks = np.fmax.accumulate(values, axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return pd.Series(np.nanmin(values / peaks - 1, axis=0), index=prices.columns)
+
+
+def summary_metrics(prices, benchmark_returns=None, risk_free_rate=0.0, periods_per_year=PERIODS_PER_YEAR):
+    """Full-history metrics per column: annual volatility, Sharpe, Sortino, max drawdown and (with a benchmark) beta and tracking error."""
+    returns = to_returns(prices)
+    if benchmark_returns is None:
+        benchmark_returns = pd.Series(0.0, index=returns.index)
+    x = returns.to_numpy(dtype=np.float64)
+    y = benchmark_returns.reindex(returns.index).to_numpy(dtype=np.float64)[:, None]
+    valid = ~np.isnan(x) & ~np.isnan(y)
+    n = valid.sum(axis=0)
+    sums = [np.where(valid, values, 0.0).sum(axis=0) for values in
+            (x, np.broadcast_to(y, x.shape), x * x, np.broadcast_to(y * y, x.shape), x * y,
+             np.minimum(x - risk_free_rate / periods_per_year, 0.0) ** 2)]
+    metrics = _metrics_from_sums(n, *sums, risk_free_rate, periods_per_year)
+    summary = pd.DataFrame(metrics, index=prices.columns)
+    summary['Max Drawdown'] = max_drawdown(prices)
+    return summary
+
+
+class RollingRiskState:
+    """Incrementally maintained rolling sums for many symbols and window lengths against one benchmark.
+
+    `append` adds one bar of returns and drops the bar leaving each window from a ring buffer, so a new
+    daily bar costs O(windows x symbols) instead of a rescan of the whole history. `metrics` gives the
+    current value of every metric, matching the last row of `rolling_metrics`.
+    """
+
+    def __init__(self, symbols, windows=(21, 63, 252), risk_free_rate=0.0, periods_per_year=PERIODS_PER_YEAR):
+        self.symbols = list(symbols)
+        self.windows = list(windows)
+        self.risk_free_rate = risk_free_rate
+        self.periods_per_year = periods_per_year
+        size = max(self.windows)
+        self.x_buffer = np.full((size, len(self.symbols)), np.nan)
+        self.y_buffer = np.full(size, np.nan)
+        self.position = 0
+        self.count = 0
+        shape = (len(self.windows), len(self.symbols))
+        self.sums = {name: np.zeros(shape) for name in ('n', 'sx', 'sy', 'sxx', 'syy', 'sxy', 'sdd', 'nd')}
+        self.wealth = np.ones(len(self.symbols))
+        self.peak = np.ones(len(self.symbols))
+        self.max_drawdown = np.zeros(len(self.symbols))
+
+    @classmethod
+    def from_returns(cls, returns, benchmark_returns, windows=(21, 63, 252), risk_free_rate=0.0):
+        """Seed the state from history; only the last max(windows) bars are replayed into the buffers."""
+        state = cls(returns.columns, windows, risk_free_rate)
+        benchmark_returns = benchmark_returns.reindex(returns.index)
+        values = returns.to_numpy(dtype=np.float64)
+        wealth = np.nancumprod(1 + values, axis=0)
+        peaks = np.fmax.accumulate(wealth, axis=0)
+        if len(values):
+            state.max_drawdown = np.nanmin(np.minimum(wealth / peaks - 1, 0), axis=0)
+            tail = max(windows)
+            state.wealth = wealth[-tail - 1] if len(values) > tail else np.ones(len(state.symbols))
+            state.peak = peaks[-tail - 1] if len(values) > tail else np.ones(len(state.symbols))
+            for row, benchmark in zip(values[-tail:], benchmark_returns.to_numpy(dtype=np.float64)[-tail:]):
+                state.append(row, benchmark)
+        return state
+
+    def _terms(self, x, y):
+        valid = ~np.isnan(x) & ~np.isnan(y)
+        x = np.where(valid, x, 0.0)
+        y = np.where(valid, y, 0.0)
+        shortfall = np.minimum(x - self.risk_free_rate / self.periods_per_year, 0.0)
+        downside = np.where(valid, shortfall ** 2, 0.0)
+        return {'n': valid.astype(np.float64), 'sx': x, 'sy': y, 'sxx': x * x, 'syy': y * y, 'sxy': x * y,
+                'sdd': downside, 'nd': (valid & (shortfall < 0)).astype(np.float64)}
+
+    def append(self, returns_row, benchmark_return):
+        """Add one bar: a return per symbol (NaN for no bar) and the benchmark's return."""
+        x = np.asarray(returns_row, dtype=np.float64)
+        y = np.full(len(x), benchmark_return, dtype=np.float64)
+        new_terms = self._terms(x, y)
+        size = len(self.y_buffer)
+        for row, window in enumerate(self.windows):
+            if self.count >= window:
+                old_position = (self.position - window) % size
+                old_x = self.x_buffer[old_position]
+                old_terms = self._terms(old_x, np.full(len(old_x), self.y_buffer[old_position]))
+            else:
+                old_terms = None
+            for name, values in new_terms.items():
+                self.sums[name][row] += values
+                if old_terms is not None:
+                    self.sums[name][row] -= old_terms[name]
+        self.x_buffer[self.position] = x
+        self.y_buffer[self.position] = benchmark_return
+        self.position = (self.position + 1) % size
+        self.count += 1
+        self.wealth = self.wealth * (1 + np.nan_to_num(x))
+        self.peak = np.maximum(self.peak, self.wealth)
+        self.max_drawdown = np.minimum(self.max_drawdown, self.wealth / self.peak - 1)
+
+    def metrics(self):
+        """Return a (window, metric) x symbols DataFrame of the current rolling metrics plus max drawdown."""
+        sums = self.sums
+        # Adding and removing terms leaves rounding residue; a window without downside bars has none at all
+        downside = np.where(sums['nd'] > 0, sums['sdd'], 0.0)
+        metrics = _metrics_from_sums(sums['n'], sums['sx'], sums['sy'], sums['sxx'], sums['syy'], sums['sxy'],
+                                     downside, self.risk_free_rate, self.periods_per_year)
+        full = sums['n'] >= np.array(self.windows)[:, None]
+        rows = {}
+        for index, window in enumerate(self.windows):
+            for name in METRICS:
+                rows[(window, name)] = np.where(full[index], metrics[name][index], np.nan)
+        frame = pd.DataFrame(rows, index=self.symbols).T
+        frame.loc[('All', 'Max Drawdown'), :] = self.max_drawdown
+        return frame
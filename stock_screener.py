@@ -0,0 +1,242 @@
+import os
+import re
+import sys
+import time
+import threading
+import itertools
+import numpy as np
+import pandas as pd
+from data_store import DataStore, FILE_EXTENSIONS, write_frame, read_frame
+
+# Numeric keys holding epoch seconds (exDividendDate, firstTradeDateEpochUtc, earningsTimestamp, ...)
+TIMESTAMP_KEY = re.compile(r'(date|epoch|timestamp|time$|fiscalyearend|mostrecentquarter|^retrieved$)', re.IGNORECASE)
+NUMERIC_SHARE = 0.95  # a column is numeric when at least this share of its values parse as numbers
+CATEGORY_MAX_LENGTH = 40  # shorter strings (sector, exchange, currency) are stored as categories
+OPERATORS = {
+    '>': np.greater, '>=': np.greater_equal, '<': np.less, '<=': np.less_equal,
+    '==': np.equal, '!=': np.not_equal,
+}
+
+
+def parse_legacy(value):
+    """Turn a value from a legacy `Attribute,Value` string file back into a number, bool or None."""
+    if value is None or (isinstance(value, float) and np.isnan(value)) or value in ('None', 'nan', ''):
+        return None
+    if value in ('True', 'False'):
+        return value == 'True'
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def infer_kind(key, values):
+    """Return 'numeric', 'timestamp', 'category' or 'text' for a column's non-null values."""
+    values = values.dropna()
+    if values.empty:
+        return None
+    numbers = pd.to_numeric(values, errors='coerce')
+    if numbers.notna().mean() >= NUMERIC_SHARE:
+        return 'timestamp' if TIMESTAMP_KEY.search(key) and numbers.abs().max() > 1e8 else 'numeric'
+    return 'category' if values.astype(str).str.len().mean() <= CATEGORY_MAX_LENGTH else 'text'
+
+
+def apply_kind(values, kind):
+    if kind in ('numeric', 'timestamp'):
+        numbers = pd.to_numeric(values, errors='coerce').astype(np.float64)
+        return pd.to_datetime(numbers, unit='s') if kind == 'timestamp' else numbers
+    strings = values.astype('string')
+    return strings.astype('category') if kind == 'category' else strings
+
+
+class StockInfoTable:
+    """`stock.info` of every symbol as one typed wide table (one row per symbol) in `<directory>/Screener`.
+
+    Each downloaded info dict is written as a one-row delta segment; `table` folds the deltas into the
+    consolidated table (a later snapshot of a symbol replaces the earlier row) and types every column
+    from the persisted schema. Keys never seen before get a kind inferred from their values, and a
+    numeric column that starts receiving text is widened to text.
+    """
+
+    def __init__(self, store, directory=None, compact_after=256):
+        self.store = store
+        self.directory = directory or os.path.join(store.directory, 'Screener')
+        self.extension = FILE_EXTENSIONS[store.file_format]
+        self.schema_file = os.path.join(self.directory, 'schema.csv')
+        self.compact_after = compact_after
+        self.counter = itertools.count()
+        self.lock = threading.RLock()
+        self.raw = None
+        self.frame = None
+        self.schema = self.load_schema()
+        self.segments = set()
+        self.pending = []
+
+    def base_path(self):
+        return os.path.join(self.directory, f"stock_info{self.extension}")
+
+    def load_schema(self):
+        if not os.path.exists(self.schema_file):
+            return {}
+        schema = pd.read_csv(self.schema_file)
+        return dict(zip(schema['Column'], schema['Kind']))
+
+    def save_schema(self):
+        os.makedirs(self.directory, exist_ok=True)
+        pd.DataFrame(list(self.schema.items()), columns=['Column', 'Kind']).to_csv(self.schema_file, index=False)
+
+    def delta_files(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                      if name.startswith('delta_') and os.path.splitext(name)[1] in FILE_EXTENSIONS.values())
+
+    def upsert(self, symbol, info, retrieved=None):
+        """Add (or replace) one symbol's info dict. Nested values (officers lists, dicts) are dropped."""
+        row = {key: value for key, value in info.items() if not isinstance(value, (list, dict, tuple, set))}
+        row = {key: (str(value) if isinstance(value, str) else value) for key, value in row.items()}
+        row['Symbol'] = symbol
+        row['Retrieved'] = pd.Timestamp(retrieved or pd.Timestamp.now()).timestamp()
+        # One-row segments are written as strings; kinds are applied when the table is consolidated
+        delta = pd.DataFrame([{key: None if value is None else str(value) for key, value in row.items()}])
+        with self.lock:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"delta_{time.time_ns()}_{os.getpid()}_{next(self.counter)}{self.extension}")
+            write_frame(delta, path, index=False)
+            self.segments.add(path)
+            self.pending.append(delta)
+
+    def table(self):
+        """Return the typed symbols x fields table, folding in deltas loaded here or written by other processes."""
+        with self.lock:
+            frames = []
+            if self.raw is None:
+                base = self.base_path()
+                self.raw = self.parse(read_frame(base)) if os.path.exists(base) else pd.DataFrame(columns=['Symbol'])
+                self.frame = None
+            for path in self.delta_files():
+                if path not in self.segments:
+                    frames.append(read_frame(path))
+                    self.segments.add(path)
+            frames, self.pending = self.pending + frames, []
+            if frames:
+                new_rows = self.parse(pd.concat(frames, ignore_index=True))
+                self.evolve_schema(new_rows)
+                raw = pd.concat([self.raw, new_rows], ignore_index=True)
+                self.raw = raw.drop_duplicates('Symbol', keep='last').reset_index(drop=True)
+                self.frame = None
+                if len(self.segments) >= self.compact_after:
+                    self.compact()
+            if self.frame is None:
+                if set(self.raw.columns) - {'Symbol'} - self.schema.keys():
+                    self.evolve_schema(self.raw)
+                columns = {key: apply_kind(self.raw[key], self.schema.get(key) or 'text')
+                           for key in self.raw.columns if key != 'Symbol'}
+                frame = pd.DataFrame(columns, index=self.raw.index)
+                frame.index = pd.Index(self.raw['Symbol'].astype(str), name='Symbol')
+                self.frame = frame.sort_index()
+            return self.frame
+
+    def parse(self, raw):
+        """Turn the string cells of stored rows back into numbers, bools and None."""
+        parsed = raw.astype(object).map(lambda v: parse_legacy(v) if isinstance(v, str) else v)
+        parsed['Symbol'] = raw['Symbol'].astype(str)
+        return parsed
+
+    def evolve_schema(self, rows):
+        """Give new keys in `rows` a kind, and widen numeric keys whose new values are mostly text."""
+        changed = False
+        for key in rows.columns:
+            kind = self.schema.get(key)
+            if key == 'Symbol' or kind in ('category', 'text'):
+                continue
+            inferred = infer_kind(key, rows[key])
+            if inferred is not None and (kind is None or inferred in ('category', 'text')):
+                self.schema[key] = inferred
+                changed = True
+        if changed:
+            self.save_schema()
+
+    def compact(self):
+        """Write the consolidated raw table and remove the delta segments it contains."""
+        with self.lock:
+            self.table()
+            os.makedirs(self.directory, exist_ok=True)
+            write_frame(self.raw.astype('string'), self.base_path(), index=False)
+            for path in self.segments:
+                if os.path.exists(path):
+                    os.remove(path)
+            self.segments = set()
+
+    def import_legacy(self):
+        """Load the per-ticker `<TICKER>_Info` Attribute,Value files. Returns the number of symbols loaded."""
+        loaded = 0
+        for name in sorted(os.listdir(self.store.directory)):
+            if not os.path.isdir(os.path.join(self.store.directory, name)):
+                continue
+            info = self.store.read(name, 'Info')
+            if info is not None and {'Attribute', 'Value'} <= set(info.columns):
+                self.upsert(name, dict(zip(info['Attribute'], info['Value'].map(parse_legacy))),
+                            retrieved=pd.Timestamp(os.path.getmtime(self.store.find_file(name, 'Info')), unit='s'))
+                loaded += 1
+        return loaded
+
+
+def filter_mask(table, filters):
+    """Boolean mask of the rows passing every (column, operator, value) filter.
+
+    Operators are >, >=, <, <=, ==, !=, 'in' (value is a collection), 'between' (inclusive (low, high))
+    and 'contains' (case-insensitive substring). Rows with a missing value fail the filter.
+    """
+    mask = np.ones(len(table), dtype=bool)
+    for column, operator, value in filters:
+        if column not in table:
+            return np.zeros(len(table), dtype=bool)
+        series = table[column]
+        if operator == 'in':
+            passed = series.isin(list(value)).to_numpy(dtype=bool)
+        elif operator == 'between':
+            low, high = value
+            passed = (series >= low) & (series <= high)
+            passed = passed.fillna(False).to_numpy(dtype=bool)
+        elif operator == 'contains':
+            passed = series.astype('string').str.contains(str(value), case=False, regex=False).fillna(False).to_numpy(dtype=bool)
+        elif isinstance(series.dtype, pd.CategoricalDtype) or series.dtype == 'string':
+            passed = OPERATORS[operator](series.astype('string'), value).fillna(False).to_numpy(dtype=bool)
+        elif pd.api.types.is_datetime64_any_dtype(series):
+            times = series.to_numpy()
+            passed = OPERATORS[operator](times, np.datetime64(pd.Timestamp(value))) & ~np.isnat(times)
+        else:
+            numbers = series.to_numpy(dtype=np.float64)
+            with np.errstate(invalid='ignore'):
+                passed = OPERATORS[operator](numbers, value) & ~np.isnan(numbers)
+        mask &= passed
+    return mask
+
+
+def screen(table, filters=(), query=None, sort=None, columns=None, limit=None):
+    """Screen a StockInfoTable frame.
+
+    `filters` is a list of (column, operator, value) conditions (see filter_mask) and `query` an optional
+    pandas query string ("trailingPE < 20 and sector == 'Technology'"); both must hold. `sort` is a list
+    of columns, a leading '-' meaning descending; missing values sort last.
+    """
+    result = table[filter_mask(table, filters)]
+    if query:
+        result = result.query(query)
+    if sort:
+        sort = [sort] if isinstance(sort, str) else sort
+        keys = [key.lstrip('-') for key in sort]
+        result = result.sort_values(keys, ascending=[not key.startswith('-') for key in sort], na_position='last')
+    if columns is not None:
+        result = result[[column for column in columns if column in result]]
+    return result.head(limit) if limit is not None else result
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == 'import':
+        info_table = StockInfoTable(DataStore(sys.argv[2] if len(sys.argv) > 2 else 'Data'))
+        print(f"Imported info for {info_table.import_legacy()} symbols.")
+        info_table.compact()
+    else:
+        print("Usage: python stock_screener.py import [data directory]")
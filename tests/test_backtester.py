@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+from multiprocessing import shared_memory
+import backtester
+from backtester import build_features, run_fold, walk_forward_folds
+
+
+class MeanModel:
+    """Predicts the training base rate for every row."""
+
+    def fit(self, x, y):
+        self.rate = float(np.mean(y))
+        self.rows = len(x)
+
+    def predict_proba(self, x):
+        return np.column_stack([np.full(len(x), 1 - self.rate), np.full(len(x), self.rate)])
+
+
+def make_history(periods, seed):
+    dates = pd.bdate_range(end='2024-03-15', periods=periods, name='Date')
+    close = 100 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 0.01, periods)))
+    return pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close, 'Volume': 1e6}, index=dates)
+
+
+def test_folds_train_only_before_the_test_window():
+    for train_end, test_start, test_end in walk_forward_folds(1000, start=500, step=200, horizon=5):
+        assert train_end == test_start - 5
+        assert test_start < test_end <= 1000
+
+
+def test_run_fold_uses_only_its_tickers_rows():
+    frames = [build_features(make_history(600, seed), windows=(2, 5)) for seed in (1, 2)]
+    columns = list(frames[0].columns)
+    stacked = np.vstack([frame[columns].to_numpy() for frame in frames])
+    shm = shared_memory.SharedMemory(create=True, size=stacked.nbytes)
+    try:
+        np.ndarray(stacked.shape, dtype=np.float64, buffer=shm.buf)[:] = stacked
+        backtester._attach(shm.name, stacked.shape, columns)
+        fold = walk_forward_folds(600, start=300, step=100)[0]
+        record = run_fold(('BBB', (600, 1200), 'mean', MeanModel, 'ohlcv', ['Close', 'Volume'], 1, fold, 0.5))
+        target = frames[1]['Target_1']
+        assert record['Train Rows'] == target.iloc[:fold[0]].notna().sum()
+        assert record['Test Rows'] == 100
+        assert record['Base Rate'] == target.iloc[fold[1]:fold[2]].mean()
+        assert record['Market Return'] == frames[1]['Return_1'].iloc[fold[1]:fold[2]].mean()
+    finally:
+        backtester._SHARED.clear()
+        shm.close()
+        shm.unlink()
@@ -0,0 +1,83 @@
+import time
+import threading
+import pandas as pd
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from data_provider import MarketDataProvider, SimulatedProvider, SingleFlight
+from yf_download import YFDownload
+
+
+def test_single_flight_shares_one_call_between_concurrent_callers():
+    flight, release, calls = SingleFlight(), threading.Event(), []
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return object()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(flight.do, 'key', slow)]
+        while not flight.in_flight:
+            time.sleep(0.001)
+        futures += [executor.submit(flight.do, 'key', slow) for _ in range(3)]
+        while flight.coalesced < 3:
+            time.sleep(0.001)
+        release.set()
+        results = [future.result() for future in futures]
+    assert len(calls) == 1 and flight.coalesced == 3
+    assert all(result is results[0] for result in results)
+    assert flight.in_flight == {}
+
+
+def test_single_flight_raises_the_error_for_every_caller_and_forgets_it():
+    flight = SingleFlight()
+
+    def failing():
+        raise ConnectionError("upstream down")
+    with pytest.raises(ConnectionError):
+        flight.do('key', failing)
+    assert flight.do('key', lambda: 42) == 42
+
+
+def test_simulated_provider_is_deterministic_and_filters_dates():
+    provider = SimulatedProvider(latency=0, end='2024-03-15', years=1)
+    first = provider.history('AAA')
+    assert first.equals(SimulatedProvider(latency=0, end='2024-03-15', years=1).history('AAA'))
+    assert not first['Close'].equals(provider.history('BBB')['Close'])
+    recent = provider.history('AAA', start='2024-03-01')
+    assert recent.index.min() >= pd.Timestamp('2024-03-01') and recent.equals(first.loc['2024-03-01':])
+    bars = provider.download(['AAA', 'BBB'], start='2024-03-01', end='2024-03-08')
+    assert list(bars.columns.get_level_values(0).unique()) == ['AAA', 'BBB']
+    assert len(bars) == 5
+    with pytest.raises(AttributeError):
+        provider.fetch('AAA', 'sustainability')
+
+
+def test_identical_requests_in_flight_share_an_upstream_call():
+    provider = SimulatedProvider(latency=0.2, end='2024-03-15', years=1)
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        results = list(executor.map(lambda symbol: provider.fetch(symbol, 'info'), ['AAA'] * 4 + ['BBB'] * 2))
+    assert provider.stats() == {'Requests': 6, 'Upstream Calls': 2, 'Coalesced': 4}
+    assert results[0] is results[3] and results[4]['symbol'] == 'BBB'
+    provider.fetch('AAA', 'info')  # nothing in flight any more: a new upstream call
+    assert provider.stats()['Upstream Calls'] == 3
+
+
+def test_downloaders_sharing_a_provider_store_the_same_data(tmp_path):
+    provider = SimulatedProvider(latency=0.3, end='2024-03-15', years=1)
+    downloaders = [YFDownload(data_directory=str(tmp_path / f"caller_{i}"), provider=provider) for i in range(3)]
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        histories = list(executor.map(lambda downloader: downloader.download_historical_data('AAA'), downloaders))
+    assert provider.stats()['Upstream Calls'] < provider.stats()['Requests']
+    for downloader, history in zip(downloaders, histories):
+        assert history['Close'].tolist() == histories[0]['Close'].tolist()
+        assert downloader.store.exists('AAA', 'historical_data')
+
+
+def test_providers_must_implement_the_upstream_calls():
+    class FetchOnly(MarketDataProvider):
+        def upstream(self, symbol, name, args, kwargs):
+            return symbol
+    with pytest.raises(TypeError):
+        MarketDataProvider()
+    with pytest.raises(TypeError):
+        FetchOnly()
@@ -0,0 +1,37 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from data_retriever import DataRetriever
+from data_store import DataStore
+
+
+def write_portfolio(directory, tickers):
+    store = DataStore(str(directory))
+    dates = pd.bdate_range(end='2024-03-15', periods=50, name='Date')
+    for i, ticker in enumerate(tickers):
+        close = np.linspace(10, 20, len(dates)) * (i + 1)
+        store.write_history(pd.DataFrame({'Close': close, 'Volume': 1000.0}, index=dates), ticker)
+    os.makedirs(os.path.join(directory, 'Portfolios'), exist_ok=True)
+    pd.DataFrame({'Ticker': tickers + ['Cash'], 'Shares': [10] * len(tickers) + [500]}).to_csv(
+        os.path.join(directory, 'Portfolios', 'Main.csv'), index=False)
+    return store
+
+
+def test_concurrent_loads_share_one_quote_index(tmp_path):
+    tickers = [f"T{i:02d}" for i in range(20)]
+    store = write_portfolio(tmp_path, tickers)
+    retriever = DataRetriever(directory=str(tmp_path))
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: retriever.get_portfolio_total_values('Main'), range(16)))
+    assert all(result == results[0] for result in results)
+    assert results[0]['T03']['Value'] == 80.0
+    assert sum(details['Weight'] for details in results[0].values()) == pytest.approx(100.0)
+    # The index was rebuilt once and saved whole
+    assert sorted(pd.read_csv(retriever.quotes.index_file)['Symbol']) == tickers
+    dates = pd.bdate_range(end='2024-03-18', periods=1, name='Date')
+    store.append_history(pd.DataFrame({'Close': [99.0], 'Volume': 1000.0}, index=dates), 'T03')
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: retriever.get_portfolio_total_values('Main'), range(8)))
+    assert all(result['T03']['Value'] == 99.0 for result in results)
@@ -0,0 +1,64 @@
+import os
+import pandas as pd
+import pytest
+from data_store import DataStore, FILE_EXTENSIONS, FrameCache, HAS_PYARROW
+
+FORMATS = list(FILE_EXTENSIONS) if HAS_PYARROW else ['csv']
+
+
+def statement():
+    return pd.DataFrame({pd.Timestamp('2023-12-31'): [1.0, 2.0], pd.Timestamp('2022-12-31'): [3.0, 4.0]},
+                        index=['Total Assets', 'Total Debt'])
+
+
+@pytest.mark.parametrize('file_format', FORMATS)
+def test_positional_index_col_round_trips_unnamed_index(tmp_path, file_format):
+    store = DataStore(str(tmp_path), file_format)
+    store.write(statement(), 'AAA', 'Balance_Sheet')
+    df = store.read('AAA', 'Balance_Sheet', index_col=0)
+    assert df.index.name is None
+    assert list(df.index) == ['Total Assets', 'Total Debt']
+    assert list(df.columns) == ['2023-12-31', '2022-12-31']
+    assert df.loc['Total Debt', '2022-12-31'] == 4.0
+
+
+@pytest.mark.parametrize('file_format', FORMATS)
+def test_positional_index_col_with_columns(tmp_path, file_format):
+    store = DataStore(str(tmp_path), file_format)
+    store.write(statement(), 'AAA', 'Balance_Sheet')
+    df = store.read('AAA', 'Balance_Sheet', columns=['2022-12-31'], index_col=0)
+    assert list(df.columns) == ['2022-12-31']
+    assert list(df.index) == ['Total Assets', 'Total Debt']
+
+
+@pytest.mark.parametrize('file_format', FORMATS)
+def test_history_round_trip(tmp_path, file_format):
+    store = DataStore(str(tmp_path), file_format)
+    dates = pd.bdate_range('2024-01-01', periods=5, name='Date')
+    store.write_history(pd.DataFrame({'Close': [1.0, 2.0, 3.0, 4.0, 5.0]}, index=dates), 'AAA')
+    df = store.read_history('AAA')
+    assert df.index.equals(dates)
+    assert store.history_bounds('AAA') == (dates[0], dates[-1])
+
+
+def test_frame_cache_reloads_changed_files_and_evicts_least_recent(tmp_path):
+    store = DataStore(str(tmp_path), 'csv')
+    paths = [store.write(statement(), ticker, 'Balance_Sheet') for ticker in ('AAA', 'BBB', 'CCC')]
+    loads = []
+
+    def loader(path):
+        return lambda: loads.append(path) or pd.read_csv(path, index_col=0)
+    cache = FrameCache()
+    cache.get(paths[0], loader(paths[0]))
+    cache.max_bytes = cache.current_bytes * 2.5  # room for two frames
+    cache.get(paths[0], loader(paths[0]))
+    assert loads == [paths[0]] and cache.stats()['Hits'] == 1
+    store.write(statement() * 2, 'AAA', 'Balance_Sheet')
+    os.utime(paths[0], ns=(1, 1))  # a new version even on coarse mtime clocks
+    assert cache.get(paths[0], loader(paths[0])).iloc[0, 0] == 2.0
+    assert cache.stats()['Invalidations'] == 1
+    cache.get(paths[1], loader(paths[1]))
+    cache.get(paths[2], loader(paths[2]))
+    assert cache.stats()['Evictions'] >= 1 and cache.stats()['Bytes'] <= cache.max_bytes
+    cache.get(paths[2], loader(paths[2]))
+    assert loads.count(paths[2]) == 1
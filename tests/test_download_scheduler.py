@@ -0,0 +1,56 @@
+import time
+import threading
+from download_scheduler import DownloadScheduler, TokenBucket
+
+
+class FlakyDownloader:
+    """Fails the first `failures[ticker]` calls for a ticker, then returns the ticker."""
+
+    def __init__(self, failures):
+        self.failures = dict(failures)
+        self.calls = {}
+        self.lock = threading.Lock()
+        self.raise_errors = False
+
+    def download_stock_info(self, ticker_symbol):
+        with self.lock:
+            self.calls[ticker_symbol] = self.calls.get(ticker_symbol, 0) + 1
+            failing = self.calls[ticker_symbol] <= self.failures.get(ticker_symbol, 0)
+        if failing:
+            raise ConnectionError(f"429 Too Many Requests for {ticker_symbol}")
+        return ticker_symbol
+
+
+def scheduler(downloader, **kwargs):
+    return DownloadScheduler(downloader, max_workers=4, rate=1000, base_delay=0.001, seed=0, **kwargs)
+
+
+def test_retries_until_success_and_isolates_failures():
+    downloader = FlakyDownloader({'AAA': 2, 'BBB': 10})
+    report = scheduler(downloader, max_retries=3).download(['AAA', 'BBB', 'CCC'], ['Info'])
+    records = {record['Ticker']: record for record in report.records}
+    assert records['AAA']['Status'] == 'ok' and records['AAA']['Attempts'] == 3
+    assert records['BBB']['Status'] == 'failed' and records['BBB']['Attempts'] == 4
+    assert 'ConnectionError' in records['BBB']['Error']
+    assert records['CCC']['Attempts'] == 1
+    assert report.values == {('AAA', 'Info'): 'AAA', ('CCC', 'Info'): 'CCC'}
+    assert len(report.failed) == 1
+
+
+def test_scheduler_raises_errors_on_its_own_copy():
+    downloader = FlakyDownloader({})
+    instance = scheduler(downloader)
+    assert instance.downloader.raise_errors and not downloader.raise_errors
+
+
+def test_backoff_stays_within_the_cap():
+    instance = scheduler(FlakyDownloader({}), max_delay=0.5)
+    assert all(0 <= instance.backoff_delay(attempt) <= 0.5 for attempt in range(10))
+
+
+def test_token_bucket_limits_the_rate():
+    bucket = TokenBucket(rate=20, capacity=2)
+    start = time.monotonic()
+    for _ in range(6):  # a burst of 2, then one token every 50ms
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.19
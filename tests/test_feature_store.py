@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+from data_store import DataStore
+from feature_store import FeatureStore, NOTEBOOK_FEATURES, compute_features
+
+
+def make_history(periods):
+    dates = pd.bdate_range(end='2024-03-15', periods=periods, name='Date')
+    close = 100 * np.exp(np.cumsum(np.random.default_rng(0).normal(0, 0.01, len(dates))))
+    return pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close,
+                         'Volume': 1e6, 'Dividends': 0.0}, index=dates)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return DataStore(str(tmp_path))
+
+
+def test_appended_bars_reuse_cached_rows(store):
+    history = make_history(400)
+    store.write_history(history.iloc[:-5], 'AAA')
+    features = FeatureStore(store)
+    features.get('AAA', NOTEBOOK_FEATURES)
+    store.append_history(history.iloc[-5:], 'AAA')
+    computed = features.rows_computed
+    frame = features.get('AAA', NOTEBOOK_FEATURES)
+    assert features.rows_computed - computed < 20
+    expected = compute_features(store.read_history('AAA'), NOTEBOOK_FEATURES)
+    assert np.allclose(frame.to_numpy(), expected.to_numpy(), equal_nan=True)
+
+
+def test_adjusted_rewrite_with_same_dates_is_rebuilt(store):
+    history = make_history(400)
+    store.write_history(history.iloc[:-5], 'AAA')
+    features = FeatureStore(store)
+    features.get('AAA', NOTEBOOK_FEATURES)
+    adjusted = history.copy()
+    adjusted.loc[:adjusted.index[200], ['Open', 'High', 'Low', 'Close']] *= 0.5  # split-adjusted rewrite
+    store.write_history(adjusted, 'AAA')
+    computed = features.rows_computed
+    frame = FeatureStore(store).get('AAA', NOTEBOOK_FEATURES)
+    frame_again = features.get('AAA', NOTEBOOK_FEATURES)
+    assert features.rows_computed - computed == len(adjusted)
+    expected = compute_features(store.read_history('AAA'), NOTEBOOK_FEATURES)
+    for result in (frame, frame_again):
+        assert np.allclose(result.to_numpy(), expected.to_numpy(), equal_nan=True)
@@ -0,0 +1,78 @@
+import os
+import pandas as pd
+import pytest
+from data_store import DataStore
+from data_provider import SimulatedProvider
+from freshness import FreshnessManifest, fingerprint
+from yf_download import YFDownload
+
+
+@pytest.fixture
+def downloader(tmp_path):
+    return YFDownload(data_directory=str(tmp_path), provider=SimulatedProvider(latency=0, end='2024-03-15'))
+
+
+def test_ttl_and_session_expiry(tmp_path):
+    manifest = FreshnessManifest(DataStore(str(tmp_path)))
+    fetched = pd.Timestamp('2024-03-14 14:00')  # UTC, 10:00 in New York
+    manifest.record('AAA', 'Options', fingerprint(1), now=fetched)
+    manifest.record('AAA', 'historical_data', fingerprint(1), now=fetched)
+    assert manifest.is_fresh('AAA', 'Options', now=fetched + pd.Timedelta(minutes=29))
+    assert not manifest.is_fresh('AAA', 'Options', now=fetched + pd.Timedelta(minutes=30))
+    # Daily bars stay fresh until 15 minutes after that day's 16:00 close (20:00 UTC)
+    assert manifest.is_fresh('AAA', 'historical_data', now=pd.Timestamp('2024-03-14 20:14'))
+    assert not manifest.is_fresh('AAA', 'historical_data', now=pd.Timestamp('2024-03-14 20:15'))
+
+
+def test_record_does_not_save_until_asked(tmp_path):
+    manifest = FreshnessManifest(DataStore(str(tmp_path)))
+    manifest.record('AAA', 'Info', fingerprint({'a': 1}))
+    assert not os.path.exists(manifest.manifest_file)
+    manifest.save()
+    assert FreshnessManifest(DataStore(str(tmp_path))).unchanged('AAA', 'Info', fingerprint({'a': 1}))
+
+
+def test_fresh_download_skips_the_provider(downloader):
+    first = downloader.download_dividends('AAA')
+    calls = downloader.provider.upstream_calls
+    second = downloader.download_dividends('AAA')
+    assert downloader.provider.upstream_calls == calls
+    assert second.tolist() == first.tolist()
+    assert downloader.freshness.stats['Calls Saved'] == 1
+
+
+def test_unchanged_payload_is_not_rewritten(downloader):
+    downloader.download_dividends('AAA')
+    path = downloader.store.find_file('AAA', 'Dividends')
+    version = os.stat(path).st_mtime_ns
+    downloader.freshness.entries[('AAA', 'Dividends')]['Fetched'] -= pd.Timedelta(days=2)
+    downloader.download_dividends('AAA')  # stale, refetched, same content
+    assert os.stat(path).st_mtime_ns == version
+    assert downloader.freshness.stats['Writes Saved'] == 1
+
+
+def test_missing_stored_copy_is_rewritten(downloader):
+    downloader.download_dividends('AAA')
+    os.remove(downloader.store.find_file('AAA', 'Dividends'))
+    downloader.download_dividends('AAA')  # still within its TTL, but the copy is gone
+    assert downloader.store.exists('AAA', 'Dividends')
+
+
+def test_failed_write_is_not_recorded(downloader, monkeypatch):
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+    monkeypatch.setattr(downloader.store, 'write', fail)
+    assert downloader.download_dividends('AAA') is None
+    assert ('AAA', 'Dividends') not in downloader.freshness.entries
+    monkeypatch.undo()
+    downloader.download_dividends('AAA')
+    assert downloader.store.exists('AAA', 'Dividends')
+
+
+def test_force_refresh_refetches_and_rewrites(downloader):
+    downloader.download_dividends('AAA')
+    calls = downloader.provider.upstream_calls
+    downloader.force_refresh = True
+    downloader.download_dividends('AAA')
+    assert downloader.provider.upstream_calls == calls + 1
+    assert downloader.freshness.stats['Writes Saved'] == 0
@@ -0,0 +1,87 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from data_store import DataStore, FILE_EXTENSIONS, HAS_PYARROW
+from fundamentals import RATIO_ITEMS, FundamentalsWarehouse, compute_ratios, universe_ratios
+
+FORMATS = list(FILE_EXTENSIONS) if HAS_PYARROW else ['csv']
+
+
+def balance_sheet():
+    return pd.DataFrame({pd.Timestamp('2023-12-31'): [100.0, 40.0], pd.Timestamp('2022-12-31'): [90.0, None]},
+                        index=['Total Assets', 'Total Debt'])
+
+
+@pytest.mark.parametrize('file_format', FORMATS)
+def test_import_legacy_reads_statement_files(tmp_path, file_format):
+    store = DataStore(str(tmp_path), file_format)
+    store.write(balance_sheet(), 'AAA', 'Balance_Sheet')
+    warehouse = FundamentalsWarehouse(store)
+    assert warehouse.import_legacy() == 3
+    rows = warehouse.line_item('Total Assets')
+    assert dict(zip(rows['Period End'], rows['Value'])) == {pd.Timestamp('2022-12-31'): 90.0,
+                                                            pd.Timestamp('2023-12-31'): 100.0}
+
+
+def test_import_legacy_reads_pre_store_csv(tmp_path):
+    # Files written by the original downloader with DataFrame.to_csv (an unnamed first column)
+    os.makedirs(tmp_path / 'AAA')
+    balance_sheet().to_csv(tmp_path / 'AAA' / 'AAA_Balance_Sheet.csv')
+    warehouse = FundamentalsWarehouse(DataStore(str(tmp_path), 'csv'))
+    assert warehouse.import_legacy() == 3
+    assert warehouse.cross_section('Total Debt').to_dict() == {'AAA': 40.0}
+
+
+def income_statement(revenue):
+    """An annual income statement with {period end: revenue} and net income at a tenth of revenue."""
+    periods = [pd.Timestamp(period_end) for period_end in revenue]
+    values = [revenue[period_end] for period_end in revenue]
+    return pd.DataFrame([values, [value / 10 for value in values]], index=['Total Revenue', 'Net Income'],
+                        columns=periods)
+
+
+def test_panel_and_cross_section_slice_the_sorted_table(tmp_path):
+    warehouse = FundamentalsWarehouse(DataStore(str(tmp_path), 'csv'))
+    warehouse.load('BBB', 'income_stmt', 'annual', income_statement({'2022-12-31': 50.0, '2023-12-31': 60.0}))
+    warehouse.load('AAA', 'income_stmt', 'annual', income_statement({'2023-12-31': 200.0}))
+    warehouse.load('AAA', 'balance_sheet', 'annual', balance_sheet())
+    panel = warehouse.panel(['Total Revenue', 'Total Debt'])
+    assert list(panel.index) == [('AAA', pd.Timestamp('2023-12-31')), ('BBB', pd.Timestamp('2022-12-31')),
+                                 ('BBB', pd.Timestamp('2023-12-31'))]
+    assert panel['Total Revenue'].tolist() == [200.0, 50.0, 60.0]
+    assert panel['Total Debt'].iloc[0] == 40.0 and panel['Total Debt'].iloc[1:].isna().all()
+    assert warehouse.cross_section('Total Revenue').to_dict() == {'AAA': 200.0, 'BBB': 60.0}
+    assert warehouse.cross_section('Total Revenue', period_end='2022-12-31').to_dict() == {'BBB': 50.0}
+    # A reload of the same period replaces the value
+    warehouse.load('BBB', 'income_stmt', 'annual', income_statement({'2023-12-31': 65.0}))
+    assert warehouse.cross_section('Total Revenue')['BBB'] == 65.0
+
+
+def test_growth_compares_the_period_a_year_earlier(tmp_path):
+    warehouse = FundamentalsWarehouse(DataStore(str(tmp_path), 'csv'))
+    # 2021 is missing, and the fiscal year end moves by a few days in 2023
+    warehouse.load('AAA', 'income_stmt', 'annual', income_statement(
+        {'2019-12-31': 80.0, '2020-12-31': 100.0, '2022-12-31': 150.0, '2023-12-28': 180.0}))
+    warehouse.load('BBB', 'income_stmt', 'annual', income_statement({'2023-12-31': 10.0}))
+    ratios = compute_ratios(warehouse.panel(RATIO_ITEMS))
+    growth = ratios['Revenue Growth']
+    assert growth[('AAA', pd.Timestamp('2020-12-31'))] == pytest.approx(0.25)
+    assert np.isnan(growth[('AAA', pd.Timestamp('2022-12-31'))])
+    assert growth[('AAA', pd.Timestamp('2023-12-28'))] == pytest.approx(0.2)
+    assert np.isnan(growth[('BBB', pd.Timestamp('2023-12-31'))])
+    assert ratios['Net Margin'].to_numpy() == pytest.approx(0.1)
+    latest = universe_ratios(warehouse)
+    assert latest['Net Income Growth'].to_dict() == pytest.approx({'AAA': 0.2, 'BBB': np.nan}, nan_ok=True)
+
+
+def test_compact_keeps_loads_made_after_the_table_was_read(tmp_path):
+    store = DataStore(str(tmp_path), 'csv')
+    warehouse = FundamentalsWarehouse(store)
+    warehouse.load('AAA', 'balance_sheet', 'annual', balance_sheet())
+    warehouse.table()
+    warehouse.load('BBB', 'balance_sheet', 'annual', balance_sheet())
+    warehouse.compact()
+    assert warehouse.delta_files() == []
+    reopened = FundamentalsWarehouse(store)
+    assert reopened.cross_section('Total Assets').to_dict() == {'AAA': 100.0, 'BBB': 100.0}
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+import pytest
+from data_store import DataStore
+from history_updater import HistoryUpdater
+from quote_index import QuoteIndex
+
+
+def bars(start, end, close):
+    dates = pd.bdate_range(start, end, name='Date')
+    return pd.DataFrame({'Close': np.full(len(dates), close), 'Volume': 1000.0}, index=dates)
+
+
+class FakeSource:
+    """Serves {ticker: history} windows singly and in batches, recording every request."""
+
+    def __init__(self, histories, missing_from_batches=(), failing=(), batch_error=False):
+        self.histories = histories
+        self.missing_from_batches = set(missing_from_batches)
+        self.failing = set(failing)
+        self.batch_error = batch_error
+        self.single_calls = []
+        self.batch_calls = []
+
+    def window(self, ticker_symbol, start, end):
+        if ticker_symbol in self.failing:
+            raise ConnectionError(f"no data for {ticker_symbol}")
+        return self.histories[ticker_symbol].loc[start:end]
+
+    def fetch_history(self, ticker_symbol, start=None, end=None):
+        self.single_calls.append((ticker_symbol, start))
+        return self.window(ticker_symbol, start, end)
+
+    def fetch_bulk_history(self, ticker_symbols, start=None, end=None):
+        self.batch_calls.append((list(ticker_symbols), start))
+        if self.batch_error:
+            raise ConnectionError("batch request failed")
+        return {ticker_symbol: self.window(ticker_symbol, start, end) for ticker_symbol in ticker_symbols
+                if ticker_symbol not in self.missing_from_batches | self.failing}
+
+
+def updater_for(store, source):
+    return HistoryUpdater(store, source.fetch_history, fetch_bulk_history=source.fetch_bulk_history,
+                          quote_index=QuoteIndex(store))
+
+
+def test_update_fetches_from_the_last_bar_and_refreshes_it(tmp_path):
+    store = DataStore(str(tmp_path), 'csv')
+    store.write_history(bars('2024-03-01', '2024-03-08', 10.0), 'AAA')
+    source = FakeSource({'AAA': bars('2024-03-01', '2024-03-15', 11.0)})
+    updater = updater_for(store, source)
+    assert updater.update('AAA') == 6  # the stored last bar plus five new ones
+    assert source.single_calls == [('AAA', pd.Timestamp('2024-03-08'))]
+    history = store.read_history('AAA')
+    assert len(history) == 11 and history['Close'].loc['2024-03-07'] == 10.0
+    assert history['Close'].loc['2024-03-08':].eq(11.0).all()
+    assert updater.quote_index.latest_close('AAA') == 11.0
+
+
+def test_watermark_answers_without_reading_the_file(tmp_path, monkeypatch):
+    store = DataStore(str(tmp_path), 'csv')
+    store.write_history(bars('2024-03-01', '2024-03-08', 10.0), 'AAA')
+    updater = updater_for(store, FakeSource({'AAA': bars('2024-03-01', '2024-03-15', 11.0)}))
+    updater.update('AAA')
+    reloaded = updater_for(store, FakeSource({}))
+    assert reloaded.watermarks == updater.watermarks
+    monkeypatch.setattr(store, 'history_bounds', lambda *args, **kwargs: pytest.fail("read the file"))
+    assert reloaded.last_stored_date('AAA') == pd.Timestamp('2024-03-15')
+    # A file changed behind the watermark's back is read again
+    monkeypatch.undo()
+    store.append_history(bars('2024-03-18', '2024-03-19', 12.0), 'AAA')
+    assert reloaded.last_stored_date('AAA') == pd.Timestamp('2024-03-19')
+
+
+def test_merge_window_batches_and_falls_back_to_single_fetches(tmp_path):
+    store = DataStore(str(tmp_path), 'csv')
+    histories = {ticker: bars('2024-03-01', '2024-03-15', float(i)) for i, ticker in enumerate(['A', 'B', 'C', 'D', 'E'])}
+    source = FakeSource(histories, missing_from_batches={'C'}, failing={'E'})
+    results, requests = updater_for(store, source).merge_window(list(histories), start='2024-03-11', batch_size=2)
+    assert requests == 3 and [batch for batch, _ in source.batch_calls] == [['A', 'B'], ['C', 'D'], ['E']]
+    assert results == {'A': 5, 'B': 5, 'C': 5, 'D': 5, 'E': None}
+    assert [ticker for ticker, _ in source.single_calls] == ['C', 'E']
+    assert store.read_history('D')['Close'].tolist() == [3.0] * 5
+    # A failed batch request is retried ticker by ticker
+    source = FakeSource(histories, batch_error=True)
+    results, requests = updater_for(store, source).merge_window(['A', 'B'], start='2024-03-14')
+    assert results == {'A': 2, 'B': 2} and requests == 1 and len(source.single_calls) == 2
+
+
+def test_update_bulk_groups_tickers_by_their_last_stored_bar(tmp_path):
+    store = DataStore(str(tmp_path), 'csv')
+    today = pd.Timestamp.today().normalize()
+    for ticker in ['A', 'B', 'C']:
+        store.write_history(bars('2024-03-01', '2024-03-08', 1.0), ticker)
+    store.write_history(bars('2024-03-01', '2024-03-13', 1.0), 'D')
+    store.write_history(pd.DataFrame({'Close': [1.0], 'Volume': 1.0}, index=pd.DatetimeIndex([today], name='Date')), 'FRESH')
+    source = FakeSource({ticker: bars('2024-03-01', '2024-03-15', 2.0) for ticker in ['A', 'B', 'C', 'D', 'NEW']})
+    updater = updater_for(store, source)
+    results = updater.update_bulk(['A', 'B', 'C', 'D', 'FRESH', 'NEW'], batch_size=100)
+    assert results == {'FRESH': 0, 'A': 6, 'B': 6, 'C': 6, 'D': 3, 'NEW': 11}
+    assert sorted((batch, str(start)) for batch, start in source.batch_calls) == [
+        (['A', 'B', 'C'], '2024-03-08 00:00:00'), (['D'], '2024-03-13 00:00:00'), (['NEW'], 'None')]
+    assert updater.load_watermarks() == updater.watermarks
+    assert all(updater.last_stored_date(ticker) == pd.Timestamp('2024-03-15') for ticker in ['A', 'D', 'NEW'])
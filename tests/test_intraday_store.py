@@ -0,0 +1,64 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from data_store import DataStore, FILE_EXTENSIONS, HAS_PYARROW
+from intraday_store import IntradayStore, resample_bars
+
+FORMATS = list(FILE_EXTENSIONS) if HAS_PYARROW else ['csv']
+
+
+def minute_bars(start, periods, close):
+    index = pd.date_range(start, periods=periods, freq='1min', name='Datetime')
+    close = np.full(periods, close, dtype=np.float64) if np.isscalar(close) else np.asarray(close, dtype=np.float64)
+    return pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close, 'Volume': 100.0},
+                        index=index)
+
+
+@pytest.mark.parametrize('file_format', FORMATS)
+def test_overlapping_fetches_merge_into_day_partitions(tmp_path, file_format):
+    intraday = IntradayStore(DataStore(str(tmp_path), file_format))
+    # Two rolling windows: the second overlaps the first's last ten minutes and crosses into the next day
+    first = minute_bars('2024-03-14 15:30', 30, 10.0)
+    second = pd.concat([minute_bars('2024-03-14 15:50', 10, 20.0), minute_bars('2024-03-15 09:30', 5, 30.0)])
+    assert intraday.write_bars('AAA', '1m', first) == 1
+    assert intraday.write_bars('AAA', '1m', second) == 2
+    assert list(intraday.partitions('AAA', '1m')) == [pd.Timestamp('2024-03-14'), pd.Timestamp('2024-03-15')]
+    day = intraday.read_bars('AAA', '1m', start='2024-03-14', end='2024-03-14')
+    assert len(day) == 30 and day.index.is_monotonic_increasing
+    assert day['Close'].tolist() == [10.0] * 20 + [20.0] * 10  # the later fetch wins
+    assert len(intraday.read_bars('AAA', '1m')) == 35
+
+
+def test_resample_bars_aggregates_ohlcv_and_vwap():
+    bars = minute_bars('2024-03-15 09:30', 4, [10.0, 12.0, 11.0, 13.0])
+    bars['Volume'] = [100.0, 300.0, 0.0, 200.0]
+    two_minute = resample_bars(pd.concat([minute_bars('2024-03-15 09:28', 2, 5.0), bars]), '2min')
+    assert list(two_minute.index) == [pd.Timestamp('2024-03-15 09:28'), pd.Timestamp('2024-03-15 09:30'),
+                                  pd.Timestamp('2024-03-15 09:32')]
+    session = two_minute.loc['2024-03-15 09:30']
+    assert (session['Open'], session['High'], session['Low'], session['Close']) == (10.0, 13.0, 9.0, 12.0)
+    assert session['Volume'] == 400.0
+    # Typical price equals the close for these bars: (10 * 100 + 12 * 300) / 400
+    assert session['VWAP'] == pytest.approx(11.5)
+    assert two_minute.loc['2024-03-15 09:32', 'VWAP'] == pytest.approx(13.0)
+
+
+def test_resample_buckets_are_anchored_at_the_session_open():
+    bars = minute_bars('2024-03-15 09:30', 120, np.arange(120.0))
+    hourly = resample_bars(bars, '1h')
+    assert list(hourly.index) == [pd.Timestamp('2024-03-15 09:30'), pd.Timestamp('2024-03-15 10:30')]
+    assert hourly['Close'].tolist() == [59.0, 119.0] and hourly['Volume'].tolist() == [6000.0, 6000.0]
+
+
+def test_derived_partitions_are_rebuilt_when_the_source_changes(tmp_path):
+    intraday = IntradayStore(DataStore(str(tmp_path), 'csv'))
+    intraday.write_bars('AAA', '1m', minute_bars('2024-03-15 09:30', 10, 10.0))
+    assert intraday.resample('AAA', '5m')['Close'].tolist() == [10.0, 10.0]
+    derived = intraday.partition_path('AAA', '5m_from_1m', '2024-03-15')
+    built = os.stat(derived).st_mtime_ns
+    assert intraday.resample('AAA', '5m')['Close'].tolist() == [10.0, 10.0]
+    assert os.stat(derived).st_mtime_ns == built
+    intraday.write_bars('AAA', '1m', minute_bars('2024-03-15 09:39', 1, 99.0))
+    os.utime(derived, ns=(built - 10**9, built - 10**9))  # the rewrite may share the derived file's mtime tick
+    assert intraday.resample('AAA', '5m')['Close'].tolist() == [10.0, 99.0]
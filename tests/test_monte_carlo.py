@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+from data_store import DataStore
+from monte_carlo import MonteCarloSimulator, estimate_returns
+
+
+@pytest.fixture(scope='module')
+def store(tmp_path_factory):
+    store = DataStore(str(tmp_path_factory.mktemp('montecarlo')))
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range(end='2024-03-15', periods=400, name='Date')
+    for ticker, drift, volatility in (('AAA', 0.0005, 0.01), ('BBB', -0.0002, 0.02)):
+        close = 100 * np.exp(np.cumsum(rng.normal(drift, volatility, len(dates))))
+        store.write_history(pd.DataFrame({'Close': close}, index=dates), ticker)
+    return store
+
+
+def history_returns(store, ticker, lookback):
+    prices = store.read_history(ticker, columns=['Close'])['Close'].to_numpy()[:, None]
+    return estimate_returns(prices, lookback)[:, 0]
+
+
+def test_results_depend_on_the_seed_only(store):
+    portfolios = {'Mixed': {'AAA': 10.0, 'BBB': 5.0, 'Cash': 100.0}}
+    first = MonteCarloSimulator(store, chunk_size=300, max_workers=1).simulate(portfolios, paths=1000, horizon=20, seed=7)
+    pooled = MonteCarloSimulator(store, chunk_size=300, max_workers=2).simulate(portfolios, paths=1000, horizon=20, seed=7)
+    other = MonteCarloSimulator(store, chunk_size=300, max_workers=1).simulate(portfolios, paths=1000, horizon=20, seed=8)
+    assert np.array_equal(first[0], pooled[0]) and np.array_equal(first[1], pooled[1])
+    assert not np.array_equal(first[0], other[0])
+    assert first[1].shape == (1000, 4, 1)  # recorded every 5 of 20 days
+    assert np.array_equal(first[1][:, -1], first[0])
+
+
+@pytest.mark.parametrize('method', ['bootstrap', 'gbm'])
+def test_simulated_log_returns_have_the_historical_moments(store, method):
+    paths, horizon, lookback = 40000, 10, 300
+    simulator = MonteCarloSimulator(store, lookback=lookback, max_workers=1)
+    terminal, _, start = simulator.simulate({'Single': {'AAA': 10.0}}, paths=paths, horizon=horizon, method=method)
+    outcomes = np.log(terminal[:, 0].astype(np.float64) / start[0])
+    daily = history_returns(store, 'AAA', lookback)
+    mean, variance = horizon * daily.mean(), horizon * daily.var(ddof=1)
+    assert abs(outcomes.mean() - mean) < 5 * np.sqrt(variance / paths)
+    assert outcomes.var(ddof=1) == pytest.approx(variance, rel=0.05)
+
+
+def test_report_gives_ordered_risk_and_fan_percentiles(store):
+    simulator = MonteCarloSimulator(store, max_workers=1)
+    risk, fans = simulator.report({'A': {'AAA': 10.0}, 'B': {'BBB': 10.0}}, paths=4000, horizon=20)
+    assert list(risk.index) == ['A', 'B']
+    assert (risk['CVaR 99%'] >= risk['VaR 99%']).all() and (risk['VaR 99%'] >= risk['VaR 95%']).all()
+    assert risk.loc['B', 'VaR 95%'] > risk.loc['A', 'VaR 95%']  # the more volatile history
+    assert list(fans['A'].index) == [5, 10, 15, 20]
+    assert (fans['A'].diff(axis=1).iloc[:, 1:] >= 0).all().all()
@@ -0,0 +1,37 @@
+import os
+import pandas as pd
+from data_store import DataStore
+from news_store import NewsStore, NEWS_COLUMNS
+
+
+def articles(ids, ticker='AAA'):
+    return pd.DataFrame({'Id': [f"id{i}" for i in ids], 'Ticker': ticker,
+                         'Published': pd.to_datetime([f"2024-03-{1 + i % 28:02d}" for i in ids]),
+                         'Title': [f"Earnings beat {i}" for i in ids], 'Summary': 'Quarterly results',
+                         'Publisher': 'Wire', 'Url': '', 'Type': 'STORY'}, columns=NEWS_COLUMNS)
+
+
+def test_index_is_loaded_on_first_use(tmp_path):
+    store = DataStore(str(tmp_path))
+    NewsStore(store).append('AAA', articles(range(3)))
+    news = NewsStore(store)
+    assert not news.loaded and len(news.index) == 0
+    assert news.latest('AAA')['Id'].tolist() == ['id2', 'id1', 'id0']
+    assert news.loaded
+    # Articles stored before the index was loaded are not written again
+    assert news.append('AAA', articles(range(4))) == 1
+
+
+def test_segments_are_compacted_after_the_threshold(tmp_path):
+    store = DataStore(str(tmp_path))
+    news = NewsStore(store, compact_after=3)
+    for i in range(5):
+        news.append('AAA', articles([i]))
+    assert len(news.segment_files()) < 3
+    assert sorted(news.search('earnings', limit=None)['Id']) == [f"id{i}" for i in range(5)]
+    other = NewsStore(store)
+    other.append('BBB', articles([9], 'BBB'))
+    assert news.compact() >= 2
+    assert len(news.segment_files()) == 1
+    assert news.latest('BBB')['Id'].tolist() == ['id9']
+    assert os.path.basename(news.segment_files()[0]) in {os.path.basename(p) for p in news.segments}
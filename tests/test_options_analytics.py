@@ -0,0 +1,89 @@
+import math
+import numpy as np
+import pytest
+from options_analytics import black_scholes_price, greeks, implied_volatility, norm_cdf
+
+
+def black_scholes_price_scalar(S, K, T, r, sigma, is_call, q=0.0):
+    """Reference scalar implementation."""
+    d1 = (math.log(S / K) + (r - q + 0.5 * sigma ** 2) * T) / (sigma * math.sqrt(T))
+    d2 = d1 - sigma * math.sqrt(T)
+    cdf = lambda x: 0.5 * (1 + math.erf(x / math.sqrt(2)))
+    if is_call:
+        return S * math.exp(-q * T) * cdf(d1) - K * math.exp(-r * T) * cdf(d2)
+    return K * math.exp(-r * T) * cdf(-d2) - S * math.exp(-q * T) * cdf(-d1)
+
+
+def implied_volatility_scalar(price, S, K, T, r, is_call, q=0.0, low=1e-4, high=5.0, tol=1e-12):
+    """Reference scalar implied volatility by plain bisection."""
+    for _ in range(200):
+        mid = 0.5 * (low + high)
+        if black_scholes_price_scalar(S, K, T, r, mid, is_call, q) > price:
+            high = mid
+        else:
+            low = mid
+        if high - low < tol:
+            break
+    return 0.5 * (low + high)
+
+
+@pytest.fixture(scope='module')
+def contracts():
+    rng = np.random.default_rng(0)
+    count = 2000
+    S = rng.uniform(20, 500, count)
+    return {'S': S, 'K': S * rng.uniform(0.7, 1.3, count), 'T': rng.uniform(7, 730, count) / 365,
+            'r': rng.uniform(0.0, 0.05, count), 'sigma': rng.uniform(0.1, 1.2, count),
+            'is_call': rng.random(count) < 0.5, 'q': rng.uniform(0.0, 0.03, count)}
+
+
+def arguments(c, *names):
+    return zip(*(c[name] for name in names))
+
+
+def test_norm_cdf_matches_erf():
+    x = np.linspace(-40, 40, 2001)
+    expected = np.array([0.5 * math.erfc(-value / math.sqrt(2)) for value in x])
+    assert np.max(np.abs(norm_cdf(x) - expected)) < 1e-14
+
+
+def test_prices_match_the_scalar_reference(contracts):
+    c = contracts
+    prices = black_scholes_price(c['S'], c['K'], c['T'], c['r'], c['sigma'], c['is_call'], c['q'])
+    reference = np.array([black_scholes_price_scalar(*args)
+                          for args in arguments(c, 'S', 'K', 'T', 'r', 'sigma', 'is_call', 'q')])
+    assert np.max(np.abs(prices - reference) / c['S']) < 1e-12
+
+
+def test_implied_volatility_recovers_the_input(contracts):
+    # IV is only identifiable where vega is above 1e-4 of spot; elsewhere any volatility reprices within rounding
+    c = contracts
+    prices = np.array([black_scholes_price_scalar(*args)
+                       for args in arguments(c, 'S', 'K', 'T', 'r', 'sigma', 'is_call', 'q')])
+    iv = implied_volatility(prices, c['S'], c['K'], c['T'], c['r'], c['is_call'], c['q'])
+    vega = greeks(c['S'], c['K'], c['T'], c['r'], c['sigma'], c['is_call'], c['q'])['Vega']
+    solvable = np.isfinite(iv) & (vega > 1e-4 * c['S'])
+    assert solvable.mean() > 0.95
+    assert np.max(np.abs(iv[solvable] - c['sigma'][solvable])) < 1e-7
+    subset = np.flatnonzero(solvable)[:200]
+    reference = np.array([implied_volatility_scalar(prices[i], c['S'][i], c['K'][i], c['T'][i], c['r'][i],
+                                                    c['is_call'][i], c['q'][i]) for i in subset])
+    assert np.max(np.abs(iv[subset] - reference)) < 1e-7
+
+
+def test_implied_volatility_is_nan_below_intrinsic_value():
+    iv = implied_volatility(np.array([0.5]), 100.0, 90.0, 0.5, 0.0, True)
+    assert np.isnan(iv).all()
+
+
+def test_greeks_match_finite_differences(contracts):
+    c = {key: value[:200] for key, value in contracts.items()}
+    args = (c['K'], c['T'], c['r'])
+    values = greeks(c['S'], *args, c['sigma'], c['is_call'], c['q'])
+    h = 1e-4
+    bump_s = (black_scholes_price(c['S'] * (1 + h), *args, c['sigma'], c['is_call'], c['q'])
+              - black_scholes_price(c['S'] * (1 - h), *args, c['sigma'], c['is_call'], c['q'])) / (2 * h * c['S'])
+    bump_sigma = (black_scholes_price(c['S'], *args, c['sigma'] + h, c['is_call'], c['q'])
+                  - black_scholes_price(c['S'], *args, c['sigma'] - h, c['is_call'], c['q'])) / (2 * h)
+    assert np.allclose(values['Delta'], bump_s, atol=1e-6)
+    assert np.allclose(values['Vega'], bump_sigma, rtol=1e-5, atol=1e-6)
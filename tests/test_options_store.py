@@ -0,0 +1,22 @@
+import os
+import pandas as pd
+from data_store import DataStore
+from options_store import OptionsStore
+
+
+def chain(strikes, last_price):
+    return pd.DataFrame({'contractSymbol': [f"AAA{strike:.0f}" for strike in strikes], 'strike': strikes,
+                         'lastPrice': last_price, 'Type': 'call'})
+
+
+def test_snapshots_in_the_same_minute_or_second_are_kept_apart(tmp_path):
+    options = OptionsStore(DataStore(str(tmp_path), file_format='csv'))
+    # An id written before snapshots carried seconds
+    os.makedirs(options.snapshot_directory('AAA', '2024-03-15T1000'))
+    times = ['2024-03-15 10:00:05', '2024-03-15 10:00:05', '2024-03-15 10:00:30', '2024-03-15 10:01:00']
+    ids = [options.write_snapshot('AAA', {'2024-04-19': chain([90.0, 100.0], i)}, time)
+           for i, time in enumerate(times)]
+    assert ids == ['2024-03-15T100005', '2024-03-15T100005-1', '2024-03-15T100030', '2024-03-15T100100']
+    assert options.snapshots('AAA') == ['2024-03-15T1000'] + ids
+    assert options.query('AAA')['lastPrice'].tolist() == [3.0, 3.0]
+    assert options.query('AAA', snapshot=ids[0])['lastPrice'].tolist() == [0.0, 0.0]
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose
+from portfolio_optimizer import CovarianceState, efficient_frontier, project_capped_simplex, solve_frontier
+
+
+def factor_returns(rows, symbols, seed=0):
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(0.0003, 0.01, (rows, 3))
+    return factors @ rng.normal(0.5, 0.3, (3, symbols)) + rng.normal(0.0002, 0.015, (rows, symbols))
+
+
+def ledoit_wolf(window):
+    """Ledoit-Wolf shrinkage to a scaled identity, computed directly from the window."""
+    rows, symbols = window.shape
+    centred = window - window.mean(axis=0)
+    sample = centred.T @ centred / rows
+    target = np.trace(sample) / symbols
+    dispersion = ((sample - target * np.eye(symbols)) ** 2).sum()
+    noise = sum(((np.outer(x, x) - sample) ** 2).sum() for x in centred) / rows ** 2
+    shrinkage = min(noise, dispersion) / dispersion
+    return shrinkage * target * np.eye(symbols) + (1 - shrinkage) * sample
+
+
+def test_incremental_covariance_matches_a_rebuild():
+    returns = factor_returns(400, 6)
+    returns[[50, 320], 2] = np.nan  # missing bars count as zero returns
+    window, halflife = 60, 20
+    state = CovarianceState.from_returns(range(6), returns[:100], window, halflife)
+    for row in returns[100:]:  # several window evictions and a resync
+        state.append(row)
+    tail = np.nan_to_num(returns)[-window:]
+    mean, cov = state.estimate('sample')
+    assert_allclose(mean, tail.mean(axis=0), rtol=1e-10)
+    assert_allclose(cov, np.cov(tail, rowvar=False), rtol=1e-9, atol=1e-15)
+    assert_allclose(state.estimate('shrinkage')[1], ledoit_wolf(tail), rtol=1e-8, atol=1e-15)
+    weights = 0.5 ** (np.arange(len(returns))[::-1] / halflife)
+    ew_mean = weights @ np.nan_to_num(returns) / weights.sum()
+    centred = np.nan_to_num(returns) - ew_mean
+    mean, cov = state.estimate('ewma')
+    assert_allclose(mean, ew_mean, rtol=1e-9)
+    assert_allclose(cov, (centred * weights[:, None]).T @ centred / weights.sum(), rtol=1e-8, atol=1e-15)
+
+
+def test_a_partly_filled_window_uses_the_rows_seen():
+    returns = factor_returns(30, 4)
+    state = CovarianceState.from_returns(range(4), returns[:10], window=60)
+    for row in returns[10:]:
+        state.append(row)
+    assert state.rows == 30
+    assert_allclose(state.estimate('sample')[1], np.cov(returns, rowvar=False), rtol=1e-10)
+
+
+@pytest.mark.parametrize('cap', [1.0, 0.3, 0.1])
+def test_projection_lands_on_the_capped_simplex(cap):
+    values = np.random.default_rng(1).normal(0, 1, (10, 50)) * np.logspace(-3, 2, 50)
+    projected, theta = project_capped_simplex(values, cap)
+    assert_allclose(projected.sum(axis=0), 1.0, atol=1e-10)
+    assert projected.min() >= 0 and projected.max() <= cap + 1e-15
+    # It is the nearest point: every weight is its value shifted by the column's theta, then clipped
+    assert_allclose(projected, np.clip(values - theta, 0, cap), atol=1e-12)
+    # Points already on the set stay where they are
+    assert_allclose(project_capped_simplex(projected, cap)[0], projected, atol=1e-10)
+
+
+def test_frontier_weights_meet_the_constraints():
+    returns = factor_returns(500, 12)
+    mean, cov = returns.mean(axis=0), np.cov(returns, rowvar=False)
+    frontier, weights, min_variance, max_sharpe = efficient_frontier(mean, cov, list(range(12)), points=20, cap=0.25)
+    for column in [weights[point] for point in weights] + [min_variance, max_sharpe]:
+        assert column.sum() == pytest.approx(1.0, abs=1e-8)
+        assert column.min() >= 0 and column.max() <= 0.25 + 1e-12
+    variances = np.einsum('ik,ij,jk->k', weights.to_numpy(), cov, weights.to_numpy())
+    assert variances[0] == pytest.approx(variances.min(), rel=1e-6)
+    assert (np.diff(frontier['Return']) >= -1e-9).all()
+    assert max_sharpe @ mean / np.sqrt(max_sharpe @ cov @ max_sharpe) >= frontier['Sharpe'].max() / np.sqrt(252) - 1e-9
+
+
+def test_minimum_variance_point_matches_the_closed_form():
+    cov = np.diag([1.0, 2.0, 4.0]) * 1e-4
+    mean = np.array([0.001, 0.0005, 0.0002])
+    # Uncapped, the minimum-variance weights are proportional to 1 / variance
+    assert_allclose(solve_frontier(mean, cov, [0.0])[:, 0], np.array([4.0, 2.0, 1.0]) / 7, atol=1e-7)
+    # A 0.5 cap binds on the first weight and leaves the rest in the same 2:1 ratio
+    assert_allclose(solve_frontier(mean, cov, [0.0], cap=0.5)[:, 0], [0.5, 1 / 3, 1 / 6], atol=1e-7)
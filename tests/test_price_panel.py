@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+from data_store import DataStore
+from price_panel import PricePanel, align_series, forward_fill, holdings_matrix
+
+
+def write_closes(store, ticker, closes):
+    dates = pd.DatetimeIndex(list(closes), name='Date')
+    store.write_history(pd.DataFrame({'Close': list(closes.values())}, index=dates), ticker)
+
+
+def test_align_series_uses_the_union_calendar():
+    dates, matrix = align_series([np.array(['2024-01-02', '2024-01-04'], dtype='datetime64[ns]'),
+                                  np.array(['2024-01-03', '2024-01-04'], dtype='datetime64[ns]')],
+                                 [np.array([1.0, 2.0]), np.array([10.0, 20.0])])
+    assert list(dates) == list(pd.to_datetime(['2024-01-02', '2024-01-03', '2024-01-04']))
+    assert np.array_equal(matrix, np.array([[1.0, np.nan], [np.nan, 10.0], [2.0, 20.0]]), equal_nan=True)
+
+
+def test_forward_fill_carries_prices_but_not_before_listing():
+    matrix = np.array([[np.nan, 1.0], [2.0, np.nan], [np.nan, np.nan], [np.nan, np.nan], [5.0, 6.0]])
+    assert np.array_equal(forward_fill(matrix), np.array([[np.nan, 1.0], [2.0, 1.0], [2.0, 1.0], [2.0, 1.0], [5.0, 6.0]]),
+                          equal_nan=True)
+    limited = forward_fill(matrix, limit=1)
+    assert np.array_equal(limited[:, 1], [1.0, 1.0, np.nan, np.nan, 6.0], equal_nan=True)
+
+
+def test_panel_values_portfolios_across_missing_bars(tmp_path):
+    store = DataStore(str(tmp_path), 'csv')
+    write_closes(store, 'AAA', {'2024-01-02': 10.0, '2024-01-03': 11.0, '2024-01-05': 12.0})
+    # Lists later and misses the 4th
+    write_closes(store, 'BBB', {'2024-01-03': 100.0, '2024-01-05': 90.0})
+    panel = PricePanel(store)
+    dates, symbols, prices = panel.load(['BBB', 'AAA', 'MISSING', 'AAA'])
+    assert symbols == ['BBB', 'AAA']
+    assert list(dates) == list(pd.to_datetime(['2024-01-02', '2024-01-03', '2024-01-05']))
+    assert np.array_equal(prices, np.array([[np.nan, 10.0], [100.0, 11.0], [90.0, 12.0]]), equal_nan=True)
+    values = panel.portfolio_values({'Main': {'AAA': 2, 'BBB': 1, 'Cash': 50}, 'Solo': {'BBB': 3, 'MISSING': 5}})
+    assert values['Main'].tolist() == [20.0, 122.0, 114.0]
+    assert values['Solo'].tolist() == [0.0, 300.0, 270.0]
+    # A day only one symbol traded carries the other's last price
+    write_closes(store, 'CCC', {'2024-01-04': 1.0})
+    dates, _, prices = PricePanel(store).load(['AAA', 'BBB', 'CCC'])
+    assert prices[list(dates).index(pd.Timestamp('2024-01-04'))].tolist() == [11.0, 100.0, 1.0]
+
+
+def test_holdings_matrix_ignores_symbols_outside_the_panel():
+    matrix = holdings_matrix({'A': {'X': 1, 'Y': 2}, 'B': {'Y': 3, 'Z': 4}}, ['Y', 'X'])
+    assert matrix.tolist() == [[2.0, 1.0], [3.0, 0.0]]
@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+from data_store import DataStore
+from quote_index import QuoteIndex
+
+
+def bars(end, periods, start_close):
+    dates = pd.bdate_range(end=end, periods=periods, name='Date')
+    return pd.DataFrame({'Close': start_close + np.arange(periods, dtype=float), 'Volume': 1000.0}, index=dates)
+
+
+def test_record_takes_the_last_bar_from_the_written_file(tmp_path):
+    store = DataStore(str(tmp_path))
+    index = QuoteIndex(store)
+    history = bars('2024-03-15', 20, 10.0)
+    index.record('AAA', history, store.write_history(history, 'AAA'))
+    assert index.latest_close('AAA') == 29.0
+    # A window in the middle of the history: the stored last bar now carries a restated close
+    restated = bars('2024-03-15', 3, 50.0).iloc[:1]
+    full = pd.concat([history.iloc[:-3], bars('2024-03-15', 3, 50.0)])
+    index.record('AAA', restated, store.write_history(full, 'AAA'))
+    assert index.latest_close('AAA') == 52.0
+    assert index.check(['AAA'], rebuild=False) == []
+    # A shorter rewrite moves the entry back to the file's last bar
+    shorter = history.iloc[:10]
+    index.record('AAA', shorter, store.write_history(shorter, 'AAA'))
+    assert index.quotes['AAA']['Date'] == shorter.index[-1] and index.latest_close('AAA') == 19.0
@@ -0,0 +1,39 @@
+import time
+import numpy as np
+import pytest
+from quote_stream import LatestPriceTable, LivePortfolio, QuoteFeed, SimulatedFeed
+
+
+def test_quote_feed_requires_the_whole_interface():
+    class PartialFeed(QuoteFeed):
+        def subscribe(self, symbols, reference_prices=None):
+            pass
+    with pytest.raises(TypeError):
+        QuoteFeed()
+    with pytest.raises(TypeError):
+        PartialFeed()
+
+
+def test_simulated_feed_streams_only_subscribed_symbols():
+    feed, table = SimulatedFeed(rate=5000, seed=0), LatestPriceTable()
+    feed.subscribe(['AAA', 'BBB'], {'AAA': 50.0})
+    feed.start(table)
+    deadline = time.perf_counter() + 5
+    while len(table.prices) < 2 and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    feed.stop()
+    assert set(table.take_changes()) == {'AAA', 'BBB'}
+    assert table.latest('AAA') == pytest.approx(50.0, rel=0.1)
+    assert table.take_changes() == {}
+
+
+def test_live_portfolio_total_tracks_a_full_revaluation():
+    rng = np.random.default_rng(0)
+    symbols = [f"S{i}" for i in range(50)]
+    portfolio = LivePortfolio(dict.fromkeys(symbols, 10.0), dict.fromkeys(symbols, 100.0), resync_every=7)
+    for _ in range(100):
+        changes = dict(zip(rng.choice(symbols, 5), rng.uniform(50, 150, 5)))
+        rows = portfolio.apply({**changes, 'UNHELD': 1.0})
+        assert sorted(rows) == sorted(portfolio.rows[s] for s in changes)
+    assert portfolio.total == pytest.approx((portfolio.shares * portfolio.prices).sum(), rel=1e-12)
+    assert portfolio.weights().sum() == pytest.approx(100.0)
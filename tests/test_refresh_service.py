@@ -0,0 +1,66 @@
+import pandas as pd
+from market_calendar import MarketCalendar
+from refresh_service import AfterClose, AtTimes, Every, RefreshScheduler, SimulatedClock, Weekly
+
+CALENDAR = MarketCalendar()
+
+
+def recording_scheduler(start, cadences, state_file=None, job_seconds=0, failing=()):
+    """A scheduler on a SimulatedClock whose jobs record the local time they ran at."""
+    clock = SimulatedClock(pd.Timestamp(start, tz=CALENDAR.timezone))
+    scheduler = RefreshScheduler(CALENDAR, clock, max_workers=0, state_file=state_file)
+    runs = {name: [] for name in cadences}
+
+    def job(name):
+        def action():
+            runs[name].append(CALENDAR.local(clock.now()))
+            clock.advance(job_seconds)
+            if name in failing:
+                raise RuntimeError("provider down")
+        return action
+    for name, cadence in cadences.items():
+        scheduler.add(name, cadence, job(name))
+    return scheduler, clock, runs
+
+
+def test_daily_runs_skip_the_holiday_and_follow_the_early_close():
+    scheduler, clock, runs = recording_scheduler('2024-07-01 08:00', {'daily_bars': AfterClose()})
+    scheduler.run(until=clock.now() + pd.Timedelta(days=7))
+    assert [f"{moment:%m-%d %H:%M}" for moment in runs['daily_bars']] == [
+        '07-01 16:30', '07-02 16:30', '07-03 13:30', '07-05 16:30']
+
+
+def test_intraday_and_option_slots_stay_inside_the_session():
+    scheduler, clock, runs = recording_scheduler('2024-07-03 08:00', {'intraday': Every(60), 'options': AtTimes()})
+    scheduler.run(until=clock.now() + pd.Timedelta(hours=12))
+    assert [f"{moment:%H:%M}" for moment in runs['intraday']] == ['09:30', '10:30', '11:30', '12:30']
+    assert [f"{moment:%H:%M}" for moment in runs['options']] == ['10:00']  # 15:30 is after the early close
+
+
+def test_weekly_runs_after_the_last_session_of_the_week():
+    scheduler, clock, runs = recording_scheduler('2024-07-01 08:00', {'fundamentals': Weekly()})
+    scheduler.run(until=clock.now() + pd.Timedelta(days=14))
+    assert [f"{moment:%a %m-%d %H:%M}" for moment in runs['fundamentals']] == ['Fri 07-05 18:00', 'Fri 07-12 18:00']
+
+
+def test_restart_does_not_redo_a_period_and_collapses_missed_runs(tmp_path):
+    state_file = str(tmp_path / 'refresh_state.csv')
+    scheduler, clock, runs = recording_scheduler('2024-07-01 08:00', {'daily_bars': AfterClose()}, state_file)
+    scheduler.run(until=pd.Timestamp('2024-07-01 17:00', tz=CALENDAR.timezone))
+    assert len(runs['daily_bars']) == 1
+    # Down until Friday morning: Tuesday's and Wednesday's runs collapse into one catch-up run
+    scheduler, clock, runs = recording_scheduler('2024-07-05 08:00', {'daily_bars': AfterClose()}, state_file)
+    scheduler.run(until=clock.now() + pd.Timedelta(hours=12))
+    assert [f"{moment:%m-%d %H:%M}" for moment in runs['daily_bars']] == ['07-05 08:00', '07-05 16:30']
+    # The catch-up run is for Wednesday's early close
+    assert scheduler.stats().loc['daily_bars', 'Max Lateness'] == pd.Timedelta(hours=42, minutes=30).total_seconds()
+
+
+def test_failures_are_counted_and_retried_next_period(tmp_path):
+    scheduler, clock, runs = recording_scheduler('2024-07-01 08:00', {'daily_bars': AfterClose()},
+                                                 str(tmp_path / 'state.csv'), job_seconds=60, failing={'daily_bars'})
+    scheduler.run(until=clock.now() + pd.Timedelta(days=2))
+    stats = scheduler.stats()
+    assert stats.loc['daily_bars', 'Runs'] == 0 and stats.loc['daily_bars', 'Failures'] == 2
+    assert stats.loc['daily_bars', 'Mean Duration'] == 60.0
+    assert scheduler.state == {}
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+from numpy.testing import assert_allclose
+from risk_metrics import METRICS, RollingRiskState, max_drawdown, rolling_metrics
+
+WINDOWS = (5, 12)
+
+
+def random_returns(rows=40, symbols=3, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range('2024-01-01', periods=rows)
+    returns = pd.DataFrame(rng.normal(0, 0.02, (rows, symbols)), index=index, columns=[f"S{i}" for i in range(symbols)])
+    returns.iloc[[3, 17], 1] = np.nan  # missing bars
+    benchmark = pd.Series(rng.normal(0, 0.01, rows), index=index)
+    return returns, benchmark
+
+
+def test_incremental_state_matches_the_vectorized_metrics_bar_by_bar():
+    returns, benchmark = random_returns()
+    expected = rolling_metrics(returns, benchmark, WINDOWS, risk_free_rate=0.02)
+    state = RollingRiskState(returns.columns, WINDOWS, risk_free_rate=0.02)
+    # Well past the longest window, so every window has evicted bars (including the missing ones)
+    for t, date in enumerate(returns.index):
+        state.append(returns.loc[date].to_numpy(), benchmark[date])
+        current = state.metrics()
+        for window in WINDOWS:
+            for name in METRICS:
+                assert_allclose(current.loc[(window, name)].to_numpy(dtype=np.float64),
+                                expected[window][name].iloc[t].to_numpy(), rtol=1e-9, atol=1e-12)
+    wealth = (1 + returns.fillna(0)).cumprod()
+    assert_allclose(current.loc[('All', 'Max Drawdown')].to_numpy(dtype=np.float64), max_drawdown(wealth).to_numpy())
+
+
+def test_seeded_state_continues_like_one_built_bar_by_bar():
+    returns, benchmark = random_returns(rows=60)
+    seeded = RollingRiskState.from_returns(returns.iloc[:45], benchmark, WINDOWS)
+    replayed = RollingRiskState(returns.columns, WINDOWS)
+    for date in returns.index[:45]:
+        replayed.append(returns.loc[date].to_numpy(), benchmark[date])
+    for date in returns.index[45:]:
+        seeded.append(returns.loc[date].to_numpy(), benchmark[date])
+        replayed.append(returns.loc[date].to_numpy(), benchmark[date])
+    assert_allclose(seeded.metrics().to_numpy(dtype=np.float64), replayed.metrics().to_numpy(dtype=np.float64),
+                    rtol=1e-9)
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+from data_store import DataStore
+from stock_screener import StockInfoTable, filter_mask, screen
+
+INFO = {
+    'AAA': {'trailingPE': 10.0, 'sector': 'Technology', 'exDividendDate': 1700000000, 'longName': 'Alpha Corp'},
+    'BBB': {'trailingPE': 30.0, 'sector': 'Energy', 'exDividendDate': 1600000000, 'longName': 'Beta Inc'},
+    'CCC': {'trailingPE': None, 'sector': 'Technology', 'exDividendDate': None, 'longName': 'Gamma Alpha'},
+}
+
+
+@pytest.fixture
+def info_table(tmp_path):
+    info_table = StockInfoTable(DataStore(str(tmp_path), 'csv'))
+    for symbol, info in INFO.items():
+        info_table.upsert(symbol, info, retrieved='2024-03-15')
+    return info_table
+
+
+def passing(table, *filters):
+    return list(table.index[filter_mask(table, filters)])
+
+
+def test_columns_are_typed_from_their_values(info_table):
+    table = info_table.table()
+    assert table['trailingPE'].dtype == np.float64
+    assert isinstance(table['sector'].dtype, pd.CategoricalDtype)
+    assert table.loc['AAA', 'exDividendDate'] == pd.Timestamp(1700000000, unit='s')
+
+
+def test_filters_cover_every_operator_and_fail_missing_values(info_table):
+    table = info_table.table()
+    assert passing(table, ('trailingPE', '<', 20)) == ['AAA']
+    assert passing(table, ('trailingPE', '!=', 10)) == ['BBB']
+    assert passing(table, ('trailingPE', 'between', (10, 30))) == ['AAA', 'BBB']
+    assert passing(table, ('sector', 'in', ['Energy', 'Utilities'])) == ['BBB']
+    assert passing(table, ('sector', '==', 'Technology')) == ['AAA', 'CCC']
+    assert passing(table, ('sector', '!=', 'Technology')) == ['BBB']
+    assert passing(table, ('longName', 'contains', 'ALPHA')) == ['AAA', 'CCC']
+    assert passing(table, ('exDividendDate', '>', '2023-01-01')) == ['AAA']
+    assert passing(table, ('exDividendDate', '!=', '2023-01-01')) == ['AAA', 'BBB']
+    assert passing(table, ('sector', '==', 'Technology'), ('trailingPE', '>', 5)) == ['AAA']
+    assert passing(table, ('missingField', '>', 0)) == []
+
+
+def test_screen_sorts_limits_and_queries(info_table):
+    table = info_table.table()
+    assert list(screen(table, sort='-trailingPE').index) == ['BBB', 'AAA', 'CCC']
+    assert list(screen(table, sort=['sector', '-longName'], limit=2).index) == ['BBB', 'CCC']
+    result = screen(table, query="sector == 'Technology'", sort='longName', columns=['longName', 'unknown'])
+    assert list(result.index) == ['AAA', 'CCC'] and list(result.columns) == ['longName']
+
+
+def test_numeric_column_is_widened_when_text_arrives(info_table):
+    assert info_table.table()['trailingPE'].dtype == np.float64
+    info_table.upsert('DDD', {'trailingPE': 'Infinity and beyond'})
+    table = info_table.table()
+    assert info_table.schema['trailingPE'] in ('category', 'text')
+    assert table.loc['DDD', 'trailingPE'] == 'Infinity and beyond' and table.loc['AAA', 'trailingPE'] == '10.0'
+
+
+def test_compact_keeps_upserts_made_after_the_table_was_read(tmp_path):
+    store = DataStore(str(tmp_path), 'csv')
+    info_table = StockInfoTable(store)
+    info_table.upsert('AAA', INFO['AAA'])
+    info_table.table()
+    info_table.upsert('BBB', INFO['BBB'])
+    info_table.compact()
+    assert info_table.delta_files() == []
+    assert list(StockInfoTable(store).table().index) == ['AAA', 'BBB']
+
+
+def test_columns_missing_from_the_schema_are_inferred(info_table):
+    info_table.compact()
+    # The schema lost a key of the base file and holds one the table never had
+    del info_table.schema['trailingPE']
+    info_table.schema['forwardPE'] = 'numeric'
+    info_table.save_schema()
+    reopened = StockInfoTable(info_table.store)
+    assert reopened.table()['trailingPE'].dtype == np.float64
+    assert reopened.schema['trailingPE'] == 'numeric'
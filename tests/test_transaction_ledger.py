@@ -0,0 +1,33 @@
+import pandas as pd
+from data_store import DataStore
+from transaction_ledger import TransactionLedger
+
+
+def test_trade_recorded_today_counts_as_of_today(tmp_path):
+    ledger = TransactionLedger(DataStore(str(tmp_path)), 'Main')
+    ledger.record('deposit', amount=1000.0, date='2024-01-02')
+    ledger.record('buy', 'AAPL', 5, 100.0)
+    today = pd.Timestamp.today().normalize()
+    assert ledger.holdings(today) == ({'AAPL': 5.0}, 500.0)
+    frame = ledger.holdings_over_time(pd.DatetimeIndex([today - pd.Timedelta(days=1), today]))
+    assert frame['AAPL'].tolist() == [0.0, 5.0]
+    assert frame['Cash'].tolist() == [1000.0, 500.0]
+
+
+def test_times_of_day_are_dropped_on_reload(tmp_path):
+    store = DataStore(str(tmp_path))
+    ledger = TransactionLedger(store, 'Main')
+    ledger.record('buy', 'MSFT', 2, 50.0, date='2024-03-01 15:45')
+    reloaded = TransactionLedger(store, 'Main')
+    assert reloaded.entries['Date'].tolist() == [pd.Timestamp('2024-03-01')]
+    assert reloaded.holdings('2024-03-01') == ({'MSFT': 2.0}, -100.0)
+
+
+def test_holdings_use_checkpoints_and_back_dated_entries(tmp_path):
+    ledger = TransactionLedger(DataStore(str(tmp_path)), 'Main', checkpoint_every=3)
+    for day in range(1, 9):
+        ledger.record('buy', 'AAA', 1, 10.0, date=f"2024-01-{day:02d}")
+    assert ledger.holdings('2024-01-05')[0] == {'AAA': 5.0}
+    ledger.record('split', 'AAA', 2, date='2024-01-03')
+    assert ledger.holdings('2024-01-03')[0] == {'AAA': 6.0}
+    assert ledger.holdings()[0] == {'AAA': 11.0}
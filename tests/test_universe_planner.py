@@ -0,0 +1,26 @@
+import pandas as pd
+from universe_planner import UniversePlanner
+
+
+def write_portfolios(directory, portfolios):
+    for name, tickers in portfolios.items():
+        pd.DataFrame({'Ticker': tickers + ['Cash'], 'Shares': [10] * len(tickers) + [500]}).to_csv(
+            directory / f"{name}.csv", index=False)
+
+
+def test_plan_fetches_each_symbol_once_and_the_indexes_once_per_run(tmp_path):
+    write_portfolios(tmp_path, {'Growth': ['AAA', 'BBB', 'ccc'], 'Income': ['BBB', 'CCC', 'DDD']})
+    plan = UniversePlanner(str(tmp_path), datasets=['history_update', 'info']).plan()
+    assert plan.symbols('info') == ['AAA', 'BBB', 'CCC', 'DDD']
+    assert plan.market_symbols == ['^DJI', '^IXIC', '^GSPC']
+    assert plan.planned == 4 * 2 + 3
+    # Six holdings, two of them repeats: only their dataset fetches are saved
+    assert plan.requested == 6 * 2 + 3
+    assert plan.avoided == 2 * 2
+
+
+def test_plan_without_overlap_avoids_nothing(tmp_path):
+    write_portfolios(tmp_path, {'Main': ['AAA', 'BBB']})
+    plan = UniversePlanner(str(tmp_path)).plan()
+    assert plan.avoided == 0
+    assert plan.summary().startswith("5 fetches planned for 2 symbols and 3 market indexes; 0 redundant")
@@ -0,0 +1,270 @@
+import os
+import time
+import threading
+import itertools
+import numpy as np
+import pandas as pd
+from data_store import FILE_EXTENSIONS, write_frame, read_frame
+from price_panel import forward_fill
+
+LEDGER_COLUMNS = ['Seq', 'Date', 'Type', 'Ticker', 'Shares', 'Price', 'Amount']
+# Types that change share counts; for 'split' Shares holds the ratio (new shares per old share)
+SHARE_TYPES = ('buy', 'sell', 'transfer', 'split')
+CASH_TYPES = ('deposit', 'withdrawal', 'dividend')
+TRANSACTION_TYPES = SHARE_TYPES + CASH_TYPES
+# Date of opening balances imported from a net-holdings CSV, which has always been read as held throughout
+OPENING_DATE = pd.Timestamp('1970-01-01')
+
+
+def position_paths(codes, kinds, shares, initial):
+    """Shares held after every entry of a time-ordered slice.
+
+    `codes` are ticker codes, `initial` the shares held per code before the slice. A split multiplies
+    the running position, so with P_k the running product of split ratios the position after entry k
+    is P_k * (initial + sum over j <= k of change_j / P_j): two grouped cumulative sums, no replay loop.
+    """
+    split = kinds == 'split'
+    change = np.select([kinds == 'buy', kinds == 'sell', kinds == 'transfer'], [shares, -shares, shares], 0.0)
+    ratio = np.where(split, shares, 1.0)
+    growth = np.exp(pd.Series(np.log(ratio)).groupby(codes).cumsum().to_numpy())
+    scaled = pd.Series(change / growth).groupby(codes).cumsum().to_numpy()
+    return growth * (initial[codes] + scaled)
+
+
+class TransactionLedger:
+    """Append-only transactions of one portfolio in `<directory>/Ledgers/<name>/ledger_<time>_<pid>_<n>.<ext>`.
+
+    Entries are dated by trade day (times are dropped) and kept sorted by (Date, Seq). Holdings after every `checkpoint_every` entries are saved
+    as checkpoints, so holdings as of a date are a checkpoint lookup plus a replay of fewer than
+    `checkpoint_every` entries. An entry dated before existing ones invalidates the checkpoints after it.
+    """
+
+    def __init__(self, store, name, checkpoint_every=10000, ledger_directory=None):
+        self.store = store
+        self.name = name
+        self.directory = ledger_directory or os.path.join(store.directory, 'Ledgers', name)
+        self.extension = FILE_EXTENSIONS[store.file_format]
+        self.checkpoint_file = os.path.join(self.directory, f"checkpoints{self.extension}")
+        self.checkpoint_every = checkpoint_every
+        self.counter = itertools.count()
+        self.lock = threading.RLock()
+        self.entries = pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in
+                                     zip(LEDGER_COLUMNS, ['int64', 'datetime64[ns]', object, object,
+                                                          'float64', 'float64', 'float64'])})
+        self.segments = set()
+        self.last_seq = 0
+        self.checkpoints = []
+        self.refresh()
+        self.load_checkpoints()
+
+    def segment_files(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                      if name.startswith('ledger_') and os.path.splitext(name)[1] in FILE_EXTENSIONS.values())
+
+    def read_segment(self, path):
+        df = read_frame(path)
+        df['Date'] = pd.to_datetime(df['Date']).dt.normalize()
+        df['Ticker'] = df['Ticker'].fillna('').astype(str)
+        df['Type'] = df['Type'].astype(str)
+        return df[LEDGER_COLUMNS]
+
+    def refresh(self):
+        """Load segments written since (by this or another process). Returns the number of new entries."""
+        with self.lock:
+            frames = []
+            for path in self.segment_files():
+                if path not in self.segments:
+                    frames.append(self.read_segment(path))
+                    self.segments.add(path)
+            if not frames:
+                return 0
+            new = pd.concat(frames, ignore_index=True)
+            self.merge(new)
+            return len(new)
+
+    def merge(self, new):
+        """Add entries to the sorted in-memory table, dropping checkpoints the new entries land before."""
+        new = new.sort_values(['Date', 'Seq'], kind='stable')
+        self.last_seq = max(self.last_seq, int(new['Seq'].max()))
+        entries = self.entries
+        if len(entries) and (new['Date'].iloc[0], new['Seq'].iloc[0]) < (entries['Date'].iloc[-1], entries['Seq'].iloc[-1]):
+            position = int(entries['Date'].searchsorted(new['Date'].iloc[0], side='left'))
+            self.checkpoints = [checkpoint for checkpoint in self.checkpoints if checkpoint['Position'] <= position]
+            merged = pd.concat([entries, new], ignore_index=True)
+            self.entries = merged.sort_values(['Date', 'Seq'], kind='stable', ignore_index=True)
+        else:
+            self.entries = pd.concat([entries, new], ignore_index=True) if len(entries) else new.reset_index(drop=True)
+
+    def extend(self, transactions):
+        """Append a frame of transactions (Date, Type, Ticker, Shares, Price, Amount). Amount defaults to the cash flow."""
+        df = pd.DataFrame(transactions).reset_index(drop=True)
+        unknown = set(df['Type']) - set(TRANSACTION_TYPES)
+        if unknown:
+            raise ValueError(f"Unknown transaction types: {', '.join(sorted(unknown))}")
+        for column, default in (('Ticker', ''), ('Shares', 0.0), ('Price', np.nan), ('Amount', np.nan)):
+            if column not in df:
+                df[column] = default
+        df['Date'] = pd.to_datetime(df['Date']).dt.normalize()  # entries are dated by trade day
+        df['Ticker'] = df['Ticker'].fillna('').astype(str)
+        df['Type'] = df['Type'].astype(str)
+        df[['Shares', 'Price', 'Amount']] = df[['Shares', 'Price', 'Amount']].astype(np.float64)
+        flows = np.where(df['Type'].isin(['buy', 'sell']),
+                         np.where(df['Type'] == 'buy', -1.0, 1.0) * df['Shares'] * df['Price'].fillna(0.0),
+                         np.where(df['Type'] == 'withdrawal', -df['Amount'].abs(),
+                                  np.where(df['Type'].isin(CASH_TYPES), df['Amount'].abs(), 0.0)))
+        trades = df['Type'].isin(['buy', 'sell'])
+        df['Amount'] = np.where(trades & df['Amount'].notna(), df['Amount'], flows)
+        with self.lock:
+            start = max(time.time_ns(), self.last_seq + 1)
+            df['Seq'] = np.arange(start, start + len(df), dtype=np.int64)
+            df = df[LEDGER_COLUMNS]
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"ledger_{time.time_ns()}_{os.getpid()}_{next(self.counter)}{self.extension}")
+            write_frame(df, path, index=False)
+            self.segments.add(path)
+            self.merge(df)
+        return len(df)
+
+    def record(self, kind, ticker='', shares=0.0, price=np.nan, amount=np.nan, date=None):
+        """Append one transaction dated `date` (today by default)."""
+        return self.extend([{'Date': pd.Timestamp(date) if date is not None else pd.Timestamp.today(), 'Type': kind,
+                             'Ticker': ticker, 'Shares': shares, 'Price': price,
+                             'Amount': amount if kind in CASH_TYPES else np.nan}])
+
+    def replay(self, start, stop, holdings, cash):
+        """Apply entries[start:stop] to ({ticker: shares}, cash). Returns the new (holdings, cash)."""
+        entries = self.entries.iloc[start:stop]
+        cash = cash + float(entries['Amount'].sum())
+        trades = entries[entries['Type'].isin(SHARE_TYPES)]
+        if trades.empty:
+            return dict(holdings), cash
+        codes, tickers = pd.factorize(trades['Ticker'])
+        initial = np.array([holdings.get(ticker, 0.0) for ticker in tickers], dtype=np.float64)
+        paths = position_paths(codes, trades['Type'].to_numpy(), trades['Shares'].to_numpy(np.float64), initial)
+        last = pd.Series(paths).groupby(codes).last()
+        updated = dict(holdings)
+        updated.update({tickers[code]: shares for code, shares in last.items()})
+        return updated, cash
+
+    def load_checkpoints(self):
+        """Read saved checkpoints, keeping those whose position still ends at the same entry."""
+        if not os.path.exists(self.checkpoint_file):
+            return
+        df = read_frame(self.checkpoint_file)
+        seqs = self.entries['Seq'].to_numpy()
+        checkpoints = []
+        for (position, seq), group in df.groupby(['Position', 'Seq'], sort=True):
+            if position > len(seqs) or (position and seqs[position - 1] != seq):
+                break
+            holdings = dict(zip(group['Ticker'], group['Shares']))
+            checkpoints.append({'Position': int(position), 'Seq': int(seq), 'Cash': holdings.pop('Cash', 0.0),
+                                'Holdings': holdings})
+        self.checkpoints = checkpoints
+
+    def save_checkpoints(self):
+        rows = [{'Position': c['Position'], 'Seq': c['Seq'], 'Ticker': ticker, 'Shares': shares}
+                for c in self.checkpoints for ticker, shares in list(c['Holdings'].items()) + [('Cash', c['Cash'])]]
+        os.makedirs(self.directory, exist_ok=True)
+        write_frame(pd.DataFrame(rows, columns=['Position', 'Seq', 'Ticker', 'Shares']), self.checkpoint_file, index=False)
+
+    def checkpoint_before(self, position):
+        """The latest checkpoint at or before `position`, building (and saving) any missing ones up to it."""
+        with self.lock:
+            if not self.checkpoints:
+                self.checkpoints = [{'Position': 0, 'Seq': 0, 'Cash': 0.0, 'Holdings': {}}]
+            built = False
+            while self.checkpoints[-1]['Position'] + self.checkpoint_every <= position:
+                last = self.checkpoints[-1]
+                stop = last['Position'] + self.checkpoint_every
+                holdings, cash = self.replay(last['Position'], stop, last['Holdings'], last['Cash'])
+                self.checkpoints.append({'Position': stop, 'Seq': int(self.entries['Seq'].iloc[stop - 1]),
+                                         'Cash': cash, 'Holdings': holdings})
+                built = True
+            if built:
+                self.save_checkpoints()
+            index = np.searchsorted([c['Position'] for c in self.checkpoints], position, side='right') - 1
+            return self.checkpoints[index]
+
+    def holdings(self, as_of=None):
+        """Return ({ticker: shares} with zero positions dropped, cash) after every entry dated on or before `as_of`."""
+        with self.lock:
+            position = len(self.entries) if as_of is None else \
+                int(self.entries['Date'].searchsorted(pd.Timestamp(as_of), side='right'))
+            checkpoint = self.checkpoint_before(position)
+            holdings, cash = self.replay(checkpoint['Position'], position, checkpoint['Holdings'], checkpoint['Cash'])
+        return {ticker: shares for ticker, shares in holdings.items() if abs(shares) > 1e-9}, cash
+
+    def holdings_over_time(self, dates, tickers=None):
+        """Return a dates x tickers frame of shares held at the end of each date, plus a 'Cash' column.
+
+        Entries before the first date start from the nearest checkpoint; the rest are turned into
+        positions with position_paths and scattered onto the date grid, then forward filled.
+        """
+        dates = pd.DatetimeIndex(dates)
+        with self.lock:
+            start = int(self.entries['Date'].searchsorted(dates[0], side='right')) if len(dates) else 0
+            checkpoint = self.checkpoint_before(start)
+            holdings, cash = self.replay(checkpoint['Position'], start, checkpoint['Holdings'], checkpoint['Cash'])
+            entries = self.entries.iloc[start:]
+        entry_dates = entries['Date'].to_numpy()
+        grid = dates.values
+        trades = entries[entries['Type'].isin(SHARE_TYPES)]
+        names = list(tickers) if tickers is not None else list(dict.fromkeys(list(holdings) + list(trades['Ticker'].unique())))
+        columns = {name: column for column, name in enumerate(names)}
+        initial = np.array([holdings.get(name, 0.0) for name in names], dtype=np.float64)
+        matrix = np.full((len(grid), len(names)), np.nan)
+        if len(trades):
+            codes = trades['Ticker'].map(columns)
+            keep = codes.notna().to_numpy()
+            trade_codes = codes.to_numpy()[keep].astype(np.int64)
+            paths = position_paths(trade_codes, trades['Type'].to_numpy()[keep],
+                                   trades['Shares'].to_numpy(np.float64)[keep], initial)
+            rows = np.searchsorted(grid, trades['Date'].to_numpy()[keep], side='left')
+            inside = rows < len(grid)
+            rows, trade_codes, paths = rows[inside], trade_codes[inside], paths[inside]
+            # The last entry of each (grid date, ticker) wins: keep the final occurrence of each key
+            keys = rows * len(names) + trade_codes
+            _, last = np.unique(keys[::-1], return_index=True)
+            last = len(keys) - 1 - last
+            matrix[rows[last], trade_codes[last]] = paths[last]
+        matrix = forward_fill(matrix)
+        matrix = np.where(np.isnan(matrix), initial, matrix)
+        flows = np.concatenate([[0.0], np.cumsum(entries['Amount'].to_numpy(np.float64))])
+        frame = pd.DataFrame(matrix, index=pd.DatetimeIndex(dates, name='Date'), columns=names)
+        frame['Cash'] = cash + flows[np.searchsorted(entry_dates, grid, side='right')]
+        return frame
+
+    def value_over_time(self, panel, include_cash=True):
+        """Value the point-in-time holdings on a PricePanel's dates. Returns a Date-indexed Series."""
+        tickers = [ticker for ticker in self.entries.loc[self.entries['Type'].isin(SHARE_TYPES), 'Ticker'].unique()]
+        dates, symbols, prices = panel.load(tickers)
+        held = self.holdings_over_time(dates, symbols)
+        values = np.nansum(held[symbols].to_numpy() * prices, axis=1)
+        if include_cash:
+            values = values + held['Cash'].to_numpy()
+        return pd.Series(values, index=dates, name=self.name)
+
+    def compact(self):
+        """Merge all segments into one. Returns the number of segments replaced."""
+        with self.lock:
+            paths = self.segment_files()
+            if len(paths) < 2:
+                return 0
+            path = os.path.join(self.directory, f"ledger_{time.time_ns()}_{os.getpid()}_{next(self.counter)}{self.extension}")
+            write_frame(self.entries[LEDGER_COLUMNS], path, index=False)
+            self.segments.add(path)
+            for old_path in paths:
+                os.remove(old_path)
+                self.segments.discard(old_path)
+            return len(paths)
+
+    def import_portfolio(self, holdings, cash=0.0, date=OPENING_DATE):
+        """Seed an empty ledger with the net holdings of a portfolio CSV as opening transfers and a deposit."""
+        date = pd.Timestamp(date)
+        rows = [{'Date': date, 'Type': 'transfer', 'Ticker': ticker, 'Shares': shares}
+                for ticker, shares in holdings.items() if ticker != 'Cash']
+        if cash:
+            rows.append({'Date': date, 'Type': 'deposit' if cash > 0 else 'withdrawal', 'Amount': cash})
+        return self.extend(rows) if rows else 0
@@ -0,0 +1,78 @@
+import os
+import pandas as pd
+from download_scheduler import DownloadScheduler
+
+
+class UniversePlan:
+    """Distinct (symbol, dataset) fetches for one run, with the count a per-portfolio loop would have made."""
+
+    def __init__(self, jobs, market_symbols, requested):
+        self.jobs = jobs
+        self.market_symbols = market_symbols
+        self.requested = requested
+
+    @property
+    def planned(self):
+        return len(self.jobs) + len(self.market_symbols)
+
+    @property
+    def avoided(self):
+        return self.requested - self.planned
+
+    def symbols(self, dataset):
+        return [symbol for symbol, job_dataset in self.jobs if job_dataset == dataset]
+
+    def summary(self):
+        return (f"{self.planned} fetches planned for {len({symbol for symbol, _ in self.jobs})} symbols "
+                f"and {len(self.market_symbols)} market indexes; {self.avoided} redundant fetches avoided "
+                f"(out of {self.requested}).")
+
+
+class UniversePlanner:
+    """Plans each run over the union of all portfolios so every (symbol, dataset) pair is fetched once."""
+
+    def __init__(self, portfolios_directory, indexes=None, datasets=None, include_market=True):
+        self.portfolios_directory = portfolios_directory
+        self.indexes = indexes if indexes is not None else ['^DJI', '^IXIC', '^GSPC']
+        self.datasets = datasets or ['history_update']
+        self.include_market = include_market
+
+    def portfolio_tickers(self):
+        """Return {portfolio name: [tickers]} for every portfolio CSV, without the Cash row."""
+        portfolios = {}
+        for file_name in sorted(os.listdir(self.portfolios_directory)):
+            if file_name.endswith('.csv'):
+                df = pd.read_csv(os.path.join(self.portfolios_directory, file_name))
+                tickers = df['Ticker'].astype(str).str.strip().str.upper()
+                portfolios[file_name[:-4]] = [ticker for ticker in tickers if ticker != 'CASH']
+        return portfolios
+
+    def plan(self):
+        portfolios = self.portfolio_tickers()
+        symbols = list(dict.fromkeys(ticker for tickers in portfolios.values() for ticker in tickers))
+        jobs = [(symbol, dataset) for symbol in symbols for dataset in self.datasets]
+        market_symbols = list(self.indexes) if self.include_market else []
+        # A per-portfolio, per-ticker loop fetches every dataset once per holding; the market indexes
+        # are only refreshed once per run either way, so they save nothing.
+        holdings = sum(len(tickers) for tickers in portfolios.values())
+        requested = holdings * len(self.datasets) + len(market_symbols)
+        return UniversePlan(jobs, market_symbols, requested)
+
+    def run(self, downloader, batch_size=100, max_workers=8):
+        """Fetch the planned universe once with `downloader` (a YFDownload). Returns the plan and the scheduler report."""
+        plan = self.plan()
+        print(plan.summary())
+        history_symbols = plan.symbols('history_update')
+        if history_symbols:
+            downloader.update_bulk_history(history_symbols, batch_size=batch_size)
+        if plan.market_symbols:
+            downloader.history_updater.update_bulk(plan.market_symbols, batch_size=batch_size,
+                                                   directory=downloader.market_directory)
+        other_jobs = [(symbol, dataset) for symbol, dataset in plan.jobs if dataset != 'history_update']
+        report = None
+        if other_jobs:
+            report = DownloadScheduler(downloader, max_workers=max_workers).run(other_jobs)
+            for record in report.failed:
+                print(f"Error downloading {record['Dataset']} for {record['Ticker']}: {record['Error']}")
+            print(report.summary())
+        return plan, report
@@ -1,21 +1,10 @@
 from yf_download import YFDownload
-import datetime
+from universe_planner import UniversePlanner
+from market_calendar import MarketCalendar
+import sys
 import os
 import pandas as pd
 
-def update_portfolio_data(portfolio_path):
-    # Load the portfolio from the given path
-    df_portfolio = pd.read_csv(portfolio_path)
-    portfolio = df_portfolio.set_index('Ticker')['Shares'].to_dict()
-    
-    # Iterate through each ticker symbol in the portfolio and update its data
-    for ticker_symbol, shares in portfolio.items():
-        if ticker_symbol != 'Cash':  # Skip 'Cash' or any non-ticker entry
-            print(f"Updating data for {ticker_symbol}")
-            # Use the YFDownload class to download/update historical data for this ticker
-            YFDownload.download_historical_data(ticker_symbol)
-    print(f"Portfolio data update complete for {portfolio_path}.")
-
 def check_and_update():
     last_run_file = "AK47_Finance/Data/last_run.txt"
     portfolios_folder = "AK47_Finance/Data/Portfolios"
@@ -26,21 +15,25 @@ def check_and_update():
     except FileNotFoundError:
         last_run_date = "1970-01-01"  # If the file doesn't exist, use a default old date
 
-    today_str = datetime.date.today().strftime("%Y-%m-%d")
-    if today_str > last_run_date:
+    # Only a session that has closed since the last run brings new data (no work on weekends and holidays)
+    latest_session = MarketCalendar().last_completed_session(pd.Timestamp.now(tz='UTC')).strftime("%Y-%m-%d")
+    if latest_session > last_run_date:
         print("Updating portfolio data...")
         
-        # Iterate over each CSV file in the portfolios directory
-        for portfolio_name in os.listdir(portfolios_folder):
-            if portfolio_name.endswith(".csv"):
-                portfolio_path = os.path.join(portfolios_folder, portfolio_name)
-                update_portfolio_data(portfolio_path)
+        # Fetch each distinct ticker (and each market index) once, however many portfolios hold it
+        planner = UniversePlanner(portfolios_folder)
+        planner.run(YFDownload(data_directory=os.path.dirname(portfolios_folder)))
         
-        # Update the last run date
+        # Record the session the data is now current to
         with open(last_run_file, "w") as file:
-            file.write(today_str)
+            file.write(latest_session)
     else:
-        print("Already updated today.")
+        print(f"Already up to date with the {latest_session} session.")
 
 if __name__ == "__main__":
-    check_and_update()
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        # Keep a warm process refreshing daily, intraday, options and fundamentals data on the market calendar
+        from refresh_service import RefreshService
+        RefreshService(YFDownload(data_directory="AK47_Finance/Data"), "AK47_Finance/Data/Portfolios").run()
+    else:
+        check_and_update()
@@ -1,12 +1,37 @@
-import yfinance as yf
 import pandas as pd
 import os
-import datetime as dt
+from concurrent.futures import ThreadPoolExecutor
+from data_store import DataStore
+from history_updater import HistoryUpdater
+from quote_index import QuoteIndex
+from options_store import OptionsStore
+from intraday_store import IntradayStore
+from news_store import NewsStore
+from fundamentals import FundamentalsWarehouse
+from stock_screener import StockInfoTable, parse_legacy
+from freshness import FreshnessManifest, fingerprint
+from data_provider import shared_provider
+from download_scheduler import DownloadScheduler, ALL_DATASETS
 
 class YFDownload:
-    def __init__(self, indexes=None, data_directory="Data", market_directory="Data/Market"):
+    def __init__(self, indexes=None, data_directory="Data", market_directory="Data/Market", file_format=None, raise_errors=False,
+                 force_refresh=False, ttls=None, provider=None):
         self.data_directory = data_directory  
         self.market_directory = market_directory
+        self.store = DataStore(data_directory, file_format)
+        self.provider = provider or shared_provider()  # one session, cached tickers and coalesced requests
+        self.quote_index = QuoteIndex(self.store)
+        self.options_store = OptionsStore(self.store)
+        self.intraday_store = IntradayStore(self.store)
+        self.news_store = NewsStore(self.store)
+        self.fundamentals = FundamentalsWarehouse(self.store)
+        self.info_table = StockInfoTable(self.store)
+        self.history_updater = HistoryUpdater(self.store, self.fetch_history, fetch_bulk_history=self.fetch_bulk_history,
+                                              quote_index=self.quote_index)
+        self.raise_errors = raise_errors  # re-raise download errors instead of printing them (used by the scheduler)
+        self.freshness = FreshnessManifest(self.store, ttls=ttls)
+        self.force_refresh = force_refresh  # refetch and rewrite every dataset whatever the manifest says
+        self.defer_saves = False  # set by the scheduler, which saves the manifest once at the end of a run
         if indexes is None:
             self.indexes = ['^DJI', '^IXIC', '^GSPC']
         else:
@@ -15,253 +40,406 @@ class YFDownload:
     def ensure_directory_exists(self, directory):
         full_path = os.path.join(self.data_directory, directory)  # Use base data directory
         try:
-            if not os.path.exists(full_path):
-                os.makedirs(full_path)
+            os.makedirs(full_path, exist_ok=True)
         except Exception as e:
             print(f"Error creating directory {full_path}: {e}")
 
+    def report_error(self, message, error):
+        if self.raise_errors:
+            raise error
+        print(f"{message}: {error}")
+
+    def is_fresh(self, ticker_symbol, dataset, directory=None):
+        """True when the last fetch of the dataset is within its TTL and its stored copy is still there."""
+        return (not self.force_refresh and self.freshness.is_fresh(ticker_symbol, dataset)
+                and self.has_stored(ticker_symbol, dataset, directory)
+                and self.freshness.skip_fetch(ticker_symbol, dataset))
+
+    def needs_write(self, ticker_symbol, dataset, payload_fingerprint, directory=None):
+        """True unless the payload matches the last recorded fetch and that copy is still stored."""
+        return (self.force_refresh or not self.freshness.unchanged(ticker_symbol, dataset, payload_fingerprint)
+                or not self.has_stored(ticker_symbol, dataset, directory))
+
+    def record_fetch(self, ticker_symbol, dataset, payload_fingerprint, written=True):
+        """Record a fetch in the manifest once its payload is written (or skipped as unchanged)."""
+        self.freshness.record(ticker_symbol, dataset, payload_fingerprint, written)
+        if not self.defer_saves:
+            self.freshness.save()
+
+    def has_stored(self, ticker_symbol, dataset, directory=None):
+        if dataset == 'Options':
+            return bool(self.options_store.snapshots(ticker_symbol))
+        if dataset == 'News':
+            return not self.news_store.latest(ticker_symbol, limit=1).empty
+        if dataset.startswith('intraday_'):
+            return bool(self.intraday_store.partitions(ticker_symbol, dataset[len('intraday_'):]))
+        if dataset in ('Balance_Sheet', 'Income_Stmt', 'Cash_Flows'):
+            return self.store.exists(ticker_symbol, dataset) and self.store.exists(ticker_symbol, f"Qtly_{dataset}")
+        return self.store.exists(ticker_symbol, dataset, directory)
+
+    def read_stored(self, ticker_symbol, dataset):
+        """The stored copy of a dataset, in the shape its download method returns."""
+        if dataset == 'historical_data':
+            return self.store.read_history(ticker_symbol)
+        if dataset == 'Info':
+            info = self.store.read(ticker_symbol, 'Info')
+            return None if info is None else dict(zip(info['Attribute'], info['Value'].map(parse_legacy)))
+        if dataset == 'Options':
+            chain = self.options_store.query(ticker_symbol)
+            return None if chain is None else [chain]
+        if dataset == 'News':
+            return self.news_store.latest(ticker_symbol)
+        if dataset.startswith('intraday_'):
+            return self.intraday_store.read_bars(ticker_symbol, dataset[len('intraday_'):])
+        if dataset in ('Balance_Sheet', 'Income_Stmt', 'Cash_Flows'):
+            return (self.store.read(ticker_symbol, dataset, index_col=0),
+                    self.store.read(ticker_symbol, f"Qtly_{dataset}", index_col=0))
+        frame = self.store.read(ticker_symbol, dataset, index_col=0)
+        if dataset == 'Dividends' and frame is not None:
+            return frame.iloc[:, 0]
+        return frame
+
+    def fetch_history(self, ticker_symbol, start=None, end=None):
+        """Fetch daily bars from `start` (inclusive) to `end`, or the full history when no start is given."""
+        if start is None:
+            return self.provider.history(ticker_symbol, period="max")
+        return self.provider.history(ticker_symbol, start=start, end=end)
+
+    def fetch_bulk_history(self, ticker_symbols, start=None, end=None):
+        """Fetch daily bars for many tickers in one request. Returns {ticker: DataFrame} for the tickers returned."""
+        ticker_symbols = list(ticker_symbols)
+        period = "max" if start is None else None
+        data = self.provider.download(ticker_symbols, start=start, end=end, period=period, group_by='ticker',
+                                      actions=True, auto_adjust=True, threads=False, progress=False)
+        return split_bulk_frame(data, ticker_symbols)
+
+    def download_bulk_history(self, ticker_symbols, start=None, end=None, batch_size=100):
+        """Download a date window for many tickers in batched requests and merge it into each stored history."""
+        ticker_symbols = [t for t in ticker_symbols if not self.is_fresh(t, 'historical_data')]
+        results, requests = self.history_updater.merge_window(ticker_symbols, start=start, end=end,
+                                                              batch_size=batch_size)
+        self.history_updater.save_watermarks()
+        print(f"Downloaded {sum(1 for bars in results.values() if bars)} of {len(results)} tickers "
+              f"with {requests} batched requests.")
+        return results
+
+    def update_bulk_history(self, ticker_symbols, batch_size=100):
+        """Incrementally update many tickers' histories with batched requests, skipping the fresh ones."""
+        ticker_symbols = [t for t in ticker_symbols if not self.is_fresh(t, 'historical_data')]
+        results = self.history_updater.update_bulk(ticker_symbols, batch_size=batch_size)
+        for ticker_symbol, bars in results.items():
+            if bars is not None:
+                self.freshness.record(ticker_symbol, 'historical_data',
+                                      fingerprint(self.store.history_bounds(ticker_symbol)))
+        self.freshness.save()
+        return results
+
     def download_historical_data(self, ticker_symbol):
+        if self.is_fresh(ticker_symbol, 'historical_data'):
+            return self.read_stored(ticker_symbol, 'historical_data')
         directory = f"{ticker_symbol}" 
         self.ensure_directory_exists(directory)
         try:
-            stock = yf.Ticker(ticker_symbol)
-            hist = stock.history(period="max").sort_index(ascending=False)
-            file_path = os.path.join(self.data_directory, directory, f"{ticker_symbol}_historical_data.csv")
-            hist.to_csv(file_path)
+            hist = self.fetch_history(ticker_symbol)
+            hist_fingerprint = fingerprint(hist)
+            written = self.needs_write(ticker_symbol, 'historical_data', hist_fingerprint)
+            if written:
+                path = self.store.write_history(hist, ticker_symbol)
+                self.quote_index.record(ticker_symbol, hist, path)
+                self.quote_index.save()
+            self.record_fetch(ticker_symbol, 'historical_data', hist_fingerprint, written)
             return hist
         except Exception as e:
-            print(f"Error downloading historical data for {ticker_symbol}: {e}")
+            self.report_error(f"Error downloading historical data for {ticker_symbol}", e)
             return None
 
     def download_stock_info(self, ticker_symbol):
+        if self.is_fresh(ticker_symbol, 'Info'):
+            return self.read_stored(ticker_symbol, 'Info')
         directory = f"{ticker_symbol}"
         self.ensure_directory_exists(directory)
         try:
-            stock = yf.Ticker(ticker_symbol)
-            stock_info = stock.info
+            stock_info = self.provider.fetch(ticker_symbol, 'info')
             if stock_info:
-                df_stock_info = pd.DataFrame(list(stock_info.items()), columns=['Attribute', 'Value'])
-                file_path = os.path.join(self.data_directory, directory, f"{ticker_symbol}_Info.csv")
-                df_stock_info.to_csv(file_path, index=False)
+                info_fingerprint = fingerprint(stock_info)
+                written = self.needs_write(ticker_symbol, 'Info', info_fingerprint)
+                if written:
+                    df_stock_info = pd.DataFrame(list(stock_info.items()), columns=['Attribute', 'Value'])
+                    df_stock_info['Value'] = df_stock_info['Value'].astype(str)
+                    self.store.write(df_stock_info, ticker_symbol, 'Info', index=False)
+                    self.info_table.upsert(ticker_symbol, stock_info)
+                self.record_fetch(ticker_symbol, 'Info', info_fingerprint, written)
             return stock_info
         except Exception as e:
-            print(f"Error downloading stock info for {ticker_symbol}: {e}")
+            self.report_error(f"Error downloading stock info for {ticker_symbol}", e)
             return None
 
     def download_earnings_dates(self, ticker_symbol):
+        if self.is_fresh(ticker_symbol, 'Earnings_Dates'):
+            return self.read_stored(ticker_symbol, 'Earnings_Dates')
         directory = f"{ticker_symbol}"
         self.ensure_directory_exists(directory)
         try: 
-            stock = yf.Ticker(ticker_symbol)
-            df_earning_dates = stock.earnings_dates
-            if df_earning_dates:
-                file_path = os.path.join(self.data_directory, directory, f"{ticker_symbol}_Earnings_Dates.csv")
-                df_earning_dates.to_csv(file_path, index=False)
+            df_earning_dates = self.provider.fetch(ticker_symbol, 'earnings_dates')
+            if df_earning_dates is not None and not df_earning_dates.empty:
+                earnings_fingerprint = fingerprint(df_earning_dates)
+                written = self.needs_write(ticker_symbol, 'Earnings_Dates', earnings_fingerprint)
+                if written:
+                    self.store.write(df_earning_dates, ticker_symbol, 'Earnings_Dates')
+                self.record_fetch(ticker_symbol, 'Earnings_Dates', earnings_fingerprint, written)
             return df_earning_dates
         except Exception as e: 
-            print(f"Error downloading earnings dats for {ticker_symbol}: {e}")
+            self.report_error(f"Error downloading earnings dats for {ticker_symbol}", e)
             return None
     
-    def download_stock_options(self, ticker_symbol):
+    def download_stock_options(self, ticker_symbol, max_workers=8):
+        """Fetch every expiration's chain concurrently and store them as a new snapshot in the options store.
+
+        A chain identical to the last one fetched is not stored again.
+        """
+        if self.is_fresh(ticker_symbol, 'Options'):
+            return self.read_stored(ticker_symbol, 'Options')
         directory = f"{ticker_symbol}"
         self.ensure_directory_exists(directory)
         try:
-            stock = yf.Ticker(ticker_symbol)
-            stock_options = stock.options
+            stock_options = self.provider.fetch(ticker_symbol, 'options')
             all_options_data = []
             if stock_options:
-                for expiration_date in stock_options:
-                    options_df = stock.option_chain(expiration_date)
-                    options_df.calls['Expiration'] = expiration_date
-                    options_df.calls['Type'] = 'Call'
-                    options_df.puts['Expiration'] = expiration_date
-                    options_df.puts['Type'] = 'Put'
-                    all_options_data.append(options_df.calls)
-                    all_options_data.append(options_df.puts)
-
-                combined_options_df = pd.concat(all_options_data)
-                file_path = os.path.join(self.data_directory, directory, f"{ticker_symbol}_Options_Combined.csv")
-                combined_options_df.to_csv(file_path, index=False)
+                def fetch_chain(expiration_date):
+                    options_df = self.provider.fetch(ticker_symbol, 'option_chain', expiration_date)
+                    calls = options_df.calls.assign(Expiration=expiration_date, Type='Call')
+                    puts = options_df.puts.assign(Expiration=expiration_date, Type='Put')
+                    return expiration_date, calls, puts
+
+                chains = {}
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    for expiration_date, calls, puts in executor.map(fetch_chain, stock_options):
+                        all_options_data.append(calls)
+                        all_options_data.append(puts)
+                        chains[expiration_date] = pd.concat([calls, puts], ignore_index=True)
+
+                options_fingerprint = fingerprint(all_options_data)
+                written = self.needs_write(ticker_symbol, 'Options', options_fingerprint)
+                if written:
+                    self.options_store.write_snapshot(ticker_symbol, chains)
+                self.record_fetch(ticker_symbol, 'Options', options_fingerprint, written)
 
             return all_options_data
         except Exception as e:
-            print(f"Error downloading stock options for {ticker_symbol}: {e}")
+            self.report_error(f"Error downloading stock options for {ticker_symbol}", e)
             return None 
 
     def download_dividends(self, ticker_symbol):
+        if self.is_fresh(ticker_symbol, 'Dividends'):
+            return self.read_stored(ticker_symbol, 'Dividends')
         directory = f"{ticker_symbol}"
         self.ensure_directory_exists(directory)
         try:
-            stock = yf.Ticker(ticker_symbol)
-            dividends = stock.dividends
-            file_path = os.path.join(self.data_directory, directory, f"{ticker_symbol}_Dividends.csv")
-            dividends.to_csv(file_path, index=False)
+            dividends = self.provider.fetch(ticker_symbol, 'dividends')
+            dividends_fingerprint = fingerprint(dividends)
+            written = self.needs_write(ticker_symbol, 'Dividends', dividends_fingerprint)
+            if written:
+                self.store.write(dividends.to_frame(), ticker_symbol, 'Dividends')
+            self.record_fetch(ticker_symbol, 'Dividends', dividends_fingerprint, written)
             return dividends
         except Exception as e: 
-            print(f"Error downloading stock dividends for {ticker_symbol}: {e}")
+            self.report_error(f"Error downloading stock dividends for {ticker_symbol}", e)
             return None
 
     def download_stock_news(self, ticker_symbol):
+        if self.is_fresh(ticker_symbol, 'News'):
+            return self.read_stored(ticker_symbol, 'News')
         directory = f"{ticker_symbol}"
         self.ensure_directory_exists(directory)
         try:  
-            stock = yf.Ticker(ticker_symbol)
-            stock_news = stock.news
+            stock_news = self.provider.fetch(ticker_symbol, 'news')
             if stock_news:
-                df_stock_news = pd.DataFrame(stock_news)
-                file_path = os.path.join(self.data_directory, directory, f"{ticker_symbol}_News.csv")
-                df_stock_news.to_csv(file_path, index=False)
+                news_fingerprint = fingerprint(stock_news)
+                written = self.needs_write(ticker_symbol, 'News', news_fingerprint)
+                if written:
+                    # Appended to the shared news store; articles already stored for this ticker are skipped
+                    self.news_store.append(ticker_symbol, stock_news)
+                self.record_fetch(ticker_symbol, 'News', news_fingerprint, written)
             return stock_news
         except Exception as e:
-            print(f"Error downloading stock news for {ticker_symbol}: {e}")
+            self.report_error(f"Error downloading stock news for {ticker_symbol}", e)
             return None 
 
     def download_balance_sheet(self, ticker_symbol):
+        if self.is_fresh(ticker_symbol, 'Balance_Sheet'):
+            return self.read_stored(ticker_symbol, 'Balance_Sheet')
         directory = f"{ticker_symbol}"
         self.ensure_directory_exists(directory)
         try:
-            stock = yf.Ticker(ticker_symbol)
-            stock_balance_sheet = stock.balance_sheet
-            stock_qtly_balance_sheet = stock.quarterly_balance_sheet
-            if not stock_balance_sheet.empty and not stock_qtly_balance_sheet.empty:
-                df_stock_balance_sheet = pd.DataFrame(stock_balance_sheet)
-                df_qtly_balance_sheet = pd.DataFrame(stock_qtly_balance_sheet)
-                bs_file_path = os.path.join(self.data_directory, directory, f"{ticker_symbol}_Balance_Sheet.csv")
-                qbs_file_path = os.path.join(self.data_directory, directory, f"{ticker_symbol}_Qtly_Balance_Sheet.csv")
-                df_stock_balance_sheet.to_csv(bs_file_path)
-                df_qtly_balance_sheet.to_csv(qbs_file_path)
-            else:
+            stock_balance_sheet = self.provider.fetch(ticker_symbol, 'balance_sheet')
+            stock_qtly_balance_sheet = self.provider.fetch(ticker_symbol, 'quarterly_balance_sheet')
+            if stock_balance_sheet.empty or stock_qtly_balance_sheet.empty:
                 print(f"No balance sheet data available for {ticker_symbol}")
+            else:
+                statement_fingerprint = fingerprint((stock_balance_sheet, stock_qtly_balance_sheet))
+                written = self.needs_write(ticker_symbol, 'Balance_Sheet', statement_fingerprint)
+                if written:
+                    df_stock_balance_sheet = pd.DataFrame(stock_balance_sheet)
+                    df_qtly_balance_sheet = pd.DataFrame(stock_qtly_balance_sheet)
+                    self.store.write(df_stock_balance_sheet, ticker_symbol, 'Balance_Sheet')
+                    self.store.write(df_qtly_balance_sheet, ticker_symbol, 'Qtly_Balance_Sheet')
+                    self.fundamentals.load_dataset(ticker_symbol, 'Balance_Sheet', df_stock_balance_sheet)
+                    self.fundamentals.load_dataset(ticker_symbol, 'Qtly_Balance_Sheet', df_qtly_balance_sheet)
+                self.record_fetch(ticker_symbol, 'Balance_Sheet', statement_fingerprint, written)
             return stock_balance_sheet, stock_qtly_balance_sheet
         except Exception as e:
-            print(f"Error downloading stock balance sheets for {ticker_symbol}: {e}")
+            self.report_error(f"Error downloading stock balance sheets for {ticker_symbol}", e)
             return None
 
     def download_income_statement(self, ticker_symbol):
+        if self.is_fresh(ticker_symbol, 'Income_Stmt'):
+            return self.read_stored(ticker_symbol, 'Income_Stmt')
         directory = f"{ticker_symbol}"
         self.ensure_directory_exists(directory)
         try:
-            stock = yf.Ticker(ticker_symbol)
-            stock_income_stmt = stock.income_stmt
-            stock_qtly_income_stmt = stock.quarterly_income_stmt
-            if not stock_income_stmt.empty and not stock_qtly_income_stmt.empty: 
-                df_stock_income_stmt = pd.DataFrame(stock_income_stmt)
-                df_stock_qtly_income_stmt = pd.DataFrame(stock_qtly_income_stmt)
-                is_file_path = os.path.join(self.data_directory, directory, f"{ticker_symbol}_Income_Stmt.csv")
-                qis_file_path = os.path.join(self.data_directory, directory, f"{ticker_symbol}_Qtly_Income_Stmt.csv")
-                df_stock_income_stmt.to_csv(is_file_path)
-                df_stock_qtly_income_stmt.to_csv(qis_file_path)
-            else:
+            stock_income_stmt = self.provider.fetch(ticker_symbol, 'income_stmt')
+            stock_qtly_income_stmt = self.provider.fetch(ticker_symbol, 'quarterly_income_stmt')
+            if stock_income_stmt.empty or stock_qtly_income_stmt.empty:
                 print(f"No income statement data available for {ticker_symbol}")
+            else:
+                statement_fingerprint = fingerprint((stock_income_stmt, stock_qtly_income_stmt))
+                written = self.needs_write(ticker_symbol, 'Income_Stmt', statement_fingerprint)
+                if written:
+                    df_stock_income_stmt = pd.DataFrame(stock_income_stmt)
+                    df_stock_qtly_income_stmt = pd.DataFrame(stock_qtly_income_stmt)
+                    self.store.write(df_stock_income_stmt, ticker_symbol, 'Income_Stmt')
+                    self.store.write(df_stock_qtly_income_stmt, ticker_symbol, 'Qtly_Income_Stmt')
+                    self.fundamentals.load_dataset(ticker_symbol, 'Income_Stmt', df_stock_income_stmt)
+                    self.fundamentals.load_dataset(ticker_symbol, 'Qtly_Income_Stmt', df_stock_qtly_income_stmt)
+                self.record_fetch(ticker_symbol, 'Income_Stmt', statement_fingerprint, written)
             return stock_income_stmt, stock_qtly_income_stmt
         except Exception as e: 
-            print(f"Error downloading stock income statement for {ticker_symbol}: {e}")
+            self.report_error(f"Error downloading stock income statement for {ticker_symbol}", e)
             return None
 
     def download_cash_flows(self, ticker_symbol):
+        if self.is_fresh(ticker_symbol, 'Cash_Flows'):
+            return self.read_stored(ticker_symbol, 'Cash_Flows')
         directory = f"{ticker_symbol}"
         self.ensure_directory_exists(directory)
         try:
-            stock = yf.Ticker(ticker_symbol)
-            stock_cash_flows = stock.cashflow  # Correct attribute for yfinance is cashflows, not cash_flow
-            stock_qtly_cash_flows = stock.quarterly_cashflow  
-            if not stock_cash_flows.empty and not stock_qtly_cash_flows.empty:
-                df_stock_cash_flows = pd.DataFrame(stock_cash_flows)
-                df_stock_qtly_cash_flows = pd.DataFrame(stock_qtly_cash_flows)
-                cf_file_path = os.path.join(self.data_directory, directory, f"{ticker_symbol}_Cash_Flows.csv")
-                qcf_file_path = os.path.join(self.data_directory, directory, f"{ticker_symbol}_Qtly_Cash_Flows.csv")
-                df_stock_cash_flows.to_csv(cf_file_path)
-                df_stock_qtly_cash_flows.to_csv(qcf_file_path)
-            else:
+            stock_cash_flows = self.provider.fetch(ticker_symbol, 'cashflow')  # yfinance's attribute is cashflow, not cash_flow
+            stock_qtly_cash_flows = self.provider.fetch(ticker_symbol, 'quarterly_cashflow')
+            if stock_cash_flows.empty or stock_qtly_cash_flows.empty:
                 print(f"No cash flows data available for {ticker_symbol}")
+            else:
+                statement_fingerprint = fingerprint((stock_cash_flows, stock_qtly_cash_flows))
+                written = self.needs_write(ticker_symbol, 'Cash_Flows', statement_fingerprint)
+                if written:
+                    df_stock_cash_flows = pd.DataFrame(stock_cash_flows)
+                    df_stock_qtly_cash_flows = pd.DataFrame(stock_qtly_cash_flows)
+                    self.store.write(df_stock_cash_flows, ticker_symbol, 'Cash_Flows')
+                    self.store.write(df_stock_qtly_cash_flows, ticker_symbol, 'Qtly_Cash_Flows')
+                    self.fundamentals.load_dataset(ticker_symbol, 'Cash_Flows', df_stock_cash_flows)
+                    self.fundamentals.load_dataset(ticker_symbol, 'Qtly_Cash_Flows', df_stock_qtly_cash_flows)
+                self.record_fetch(ticker_symbol, 'Cash_Flows', statement_fingerprint, written)
             return stock_cash_flows, stock_qtly_cash_flows
         except Exception as e:
-            print(f"Error downloading stock cash flows for {ticker_symbol}: {e}")
+            self.report_error(f"Error downloading stock cash flows for {ticker_symbol}", e)
             return None
 
     def download_market_historical_data(self):
         directory = self.market_directory
         self.ensure_directory_exists(directory)
         for symbol in self.indexes:
+            if self.is_fresh(symbol, 'historical_data', directory):
+                continue
             try:
-                ticker = yf.Ticker(symbol)
-                historical_data = ticker.history(period="max")
-                historical_data_sorted = historical_data.sort_index(ascending=False)
-                file_path = os.path.join(self.data_directory, directory, f"{symbol}_historical_data.csv")
-                historical_data_sorted.to_csv(file_path)
+                historical_data = self.fetch_history(symbol)
+                history_fingerprint = fingerprint(historical_data)
+                written = self.needs_write(symbol, 'historical_data', history_fingerprint, directory)
+                if written:
+                    path = self.store.write_history(historical_data, symbol, directory=directory)
+                    self.quote_index.record(symbol, historical_data, path)
+                self.freshness.record(symbol, 'historical_data', history_fingerprint, written)
             except Exception as e:
-                print(f"Error downloading historical data for {symbol}: {e}")
+                self.report_error(f"Error downloading historical data for {symbol}", e)
+        self.quote_index.save()
+        self.freshness.save()
 
     def update_historical_data(self, ticker_symbol):
-        directory = f"{ticker_symbol}"
-        file_name = f"{ticker_symbol}_historical_data.csv"
-        file_path = os.path.join(self.data_directory, directory, file_name)
-        self.ensure_directory_exists(directory)
+        """Fetch only the bars missing since the last stored one and merge them into the history.
+
+        Returns the number of bars written, or None if the update failed.
+        """
+        if self.is_fresh(ticker_symbol, 'historical_data'):
+            return 0
         try:
-            df = pd.read_csv(file_path)
-            if df.empty:
-                print(f"Existing data for {ticker_symbol} is empty. Consider downloading the full dataset.")
-                return
-            if 'Date' not in df.columns:
-                print(f"No 'Date' column found in the dataset for {ticker_symbol}.")
-                return
-            
-            last_date = pd.to_datetime(df['Date'].iloc[0])
-            current_date = pd.Timestamp.today().normalize()
-            stock = yf.Ticker(ticker_symbol)
-            
-            if last_date < current_date:
-                new_data = stock.history(start=last_date + pd.Timedelta(days=1))
-                if not new_data.empty:
-                    new_data_sorted = new_data.sort_index(ascending=False)
-                    new_data_sorted.to_csv(file_path, mode='a', header=False, index=False)
-                else:
-                    print(f"No new data available to update for {ticker_symbol}.")
-            else:
-                print(f"Data for {ticker_symbol} is already up to date.")
+            bars = self.history_updater.update(ticker_symbol)
+            self.record_fetch(ticker_symbol, 'historical_data', fingerprint(self.store.history_bounds(ticker_symbol)))
+            return bars
         except Exception as e:
-            print(f"Error updating historical data for {ticker_symbol}: {e}")
+            self.report_error(f"Error updating historical data for {ticker_symbol}", e)
+            return None
 
     def update_market_data(self):
-        for index in self.indexes:
-            YFDownload.update_historical_data(index)
-            print(f"Update attempt for {index} completed.")
+        self.history_updater.update_many(self.indexes, directory=self.market_directory)
+        print(f"Update attempt for {', '.join(self.indexes)} completed.")
 
     def download_intraday_data(self, ticker_symbol, interval):
         # Define the period based on the interval to ensure adequate data coverage
         period = "7d" if interval == "1m" else "60d" if interval == "2m" else "1mo"
         directory = f"{ticker_symbol}/Intraday"
+        if self.is_fresh(ticker_symbol, f"intraday_{interval}"):
+            return self.read_stored(ticker_symbol, f"intraday_{interval}")
         
         self.ensure_directory_exists(directory)
         try:
-            stock = yf.Ticker(ticker_symbol)
-            stock_intraday = stock.history(period=period, interval=interval)
+            stock_intraday = self.provider.history(ticker_symbol, period=period, interval=interval)
             if stock_intraday.empty:
                 print(f"No intraday data available for {ticker_symbol} at {interval} interval.")
                 return None
             
-            # Construct the file path using os.path.join for better path management
-            file_path = os.path.join(self.data_directory, directory, f"{ticker_symbol}_{interval}_data.csv")
-            stock_intraday.to_csv(file_path)
+            intraday_fingerprint = fingerprint(stock_intraday)
+            written = self.needs_write(ticker_symbol, f"intraday_{interval}", intraday_fingerprint)
+            if written:
+                # Merge into the day partitions so bars outside the provider's rolling window are kept
+                self.intraday_store.write_bars(ticker_symbol, interval, stock_intraday)
+            self.record_fetch(ticker_symbol, f"intraday_{interval}", intraday_fingerprint, written)
             return stock_intraday
         except Exception as e:
-            print(f"Error downloading {interval} interval data for {ticker_symbol}: {e}")
+            self.report_error(f"Error downloading {interval} interval data for {ticker_symbol}", e)
             return None
 
-    def download_all_data_for_ticker(self, ticker_symbol, intraday_intervals=['1m', '2m']):
-        self.download_historical_data(ticker_symbol)
-        self.download_stock_info(ticker_symbol)
-        self.download_earnings_dates(ticker_symbol)
-        self.download_stock_options(ticker_symbol)
-        self.download_dividends(ticker_symbol)
-        self.download_stock_news(ticker_symbol)
-        self.download_balance_sheet(ticker_symbol)
-        self.download_income_statement(ticker_symbol)
-        self.download_cash_flows(ticker_symbol)
-        self.download_market_historical_data()
-        
-        for interval in intraday_intervals:
-            self.download_intraday_data(ticker_symbol, interval)
-        
-        print(f"All available data for {ticker_symbol} has been downloaded.")
+    def download_all_data_for_ticker(self, ticker_symbol, intraday_intervals=['1m', '2m'], max_workers=8,
+                                     include_market=True):
+        """Download every dataset for a ticker concurrently. Returns the scheduler's DownloadReport.
+
+        Pass include_market=False when looping over many tickers and refresh the indexes once instead.
+        Datasets still fresh in the manifest are not refetched (unless force_refresh is set).
+        """
+        self.freshness.refresh()
+        before = self.freshness.snapshot()
+        jobs = [(ticker_symbol, dataset) for dataset in ALL_DATASETS]
+        jobs += [(ticker_symbol, f"intraday_{interval}") for interval in intraday_intervals]
+        report = DownloadScheduler(self, max_workers=max_workers).run(jobs)
+        if include_market:
+            self.download_market_historical_data()
+
+        for record in report.failed:
+            print(f"Error downloading {record['Dataset']} for {ticker_symbol}: {record['Error']}")
+        print(f"All available data for {ticker_symbol} has been downloaded. {report.summary()}")
+        print(f"Freshness: {self.freshness.summary(since=before)}")
+        return report
+
 
+def split_bulk_frame(data, ticker_symbols):
+    """Split a `yf.download(..., group_by='ticker')` frame into {ticker: DataFrame}, dropping tickers with no rows."""
+    frames = {}
+    if data is None or data.empty:
+        return frames
+    if not isinstance(data.columns, pd.MultiIndex):
+        data = pd.concat({ticker_symbols[0]: data}, axis=1)
+    for ticker_symbol in ticker_symbols:
+        if ticker_symbol not in data.columns.get_level_values(0):
+            continue
+        frame = data[ticker_symbol].dropna(how='all')
+        frame.columns.name = None
+        if not frame.empty:
+            frames[ticker_symbol] = frame
+    return frames